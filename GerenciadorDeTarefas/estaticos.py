@@ -0,0 +1,175 @@
+"""
+Pipeline dos arquivos estáticos (rodado pelo `collectstatic`).
+
+Além do que o ManifestStaticFilesStorage já faz (copiar com o hash do conteúdo no nome e
+reescrever os url() do CSS), cada CSS/JS do projeto é minificado e todo arquivo de texto ganha
+versões pré-comprimidas ao lado (.gz e, com o pacote `brotli` instalado, .br). Como o nome
+muda sempre que o conteúdo muda, o servidor web pode entregar STATIC_ROOT com cache "para
+sempre" e escolher o arquivo comprimido pelo Accept-Encoding (ver STORAGES no settings).
+
+Os minificadores são conservadores (espaços, quebras de linha e comentários), sem renomear
+nada: o resultado continua legível no navegador e não depende de ferramentas em Node.
+"""
+import gzip
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # opcional: sem ele só os .gz são gerados
+    brotli = None
+
+# Tipos de texto que compensam pré-comprimir (imagens e fontes já vêm comprimidas)
+EXTENSOES_COMPRIMIDAS = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.html', '.xml')
+
+# Comentários e strings do CSS: as strings passam intactas pela compactação
+_CSS_COMENTARIO_OU_STRING = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', re.S)
+_CSS_ESPACOS_EM_VOLTA = re.compile(r' ?([{};,>]) ?')
+
+
+def minificar_css(texto):
+    strings = []
+
+    def separar(trecho):
+        if trecho.group().startswith('/*'):
+            return ' '
+        strings.append(trecho.group())
+        return f'\x00{len(strings) - 1}\x00'
+
+    texto = _CSS_COMENTARIO_OU_STRING.sub(separar, texto)
+    texto = re.sub(r'\s+', ' ', texto)
+    texto = _CSS_ESPACOS_EM_VOLTA.sub(r'\1', texto)
+    # Só o espaço depois do ':' sai: antes dele pode ser um seletor (ex.: "div :hover")
+    texto = texto.replace(': ', ':').replace(';}', '}')
+    return re.sub(r'\x00(\d+)\x00', lambda m: strings[int(m.group(1))], texto).strip()
+
+
+# Depois destes caracteres uma "/" abre uma expressão regular (e não é divisão)
+_JS_ANTES_DE_REGEX = set('(,=:[!&|?{};+-*%<>~^\n')
+
+
+def minificar_js(texto):
+    """
+    Tira comentários e indentação e junta espaços, mantendo uma quebra de linha onde havia
+    alguma (a inserção automática de ";" continua valendo). Strings, template strings e
+    expressões regulares são copiadas como estão.
+    """
+    saida, literais = [], []
+    i, tamanho = 0, len(texto)
+
+    def guardar(literal):
+        # Como no CSS: o literal vira um marcador para não ser alterado na limpeza das linhas
+        literais.append(literal)
+        saida.append(f'\x00{len(literais) - 1}\x00')
+
+    def anterior():
+        for trecho in reversed(saida):
+            if trecho != ' ':
+                return trecho[-1]
+        return '\n'
+
+    while i < tamanho:
+        caractere = texto[i]
+        if caractere in '\'"`':
+            fim = i + 1
+            while fim < tamanho and texto[fim] != caractere:
+                fim += 2 if texto[fim] == '\\' else 1
+            guardar(texto[i:fim + 1])
+            i = fim + 1
+        elif texto.startswith('//', i):
+            fim = texto.find('\n', i)
+            i = tamanho if fim == -1 else fim
+        elif texto.startswith('/*', i):
+            fim = texto.find('*/', i + 2)
+            i = tamanho if fim == -1 else fim + 2
+            saida.append(' ')
+        elif caractere == '/' and anterior() in _JS_ANTES_DE_REGEX:
+            fim, em_classe = i + 1, False
+            while fim < tamanho and (texto[fim] != '/' or em_classe) and texto[fim] != '\n':
+                if texto[fim] == '\\':
+                    fim += 1
+                elif texto[fim] in '[]':
+                    em_classe = texto[fim] == '['
+                fim += 1
+            guardar(texto[i:fim + 1])
+            i = fim + 1
+        elif caractere.isspace():
+            fim = i
+            while fim < tamanho and texto[fim].isspace():
+                fim += 1
+            saida.append('\n' if '\n' in texto[i:fim] else ' ')
+            i = fim
+        else:
+            fim = i
+            while fim < tamanho and texto[fim] not in '\'"`/' and not texto[fim].isspace():
+                fim += 1
+            saida.append(texto[i:max(fim, i + 1)])
+            i = max(fim, i + 1)
+
+    linhas = (linha.strip() for linha in ''.join(saida).split('\n'))
+    texto = '\n'.join(linha for linha in linhas if linha)
+    return re.sub(r'\x00(\d+)\x00', lambda m: literais[int(m.group(1))], texto)
+
+
+MINIFICADORES = {'.css': minificar_css, '.js': minificar_js}
+
+
+def comprimir(conteudo):
+    """ Versões pré-comprimidas de `conteudo` ({extensão: bytes}), só as que ficam menores. """
+    versoes = {'.gz': gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        versoes['.br'] = brotli.compress(conteudo, quality=11)
+    return {extensao: dados for extensao, dados in versoes.items() if len(dados) < len(conteudo)}
+
+
+class ArmazenamentoEstatico(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        finais = {}
+        for nome, nome_com_hash, processado in super().post_process(paths, dry_run, **options):
+            if nome_com_hash and not isinstance(processado, Exception):
+                finais[nome] = nome_com_hash
+            yield nome, nome_com_hash, processado
+
+        if dry_run:
+            return
+        # Só os arquivos do projeto (STATICFILES_DIRS) são minificados: os dos apps de terceiros
+        # (admin, wiki) já vêm prontos e não valem o risco dos minificadores simples daqui
+        diretorios = {os.path.realpath(diretorio) for diretorio in self._diretorios_do_projeto()}
+        for nome, nome_com_hash in finais.items():
+            extensao = os.path.splitext(nome_com_hash)[1].lower()
+            if extensao not in EXTENSOES_COMPRIMIDAS:
+                continue
+            with self.open(nome_com_hash) as arquivo:
+                conteudo = arquivo.read()
+            origem = getattr(paths.get(nome, (None,))[0], 'location', None)
+            # O hash vem do arquivo original: o minificado é determinístico, então o nome
+            # continua mudando junto com o conteúdo
+            if extensao in MINIFICADORES and origem and os.path.realpath(origem) in diretorios:
+                conteudo = MINIFICADORES[extensao](conteudo.decode('utf-8')).encode('utf-8')
+                self._regravar(nome_com_hash, conteudo)
+            for sufixo, dados in comprimir(conteudo).items():
+                self._regravar(nome_com_hash + sufixo, dados)
+
+    @staticmethod
+    def _diretorios_do_projeto():
+        for diretorio in settings.STATICFILES_DIRS:
+            # Entradas podem ser (prefixo, caminho)
+            yield diretorio[1] if isinstance(diretorio, (list, tuple)) else diretorio
+
+    def _regravar(self, nome, conteudo):
+        if self.exists(nome):
+            self.delete(nome)
+        self._save(nome, ContentFile(conteudo))
+
+    def stored_name(self, name):
+        # Sem manifesto (collectstatic nunca rodou) a URL só fica sem hash em desenvolvimento e
+        # nos testes (que rodam com DEBUG = False). Em produção falha como no Django: com o cache
+        # "para sempre" do servidor web, um deploy sem collectstatic serviria arquivos velhos
+        # que o navegador nunca revalida
+        if not self.hashed_files and (settings.DEBUG or getattr(settings, 'ESTATICOS_SEM_MANIFESTO', False)):
+            return name
+        return super().stored_name(name)
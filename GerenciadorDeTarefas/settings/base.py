@@ -58,6 +58,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Só age com TAREFAS_INSTRUMENTACAO = True (senão se remove da cadeia na inicialização)
+    'tasks.middleware.InstrumentacaoSQLMiddleware',
 ]
 
 ROOT_URLCONF = 'GerenciadorDeTarefas.urls'
@@ -129,6 +131,19 @@ USE_TZ = True
 STATIC_URL = 'static/'
 MEDIA_URL = 'media/'
 
+# `collectstatic` grava cada arquivo com o hash do conteúdo no nome (style.3f1c2a9b8e7d.css),
+# minifica o CSS/JS do projeto e gera as versões .gz/.br ao lado (ver GerenciadorDeTarefas/estaticos.py;
+# o .br só sai com o pacote `brotli` instalado). Como o nome muda junto com o conteúdo, o servidor
+# web pode servir STATIC_ROOT com cache longo e escolher o arquivo pré-comprimido, ex. no nginx:
+#   location /static/ { alias <STATIC_ROOT>/; expires max; add_header Cache-Control "public, immutable";
+#                       gzip_static on; brotli_static on; }
+# Sem o manifesto (collectstatic ainda não rodou) as URLs só saem sem hash com DEBUG ou
+# ESTATICOS_SEM_MANIFESTO (settings de desenvolvimento); em produção a página falha.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'GerenciadorDeTarefas.estaticos.ArmazenamentoEstatico'},
+}
+
 # STATIC_ROOT and MEDIA_ROOT will be defined in environment-specific files.
 
 
@@ -151,6 +166,59 @@ LOGOUT_REDIRECT_URL = 'home'     # Para onde vai após sair (Landing Page)
 
 # EMAIL_BACKEND will be defined in environment-specific files.
 
+# Comentários: gravados na caixa de saída (comentarios.EmailOutbox) e enviados pelo comando
+# `enviar_emails`. Falhas são reenviadas com espera crescente (N segundos, 2N, 4N... até 1h)
+# até o limite de tentativas.
+COMENTARIOS_EMAIL_DESTINATARIOS = ['samuel.bicalho@ifmg.edu.br']
+COMENTARIOS_EMAIL_MAX_TENTATIVAS = 5
+COMENTARIOS_EMAIL_ESPERA_SEGUNDOS = 60
+
+# Importação de CSV: arquivos até este tamanho são importados na própria requisição;
+# os maiores viram um ImportJob processado pelo comando `processar_importacoes`.
+TAREFAS_IMPORTACAO_SINCRONA_MAX_BYTES = 512 * 1024
+
+# Comando `arquivar_automatico`: tarefas concluídas sem alteração há mais de N dias saem da
+# lista ativa. Cada usuário pode trocar o valor (Usuarios.dias_arquivamento_automatico).
+TAREFAS_ARQUIVAMENTO_AUTOMATICO_DIAS = 30
+
+# Cache usado pelo painel (dados por usuário com chave versionada, ver tasks/cache_usuario.py).
+# A versão de cada usuário (e o ETag das páginas) fica neste cache: com mais de um worker ele
+# precisa ser compartilhado, senão uma alteração só invalida o worker que a recebeu (o
+# `check --deploy` avisa, tasks.W001, quando o backend é locmem).
+# Troque o backend conforme o deploy, ex.:
+#   'django.core.cache.backends.filebased.FileBasedCache' com 'LOCATION': BASE_DIR / 'cache'
+#   'django.core.cache.backends.db.DatabaseCache' com 'LOCATION': 'cache_tarefas' (rode createcachetable)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gerenciador-de-tarefas',
+    },
+    # Usado pela tag {% cache %} (cards de tarefa). As chaves mudam a cada alteração da tarefa,
+    # então não há expiração; as entradas antigas são descartadas ao atingir MAX_ENTRIES.
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gerenciador-de-tarefas-fragmentos',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+TAREFAS_CACHE_ALIAS = 'default'
+TAREFAS_CACHE_TIMEOUT = 60 * 60
+
+# Instrumentação por requisição (tasks/middleware.py): cabeçalho Server-Timing com SQL e
+# templates, e log "tasks.instrumentacao" das requisições acima dos limites abaixo.
+TAREFAS_INSTRUMENTACAO = os.environ.get('TAREFAS_INSTRUMENTACAO') == '1'
+TAREFAS_INSTRUMENTACAO_MAX_CONSULTAS = 50
+TAREFAS_INSTRUMENTACAO_MAX_MS = 500
+
+# Eventos ao vivo (SSE, tasks/eventos.py): de quantos em quantos segundos cada fluxo aberto
+# consulta o log no banco (alterações feitas em outros workers; no mesmo processo a entrega é
+# imediata), duração máxima de uma conexão (o navegador reconecta e retoma do último evento)
+# e por quantas horas o log é mantido (comando `limpar_eventos`).
+TAREFAS_EVENTOS_INTERVALO = 2
+TAREFAS_EVENTOS_DURACAO = 5 * 60
+TAREFAS_EVENTOS_RETENCAO_HORAS = 24
+
 # Configurações obrigatórias para o django-wiki
 SITE_ID = 1
 
@@ -14,11 +14,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Espera até 20s pelo lock de escrita em vez de falhar com "database is locked"
+        'OPTIONS': {'timeout': 20},
+        # Banco de teste em arquivo (e não em memória) para os testes de concorrência em modo WAL
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
 # Static files (CSS, JavaScript, Images)
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Sem o manifesto do collectstatic as URLs saem sem hash (os testes rodam com DEBUG = False);
+# fora do desenvolvimento o manifesto é obrigatório (ver GerenciadorDeTarefas/estaticos.py)
+ESTATICOS_SEM_MANIFESTO = True
 MEDIA_ROOT = BASE_DIR / 'media'
 
 # Extra development settings
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import EmailOutbox
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('assunto', 'status', 'tentativas', 'proxima_tentativa_em', 'criado_em', 'enviado_em')
+    list_filter = ('status',)
+    search_fields = ('assunto',)
+    readonly_fields = ('tentativas', 'ultimo_erro', 'worker', 'criado_em', 'enviado_em')
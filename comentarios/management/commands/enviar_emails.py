@@ -0,0 +1,118 @@
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from comentarios.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker que esvazia a caixa de saída de e-mails (EmailOutbox): envia em lotes por uma única '
+        'conexão com o servidor e reagenda as falhas com espera crescente. Vários workers podem rodar ao mesmo tempo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--uma-vez',
+            action='store_true',
+            help='Envia o que estiver pronto e encerra (em vez de ficar aguardando novas mensagens)',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5.0,
+            help='Segundos de espera entre verificações quando a fila está vazia (padrão: 5)',
+        )
+        parser.add_argument('--lote', type=int, default=50, help='Mensagens enviadas por conexão (padrão: 50)')
+        parser.add_argument(
+            '--abandonado-apos',
+            type=int,
+            default=15,
+            help='Minutos em envio para uma mensagem voltar à fila (padrão: 15)',
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote precisa ser positivo.')
+        self.max_tentativas = settings.COMENTARIOS_EMAIL_MAX_TENTATIVAS
+        self.espera_base = settings.COMENTARIOS_EMAIL_ESPERA_SEGUNDOS
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        totais = {'enviados': 0, 'falhas': 0}
+
+        while True:
+            self.recuperar_abandonados(options['abandonado_apos'])
+
+            lote = EmailOutbox.reivindicar_lote(worker, options['lote'])
+            if not lote:
+                if options['uma_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            enviados, falhas = self.enviar_lote(lote)
+            totais['enviados'] += enviados
+            totais['falhas'] += falhas
+            estilo = self.style.SUCCESS if not falhas else self.style.WARNING
+            self.stdout.write(estilo(f"Lote de {len(lote)}: {enviados} enviado(s), {falhas} falha(s)."))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totais['enviados']} e-mail(s) enviado(s), {totais['falhas']} falha(s)."
+        ))
+
+    def enviar_lote(self, lote):
+        """ Uma conexão (EMAIL_BACKEND) para o lote inteiro; se ela cair, é reaberta para a próxima mensagem. """
+        conexao = get_connection()
+        enviados = falhas = 0
+        try:
+            for email in lote:
+                # Lote lento: o que já foi devolvido à fila (e talvez pego por outro worker) fica para ele
+                if not email.confirmar_posse():
+                    self.stderr.write(f"E-mail {email.pk} devolvido à fila durante o lote; ignorado.")
+                    continue
+                try:
+                    # open() não faz nada com a conexão já aberta
+                    conexao.open()
+                    EmailMessage(
+                        subject=email.assunto,
+                        body=email.mensagem,
+                        from_email=email.remetente or None,
+                        to=email.destinatarios,
+                        connection=conexao,
+                    ).send()
+                except Exception as erro:
+                    email.marcar_falha(erro, self.max_tentativas, self.espera_base)
+                    falhas += 1
+                    self.stderr.write(f"E-mail {email.pk} (tentativa {email.tentativas}): {email.ultimo_erro}")
+                    # Descarta a conexão (pode ter caído no meio do envio)
+                    self.fechar(conexao)
+                else:
+                    # Marcado na hora: se o worker morrer depois, só o que não foi marcado volta à fila
+                    email.marcar_enviado()
+                    enviados += 1
+        finally:
+            self.fechar(conexao)
+        return enviados, falhas
+
+    @staticmethod
+    def fechar(conexao):
+        try:
+            conexao.close()
+        except Exception:
+            pass
+
+    def recuperar_abandonados(self, minutos):
+        """
+        Mensagens cujo worker morreu no meio do lote voltam a ficar pendentes. Se ele só estava
+        lento, não as envia nem marca mais: cada envio confirma antes que a mensagem ainda é dele.
+        """
+        limite = timezone.now() - timedelta(minutes=minutos)
+        devolvidos = EmailOutbox.objects.filter(
+            status=EmailOutbox.StatusChoices.ENVIANDO, atualizado_em__lt=limite
+        ).update(status=EmailOutbox.StatusChoices.PENDENTE, worker='')
+        if devolvidos:
+            self.stdout.write(self.style.WARNING(f"{devolvidos} e-mail(s) abandonado(s) devolvido(s) à fila."))
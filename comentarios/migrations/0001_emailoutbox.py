@@ -0,0 +1,39 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:28
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assunto', models.CharField(max_length=255, verbose_name='Assunto')),
+                ('mensagem', models.TextField(verbose_name='Mensagem')),
+                ('remetente', models.CharField(blank=True, max_length=255, verbose_name='Remetente')),
+                ('destinatarios', models.JSONField(default=list, verbose_name='Destinatários')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('proxima_tentativa_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima Tentativa')),
+                ('ultimo_erro', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('enviado_em', models.DateTimeField(blank=True, null=True, verbose_name='Enviado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Última atualização')),
+            ],
+            options={
+                'verbose_name': 'E-mail da Caixa de Saída',
+                'verbose_name_plural': 'Caixa de Saída de E-mails',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['status', 'proxima_tentativa_em'], name='outbox_fila_idx')],
+            },
+        ),
+    ]
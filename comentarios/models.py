@@ -1,3 +1,127 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+# Caixa de saída de e-mails: a view só grava a mensagem e responde; o comando `enviar_emails`
+# entrega em lotes por uma única conexão SMTP, com novas tentativas e espera crescente.
+class EmailOutbox(models.Model):
+    class StatusChoices(models.TextChoices):
+        PENDENTE = 'pendente', 'Pendente'
+        ENVIANDO = 'enviando', 'Enviando'
+        ENVIADO = 'enviado', 'Enviado'
+        FALHOU = 'falhou', 'Falhou'
+
+    assunto = models.CharField(max_length=255, verbose_name='Assunto')
+    mensagem = models.TextField(verbose_name='Mensagem')
+    remetente = models.CharField(max_length=255, blank=True, verbose_name='Remetente')
+    destinatarios = models.JSONField(default=list, verbose_name='Destinatários')
+
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDENTE,
+        verbose_name='Status'
+    )
+    tentativas = models.PositiveIntegerField(default=0, verbose_name='Tentativas')
+    proxima_tentativa_em = models.DateTimeField(default=timezone.now, verbose_name='Próxima Tentativa')
+    ultimo_erro = models.TextField(blank=True, verbose_name='Último Erro')
+
+    # Identifica qual worker pegou a mensagem (ex.: host:pid)
+    worker = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    enviado_em = models.DateTimeField(null=True, blank=True, verbose_name='Enviado em')
+    # Usado para devolver à fila as mensagens de um worker que morreu no meio do lote
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Última atualização')
+
+    @classmethod
+    def enfileirar(cls, assunto, mensagem, destinatarios, remetente=None):
+        """ Grava a mensagem para envio posterior (não abre conexão SMTP). """
+        return cls.objects.create(
+            assunto=assunto,
+            mensagem=mensagem,
+            destinatarios=list(destinatarios),
+            remetente=settings.DEFAULT_FROM_EMAIL if remetente is None else remetente,
+        )
+
+    @classmethod
+    def reivindicar_lote(cls, worker, limite):
+        """
+        Pega até `limite` mensagens prontas para envio. Como em ImportJob.reivindicar_proximo,
+        a troca de status é um UPDATE condicional (WHERE status = 'pendente'): se dois workers
+        escolherem as mesmas linhas, cada uma fica com um só deles.
+        """
+        agora = timezone.now()
+        candidatos = list(cls.objects.filter(
+            status=cls.StatusChoices.PENDENTE, proxima_tentativa_em__lte=agora
+        ).order_by('proxima_tentativa_em', 'id').values_list('id', flat=True)[:limite])
+        if not candidatos:
+            return []
+
+        cls.objects.filter(pk__in=candidatos, status=cls.StatusChoices.PENDENTE).update(
+            status=cls.StatusChoices.ENVIANDO,
+            worker=worker,
+            atualizado_em=agora,
+        )
+        return list(cls.objects.filter(
+            pk__in=candidatos, status=cls.StatusChoices.ENVIANDO, worker=worker
+        ).order_by('proxima_tentativa_em', 'id'))
+
+    def _reivindicada(self):
+        """
+        A linha só enquanto ainda é deste worker. Uma mensagem devolvida à fila por parecer
+        abandonada (e talvez já pega por outro worker) não é mais enviada nem marcada por ele.
+        """
+        return type(self).objects.filter(pk=self.pk, status=self.StatusChoices.ENVIANDO, worker=self.worker)
+
+    def confirmar_posse(self):
+        """ Renova o batimento logo antes do envio; False se a mensagem não é mais deste worker. """
+        return bool(self._reivindicada().update(atualizado_em=timezone.now()))
+
+    def marcar_enviado(self):
+        reivindicada = self._reivindicada()
+        self.status = self.StatusChoices.ENVIADO
+        self.enviado_em = timezone.now()
+        self.ultimo_erro = ''
+        return bool(reivindicada.update(
+            status=self.status, enviado_em=self.enviado_em, ultimo_erro='', atualizado_em=self.enviado_em,
+        ))
+
+    def marcar_falha(self, erro, max_tentativas, espera_base):
+        """
+        Conta a tentativa e reagenda com espera exponencial (espera_base * 2^(n-1) segundos,
+        até uma hora). Esgotadas as tentativas, a mensagem fica como 'falhou' para análise no admin.
+        """
+        reivindicada = self._reivindicada()
+        self.tentativas += 1
+        self.ultimo_erro = f'{type(erro).__name__}: {erro}'
+        self.worker = ''
+        if self.tentativas >= max_tentativas:
+            self.status = self.StatusChoices.FALHOU
+        else:
+            self.status = self.StatusChoices.PENDENTE
+            espera = min(espera_base * 2 ** (self.tentativas - 1), 60 * 60)
+            self.proxima_tentativa_em = timezone.now() + timedelta(seconds=espera)
+        return bool(reivindicada.update(
+            tentativas=self.tentativas,
+            ultimo_erro=self.ultimo_erro,
+            worker='',
+            status=self.status,
+            proxima_tentativa_em=self.proxima_tentativa_em,
+            atualizado_em=timezone.now(),
+        ))
+
+    def __str__(self):
+        return f"{self.assunto} ({self.get_status_display()})"
 
-# Create your models here.
+    class Meta:
+        verbose_name = 'E-mail da Caixa de Saída'
+        verbose_name_plural = 'Caixa de Saída de E-mails'
+        ordering = ['-criado_em']
+        indexes = [
+            # Fila: WHERE status = 'pendente' AND proxima_tentativa_em <= agora ORDER BY proxima_tentativa_em
+            models.Index(fields=['status', 'proxima_tentativa_em'], name='outbox_fila_idx'),
+        ]
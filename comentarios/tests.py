@@ -1,3 +1,114 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPServerDisconnected
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from comentarios.models import EmailOutbox
+
+
+class BackendContado(LocmemBackend):
+    """ locmem que conta quantas conexões o worker criou. """
+    conexoes = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        BackendContado.conexoes += 1
+
+
+class BackendForaDoAr(BaseEmailBackend):
+    """ Simula um servidor SMTP inacessível. """
+    def send_messages(self, email_messages):
+        raise SMTPServerDisconnected('servidor fora do ar')
+
+
+class BackendLento(LocmemBackend):
+    """ Enquanto envia a primeira mensagem, a segunda é dada como abandonada e pega por outro worker. """
+    def send_messages(self, email_messages):
+        EmailOutbox.objects.filter(assunto='Assunto 1').update(worker='outro:2')
+        return super().send_messages(email_messages)
+
+
+class ComentarioViewTest(TestCase):
+    def test_comentario_vai_para_a_caixa_de_saida(self):
+        resposta = self.client.post(reverse('comentarios'), {'nome': 'Ana', 'comentario': 'Muito bom!'})
+        self.assertRedirects(resposta, reverse('comentario_aceito'), fetch_redirect_response=False)
+        # Nada enviado na requisição
+        self.assertEqual(mail.outbox, [])
+
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.assunto, email.status), ('Novo Comentário: Ana', EmailOutbox.StatusChoices.PENDENTE))
+        self.assertIn('Muito bom!', email.mensagem)
+
+
+class EnviarEmailsCommandTest(TestCase):
+    def enfileirar(self, quantidade):
+        return [
+            EmailOutbox.enfileirar(f'Assunto {indice}', 'Corpo', ['destino@example.com'])
+            for indice in range(quantidade)
+        ]
+
+    @override_settings(EMAIL_BACKEND='comentarios.tests.BackendContado')
+    def test_envia_em_lotes_com_uma_conexao_por_lote(self):
+        BackendContado.conexoes = 0
+        self.enfileirar(5)
+
+        out = StringIO()
+        call_command('enviar_emails', '--uma-vez', '--lote', '2', stdout=out)
+        self.assertIn('5 e-mail(s) enviado(s), 0 falha(s)', out.getvalue())
+        self.assertEqual(sorted(email.subject for email in mail.outbox), [f'Assunto {indice}' for indice in range(5)])
+        # 3 lotes (2 + 2 + 1), uma conexão cada
+        self.assertEqual(BackendContado.conexoes, 3)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.StatusChoices.ENVIADO).exists())
+
+        # Já enviados não saem de novo
+        call_command('enviar_emails', '--uma-vez', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(COMENTARIOS_EMAIL_MAX_TENTATIVAS=2, COMENTARIOS_EMAIL_ESPERA_SEGUNDOS=60)
+    def test_falha_reagenda_com_espera_e_desiste_no_limite(self):
+        email, = self.enfileirar(1)
+
+        with override_settings(EMAIL_BACKEND='comentarios.tests.BackendForaDoAr'):
+            call_command('enviar_emails', '--uma-vez', stdout=StringIO(), stderr=StringIO())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.tentativas), (EmailOutbox.StatusChoices.PENDENTE, 1))
+        self.assertIn('servidor fora do ar', email.ultimo_erro)
+        self.assertGreater(email.proxima_tentativa_em, timezone.now() + timedelta(seconds=50))
+
+        # Ainda esperando: o worker não tenta de novo antes da hora
+        call_command('enviar_emails', '--uma-vez', stdout=StringIO())
+        self.assertEqual(mail.outbox, [])
+
+        EmailOutbox.objects.update(proxima_tentativa_em=timezone.now())
+        with override_settings(EMAIL_BACKEND='comentarios.tests.BackendForaDoAr'):
+            call_command('enviar_emails', '--uma-vez', stdout=StringIO(), stderr=StringIO())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.tentativas), (EmailOutbox.StatusChoices.FALHOU, 2))
+
+    def test_recupera_mensagens_abandonadas(self):
+        email, = self.enfileirar(1)
+        EmailOutbox.objects.update(
+            status=EmailOutbox.StatusChoices.ENVIANDO, worker='morto:1',
+            atualizado_em=timezone.now() - timedelta(hours=1),
+        )
+        out = StringIO()
+        call_command('enviar_emails', '--uma-vez', stdout=out)
+        self.assertIn('1 e-mail(s) abandonado(s)', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND='comentarios.tests.BackendLento')
+    def test_lote_lento_nao_envia_o_que_voltou_a_fila(self):
+        primeiro, segundo = self.enfileirar(2)
+        err = StringIO()
+        call_command('enviar_emails', '--uma-vez', stdout=StringIO(), stderr=err)
+
+        self.assertEqual([email.subject for email in mail.outbox], ['Assunto 0'])
+        self.assertIn(f'E-mail {segundo.pk} devolvido à fila', err.getvalue())
+        segundo.refresh_from_db()
+        self.assertEqual((segundo.status, segundo.worker), (EmailOutbox.StatusChoices.ENVIANDO, 'outro:2'))
@@ -1,8 +1,8 @@
-from django.core.mail import send_mail
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.conf import settings 
 from comentarios.forms import FormularioComentario
+from comentarios.models import EmailOutbox
 
 def comentario(request):
     if request.method == 'POST':
@@ -13,19 +13,14 @@ def comentario(request):
             
             mensagem = f"Recebido comentário de {nome}\n\n{comentario_texto}"
             
-            # Disparo do e-mail
-            try:
-                send_mail(
-                    subject=f"Novo Comentário: {nome}",
-                    message=mensagem,
-                    from_email=settings.EMAIL_HOST_USER, 
-                    recipient_list=['samuel.bicalho@ifmg.edu.br'],
-                    fail_silently=False,
-                )
-            except Exception as e:
-                # Opcional: registrar o erro ou avisar o usuário
-                print(f"Erro ao enviar e-mail: {e}")
-                
+            # Só grava na caixa de saída: o comando `enviar_emails` faz o envio fora da requisição
+            EmailOutbox.enfileirar(
+                assunto=f"Novo Comentário: {nome}",
+                mensagem=mensagem,
+                destinatarios=settings.COMENTARIOS_EMAIL_DESTINATARIOS,
+                remetente=settings.EMAIL_HOST_USER,
+            )
+
             return redirect("comentario_aceito")
     else:
         form = FormularioComentario()
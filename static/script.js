@@ -4,34 +4,25 @@ document.addEventListener('DOMContentLoaded', () => {
     
     // --- 1. Inicialização: Verifica o estado inicial das tarefas ao carregar ---
     // Isso garante que tarefas que já vieram 100% do banco de dados fiquem verdes/riscadas
-    const allTasks = document.querySelectorAll('.task-item');
-    allTasks.forEach(task => {
-        updateProgressBar(task);
+    // e liga o acordeão (Abrir/Fechar) de cada card
+    document.querySelectorAll('.task-item').forEach(inicializarTarefa);
+
+    // --- 2. "Carregar mais" das listas paginadas por cursor ---
+    document.addEventListener('click', (e) => {
+        const link = e.target.closest('[data-load-more]');
+        if (!link) return;
+        e.preventDefault();
+        carregarMais(link);
     });
 
-    // --- 2. Lógica do Acordeão (Abrir/Fechar) ---
-    const headers = document.querySelectorAll('.task-header');
-    
-    if (headers) { 
-        headers.forEach(header => {
-            header.addEventListener('click', (e) => {
-                // Impede que o acordeão abra/feche se clicar em links ou inputs dentro do header
-                if (e.target.closest('a') || e.target.closest('input') || e.target.closest('label')) return;
-
-                const item = header.parentElement; 
-                item.classList.toggle('active');
-                
-                // Gira o ícone
-                const icon = header.querySelector('.accordion-icon');
-                if(icon) {
-                    // Se tiver a classe active, gira 180, senão volta pra 0
-                    icon.style.transform = item.classList.contains('active') ? 'rotate(180deg)' : 'rotate(0deg)';
-                }
-            });
-        });
-    }
+    // --- 3. Atualizações ao vivo (SSE) no painel e na lista ---
+    conectarEventos();
 
-    // --- 3. Lógica para adicionar novas etapas (se houver botão) ---
+    // --- 4. Formulário de ações em lote (lista) e progresso da importação ---
+    iniciarAcoesEmLote();
+    acompanharImportacao();
+
+    // --- 5. Lógica para adicionar novas etapas (se houver botão) ---
     const addBtn = document.getElementById('add-etapa-btn');
     if (addBtn) {
         const container = document.getElementById('etapas-container');
@@ -51,6 +42,273 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 });
 
+// --- Prepara um card de tarefa (na carga da página ou vindo do "Carregar mais") ---
+function inicializarTarefa(task) {
+    updateProgressBar(task);
+
+    const header = task.querySelector('.task-header');
+    if (!header) return;
+
+    header.addEventListener('click', (e) => {
+        // Impede que o acordeão abra/feche se clicar em links ou inputs dentro do header
+        if (e.target.closest('a') || e.target.closest('input') || e.target.closest('label')) return;
+
+        task.classList.toggle('active');
+        
+        // Gira o ícone
+        const icon = header.querySelector('.accordion-icon');
+        if(icon) {
+            // Se tiver a classe active, gira 180, senão volta pra 0
+            icon.style.transform = task.classList.contains('active') ? 'rotate(180deg)' : 'rotate(0deg)';
+        }
+    });
+}
+
+// --- Busca a próxima página (cursor) e acrescenta os itens na lista ---
+function carregarMais(link) {
+    const alvo = document.querySelector(link.dataset.loadMore);
+    const wrapper = link.closest('.load-more-wrapper');
+    const url = new URL(link.href, window.location.href);
+    url.searchParams.set('parcial', '1');
+
+    link.textContent = 'Carregando...';
+
+    fetch(url)
+        .then(response => response.text())
+        .then(html => {
+            const template = document.createElement('template');
+            template.innerHTML = html;
+
+            const novoBotao = template.content.querySelector('.load-more-wrapper');
+            if (novoBotao) novoBotao.remove();
+
+            const novos = Array.from(template.content.children);
+            // O botão pode estar dentro da lista (cards) ou depois dela (tabela)
+            if (alvo.contains(wrapper)) {
+                wrapper.before(...novos);
+            } else {
+                alvo.append(...novos);
+            }
+            novos.filter(el => el.classList.contains('task-item')).forEach(inicializarTarefa);
+
+            if (novoBotao) {
+                wrapper.replaceWith(novoBotao);
+            } else {
+                wrapper.remove();
+            }
+        })
+        .catch(error => {
+            console.error('Erro ao carregar mais tarefas:', error);
+            link.textContent = 'Carregar mais';
+        });
+}
+
+// --- Fluxo de eventos (Server-Sent Events): etapas e status alterados em outras abas ---
+function conectarEventos() {
+    const origem = document.querySelector('[data-eventos-url]');
+    if (!origem || !window.EventSource) return;
+
+    // O EventSource reconecta sozinho (mandando o último id recebido) quando o servidor fecha o fluxo
+    const fonte = new EventSource(origem.dataset.eventosUrl);
+    fonte.addEventListener('tarefa', (e) => {
+        const dados = JSON.parse(e.data);
+        atualizarCardsDaTarefa(dados);
+        // Outras páginas (ex.: o painel) atualizam os próprios cards a partir deste evento
+        document.dispatchEvent(new CustomEvent('tarefa-atualizada', { detail: dados }));
+    });
+}
+
+// --- Aplica um evento nos cards da lista (.task-item) da tarefa, sem recarregar a página ---
+function atualizarCardsDaTarefa(dados) {
+    document.querySelectorAll(`.task-item[data-tarefa-id="${dados.tarefa_id}"]`).forEach(taskItem => {
+        // Arquivada ou excluída em outra aba (inclusive pelas ações em lote)
+        if (dados.removida) {
+            taskItem.remove();
+            return;
+        }
+        if (dados.etapa_id !== null) {
+            const checkbox = taskItem.querySelector(`input[data-etapa-id="${dados.etapa_id}"]`);
+            if (checkbox) {
+                checkbox.checked = dados.etapa_concluida;
+                const listItem = checkbox.closest('.step-item');
+                if (listItem) listItem.classList.toggle('completed', dados.etapa_concluida);
+            }
+        }
+
+        // Progresso e status vêm do servidor (valem também para edições feitas no formulário)
+        const progressBar = taskItem.querySelector('.progress-bar-fill');
+        const progressText = taskItem.querySelector('.progress-text');
+        if (progressBar) progressBar.style.width = dados.progresso + '%';
+        if (progressText) progressText.innerText = dados.etapas_concluidas + '/' + dados.etapas_total;
+        taskItem.classList.toggle('task-finished', dados.etapas_total > 0 && dados.progresso === 100);
+
+        const statusBadge = taskItem.querySelector('.task-status');
+        if (statusBadge) {
+            statusBadge.textContent = dados.status_label;
+            statusBadge.className = 'task-status status-' + dados.status;
+        }
+        const categoria = taskItem.querySelector('.task-category');
+        if (categoria) {
+            categoria.textContent = dados.categoria_nome || '';
+            categoria.style.backgroundColor = dados.categoria_cor || '';
+        }
+        const archiveBtn = document.getElementById(`btn-archive-${dados.tarefa_id}`);
+        if (archiveBtn) archiveBtn.hidden = dados.status !== 'concluida';
+    });
+}
+
+// --- Ações em lote: mostra só os campos da ação escolhida e confirma a exclusão ---
+function iniciarAcoesEmLote() {
+    const form = document.getElementById('form-lote');
+    if (!form) return;
+    const acao = form.querySelector('[name="acao"]');
+    const todas = form.querySelector('[name="todas"]');
+
+    function atualizarCampos() {
+        form.querySelectorAll('[data-lote-valor]').forEach(function (campo) {
+            campo.hidden = campo.dataset.loteValor !== acao.value;
+        });
+        form.querySelector('[data-lote-filtro]').hidden = !todas.checked;
+    }
+    acao.addEventListener('change', atualizarCampos);
+    todas.addEventListener('change', atualizarCampos);
+    atualizarCampos();
+
+    form.addEventListener('submit', function (evento) {
+        if (acao.value === 'deletar' && !confirm('Excluir as tarefas selecionadas? Esta ação não pode ser desfeita.')) {
+            evento.preventDefault();
+        }
+    });
+}
+
+// --- Importação de CSV em segundo plano: consulta o progresso até o job terminar ---
+function acompanharImportacao() {
+    const painel = document.getElementById('import-job');
+    if (!painel) return;
+
+    function atualizar() {
+        fetch(painel.dataset.url)
+            .then(response => response.json())
+            .then(job => {
+                document.getElementById('import-job-status').textContent = job.status_display;
+                document.getElementById('import-job-linhas').textContent = job.linhas_processadas;
+                document.getElementById('import-job-tarefas').textContent = job.tarefas_criadas;
+
+                const lista = document.getElementById('import-job-erros');
+                lista.innerHTML = '';
+                job.erros.forEach(([linha, mensagem]) => {
+                    const item = document.createElement('li');
+                    item.textContent = `Linha ${linha}: ${mensagem}`;
+                    lista.appendChild(item);
+                });
+
+                if (!job.finalizado) {
+                    setTimeout(atualizar, 2000);
+                }
+            })
+            .catch(error => console.error('Erro ao consultar a importação:', error));
+    }
+
+    atualizar();
+}
+
+// --- Painel: cards de estatística abrem a lista de tarefas do grupo ---
+function showTasks(type) {
+    const containers = document.querySelectorAll('.category-tasks');
+    const mainContainer = document.getElementById('task-details-container');
+    const titleHeader = document.getElementById('details-title');
+
+    const titles = {
+        'hoje': 'Tarefas para Hoje',
+        'foco': 'Foco Atual',
+        'atrasadas': 'Tarefas Atrasadas',
+        'concluidas': 'Tarefas Concluídas'
+    };
+
+    titleHeader.innerText = titles[type];
+
+    containers.forEach(c => {
+        c.hidden = true;
+    });
+
+    const activeList = document.getElementById('list-' + type);
+    if (activeList) {
+        activeList.hidden = false;
+    }
+
+    mainContainer.style.display = 'block';
+
+    // Scroll suave ate o container
+    setTimeout(() => {
+        mainContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    }, 100);
+}
+
+function closeDetails() {
+    const mainContainer = document.getElementById('task-details-container');
+    mainContainer.style.opacity = '0';
+    setTimeout(() => {
+        mainContainer.style.display = 'none';
+        mainContainer.style.opacity = '1';
+    }, 300);
+}
+
+// O risco no texto vem do CSS (.steps-grid .step-item.completed)
+function marcarEtapaDashboard(checkbox) {
+    checkbox.closest('.step-item').classList.toggle('completed', checkbox.checked);
+}
+
+function toggleStepDashboard(checkbox) {
+    const etapaId = checkbox.getAttribute('data-etapa-id');
+
+    // Feedback visual imediato
+    marcarEtapaDashboard(checkbox);
+
+    fetch(`/tarefas/api/etapa/${etapaId}/toggle/`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'sucesso') {
+            // Atualiza o badge de status da tarefa
+            const taskItem = checkbox.closest('.task-item-detail');
+            const statusBadge = taskItem.querySelector('.task-status');
+            if (statusBadge) {
+                statusBadge.textContent = data.tarefa_status;
+                statusBadge.className = 'task-status status-' + data.tarefa_status_code;
+            }
+        }
+    })
+    .catch(error => console.error('Erro ao atualizar etapa:', error));
+}
+
+// Alterações feitas em outras abas chegam pelo fluxo SSE (ver conectarEventos).
+// A mesma tarefa pode aparecer em mais de uma lista do painel: todas as cópias são atualizadas.
+document.addEventListener('tarefa-atualizada', (e) => {
+    const dados = e.detail;
+    document.querySelectorAll(`.task-item-detail[data-tarefa-id="${dados.tarefa_id}"]`).forEach(card => {
+        if (dados.removida) {
+            card.remove();
+            return;
+        }
+        const statusBadge = card.querySelector('.task-status');
+        if (statusBadge) {
+            statusBadge.textContent = dados.status_label;
+            statusBadge.className = 'task-status status-' + dados.status;
+        }
+        if (dados.etapa_id === null) return;
+        const checkbox = card.querySelector(`input[data-etapa-id="${dados.etapa_id}"]`);
+        if (checkbox && checkbox.checked !== dados.etapa_concluida) {
+            checkbox.checked = dados.etapa_concluida;
+            marcarEtapaDashboard(checkbox);
+        }
+    });
+});
+
 // --- Função Global chamada pelo onchange no HTML ---
 function toggleStep(checkbox) {
     const etapaId = checkbox.getAttribute('data-etapa-id');
@@ -85,13 +343,7 @@ function toggleStep(checkbox) {
                 // Toggle Archive Button
                 if (data.tarefa_id) {
                     const archiveBtn = document.getElementById(`btn-archive-${data.tarefa_id}`);
-                    if (archiveBtn) {
-                        if (data.tarefa_status_code === 'concluida') {
-                            archiveBtn.style.display = ''; // Shows the button
-                        } else {
-                            archiveBtn.style.display = 'none'; // Hides the button
-                        }
-                    }
+                    if (archiveBtn) archiveBtn.hidden = data.tarefa_status_code !== 'concluida';
                 }
             }
         }
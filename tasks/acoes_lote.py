@@ -0,0 +1,80 @@
+"""
+Ações em lote sobre as tarefas ativas do usuário (tela "Minhas Tarefas").
+
+Cada ação é um único UPDATE/DELETE com escopo no usuário (ids selecionados ou filtro), sem
+carregar nem salvar as instâncias (arquivar move as linhas com INSERT ... SELECT, ver
+tasks/arquivamento.py). Como update() e o DELETE em lote não passam pelos sinais,
+os efeitos colaterais (cache, índice de busca, snapshot de atrasadas, eventos das outras
+abas) são tratados aqui, uma vez por lote.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import arquivamento, cache_usuario
+from .models import EventoTarefa, Tarefa
+
+ARQUIVAR = 'arquivar'
+STATUS = 'status'
+CATEGORIA = 'categoria'
+FOCO = 'foco'
+DELETAR = 'deletar'
+
+ACOES = [
+    (ARQUIVAR, 'Arquivar concluídas'),
+    (STATUS, 'Alterar status'),
+    (CATEGORIA, 'Alterar categoria'),
+    (FOCO, 'Alternar foco'),
+    (DELETAR, 'Excluir'),
+]
+
+# Ações que mudam quem está atrasado (arquivar já tira as tarefas do snapshot)
+ACOES_QUE_MUDAM_ATRASO = {STATUS}
+
+# Teto de ids por requisição; para mais que isso, use o filtro
+LIMITE_IDS = 1000
+
+
+def escopo(usuario, ids=None, status=None, categoria=None):
+    """ Tarefas ativas do usuário: as selecionadas (ids) ou todas as que passam no filtro. """
+    tarefas = Tarefa.objects.filter(usuario=usuario, arquivada=False)
+    if ids is not None:
+        tarefas = tarefas.filter(pk__in=ids)
+    if status:
+        tarefas = tarefas.filter(status=status)
+    if categoria is not None:
+        tarefas = tarefas.filter(categoria=categoria)
+    return tarefas.order_by()
+
+
+def executar(usuario, tarefas, acao, valor=None):
+    """ Aplica `acao` às `tarefas` (ver escopo()) e devolve quantas foram afetadas. """
+    # update() não passa pelo auto_now: atualizada_em vai explícito (chave do cache dos cards)
+    agora = timezone.now()
+    with transaction.atomic():
+        if acao != ARQUIVAR:
+            # Antes da alteração: depois dela o filtro (ex.: por status) já não casa com as mesmas tarefas
+            ids = list(tarefas.values_list('pk', flat=True))
+        if acao == ARQUIVAR:
+            # Mesma regra do arquivar_tarefa: só tarefas concluídas, movidas para o arquivo frio
+            afetadas = arquivamento.arquivar(tarefas.filter(status=Tarefa.StatusChoices.CONCLUIDA))
+        elif acao == STATUS:
+            afetadas = tarefas.update(status=valor, atualizada_em=agora)
+        elif acao == CATEGORIA:
+            afetadas = tarefas.update(categoria=valor, atualizada_em=agora)
+        elif acao == FOCO:
+            afetadas = tarefas.update(is_foco_atual=~F('is_foco_atual'), atualizada_em=agora)
+        elif acao == DELETAR:
+            afetadas = tarefas.excluir_em_lote()
+        else:
+            raise ValueError(f'Ação em lote desconhecida: {acao}')
+
+        if afetadas:
+            if acao in ACOES_QUE_MUDAM_ATRASO:
+                # Só as tarefas do lote: as demais do usuário não mudaram
+                Tarefa.objects.filter(pk__in=ids).sincronizar_atrasos()
+            if acao != ARQUIVAR:
+                # Arquivar publica os próprios eventos (ver arquivamento.arquivar)
+                EventoTarefa.objects.publicar_em_lote(usuario.pk, ids, removidas=acao == DELETAR)
+            cache_usuario.invalidar(usuario.pk)
+    return afetadas
@@ -1,5 +1,17 @@
 from django.contrib import admin
-from .models import CategoriaDeTarefa, Tarefa, Etapa, BaseConhecimento
+from django.db.models.expressions import RawSQL
+from . import busca
+from .models import CategoriaDeTarefa, Tarefa, TarefaArquivada, TarefaAtrasada, Etapa, BaseConhecimento, ImportJob
+
+class BuscaTextualMixin:
+    """ Troca o LIKE '%termo%' da busca do admin pelo índice FTS5 (quando disponível). """
+    tipo_busca = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not busca.disponivel() or not busca.montar_consulta(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        sql, params = busca.sql_ids_correspondentes(self.tipo_busca, search_term)
+        return queryset.filter(pk__in=RawSQL(sql, params)), False
 
 # 1. Configuração para Categorias
 @admin.register(CategoriaDeTarefa)
@@ -9,7 +21,8 @@ class CategoriaAdmin(admin.ModelAdmin):
 
 # 2. Configuração para Base de Conhecimento
 @admin.register(BaseConhecimento)
-class BaseConhecimentoAdmin(admin.ModelAdmin):
+class BaseConhecimentoAdmin(BuscaTextualMixin, admin.ModelAdmin):
+    tipo_busca = busca.TIPO_CONHECIMENTO
     list_display = ('titulo', 'usuario')
     search_fields = ('titulo', 'conteudo_markdown')
 
@@ -21,14 +34,15 @@ class EtapaInline(admin.TabularInline):
 
 # 4. Configuração da Tarefa (Com as Etapas dentro)
 @admin.register(Tarefa)
-class TarefaAdmin(admin.ModelAdmin):
+class TarefaAdmin(BuscaTextualMixin, admin.ModelAdmin):
+    tipo_busca = busca.TIPO_TAREFA
     # Colunas na tabela de listagem
     list_display = ('titulo', 'categoria', 'status', 'is_foco_atual', 'data_conclusao')
     
     # Filtros laterais
     list_filter = ('status', 'is_foco_atual', 'categoria')
     
-    # Barra de busca
+    # Barra de busca (atendida pelo índice FTS5, ver BuscaTextualMixin)
     search_fields = ('titulo', 'descricao')
     
     # Permite editar o status clicando direto na lista (sem abrir a tarefa)
@@ -36,3 +50,40 @@ class TarefaAdmin(admin.ModelAdmin):
     
     # Adiciona as etapas dentro da edição da tarefa
     inlines = [EtapaInline]
+
+
+# 5. Acompanhamento das importações de CSV em segundo plano
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('nome_original', 'usuario', 'status', 'linhas_processadas', 'tarefas_criadas', 'criado_em', 'worker')
+    list_filter = ('status',)
+    readonly_fields = ('linhas_processadas', 'tarefas_criadas', 'etapas_criadas', 'erros', 'worker',
+                       'iniciado_em', 'finalizado_em')
+
+
+# 6. Snapshot das tarefas atrasadas (somente leitura: mantido pelo comando `atualizar_atrasadas`)
+@admin.register(TarefaAtrasada)
+class TarefaAtrasadaAdmin(admin.ModelAdmin):
+    list_display = ('tarefa', 'usuario', 'data_conclusao', 'faixa')
+    list_filter = ('faixa',)
+    list_select_related = ('tarefa', 'usuario')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# 7. Arquivo frio (somente leitura: as tarefas entram e saem por tasks/arquivamento.py)
+@admin.register(TarefaArquivada)
+class TarefaArquivadaAdmin(admin.ModelAdmin):
+    list_display = ('titulo', 'usuario', 'categoria', 'status', 'arquivada_em')
+    list_select_related = ('usuario', 'categoria')
+    search_fields = ('titulo',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,218 @@
+"""
+API JSON somente leitura de tarefas, etapas e categorias (sob /tarefas/api/).
+
+Parâmetros comuns:
+  fields=a,b,c   campos devolvidos (mapeados direto para .values(), sem instanciar models)
+  ids=1,2,3      busca em lote (até LIMITE_IDS itens, sem paginação)
+  cursor=...     próxima página (paginação por cursor, ordenada do id mais novo para o mais antigo)
+  tamanho=N      itens por página (até TAMANHO_MAXIMO)
+
+As views são assíncronas (ORM assíncrono): sob ASGI não ocupam uma thread enquanto esperam o banco.
+"""
+from datetime import date
+from functools import wraps
+
+from django.db.models import F, Value
+from django.http import JsonResponse
+
+from . import assincrono
+from .condicional import condicional_por_usuario
+from .models import CategoriaDeTarefa, Etapa, EtapaArquivada, Tarefa, TarefaArquivada
+from .paginacao import apaginar_por_cursor
+
+TAMANHO_PADRAO = 50
+TAMANHO_MAXIMO = 200
+LIMITE_IDS = 100
+
+# Nome público do campo -> caminho no ORM
+CAMPOS_TAREFA = {
+    'id': 'id',
+    'titulo': 'titulo',
+    'descricao': 'descricao',
+    'status': 'status',
+    'data_inicio': 'data_inicio',
+    'data_conclusao': 'data_conclusao',
+    'is_foco_atual': 'is_foco_atual',
+    'arquivada': 'arquivada',
+    'categoria': 'categoria',  # .values('categoria') já devolve o id
+    'categoria_nome': 'categoria__nome',
+    'etapas_total': 'etapas_total',
+    'etapas_concluidas': 'etapas_concluidas',
+    'criada_em': 'criada_em',
+    'atualizada_em': 'atualizada_em',
+}
+CAMPOS_PADRAO_TAREFA = [
+    'id', 'titulo', 'status', 'data_conclusao', 'is_foco_atual', 'categoria',
+    'etapas_total', 'etapas_concluidas', 'atualizada_em',
+]
+# Campo extra da tarefa: as etapas vêm numa única consulta para a página inteira
+CAMPO_ETAPAS = 'etapas'
+
+CAMPOS_ETAPA = {
+    'id': 'id',
+    'tarefa': 'tarefa',
+    'descricao': 'descricao',
+    'concluida': 'concluida',
+    'ordem': 'ordem',
+}
+CAMPOS_PADRAO_ETAPA = list(CAMPOS_ETAPA)
+
+CAMPOS_CATEGORIA = {
+    'id': 'id',
+    'nome': 'nome',
+    'cor': 'cor',
+    'criado_em': 'criado_em',
+}
+CAMPOS_PADRAO_CATEGORIA = list(CAMPOS_CATEGORIA)
+
+
+class ErroApi(Exception):
+    pass
+
+
+def _api_view(view):
+    """ Sessão obrigatória (401 em JSON em vez do redirect para o login), só GET, erros viram 400. """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        usuario = await assincrono.carregar_usuario(request)
+        if not usuario.is_authenticated:
+            return JsonResponse({'erro': 'Autenticação necessária.'}, status=401)
+        try:
+            return await view(request, *args, **kwargs)
+        except ErroApi as erro:
+            return JsonResponse({'erro': str(erro)}, status=400)
+    return assincrono.require_GET(condicional_por_usuario(wrapper))
+
+
+def _lista_parametro(request, nome):
+    valor = request.GET.get(nome, '')
+    return [item.strip() for item in valor.split(',') if item.strip()]
+
+
+def _inteiros(request, nome):
+    try:
+        return [int(valor) for valor in _lista_parametro(request, nome)]
+    except ValueError:
+        raise ErroApi(f'"{nome}" deve ser uma lista de números separados por vírgula.')
+
+
+def _data(request, nome):
+    valor = request.GET.get(nome)
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ErroApi(f'"{nome}" deve ser uma data no formato AAAA-MM-DD.')
+
+
+def _booleano(request, nome):
+    valor = request.GET.get(nome)
+    if valor is None or valor == '':
+        return None
+    if valor.lower() in ('1', 'true', 'sim'):
+        return True
+    if valor.lower() in ('0', 'false', 'nao', 'não'):
+        return False
+    raise ErroApi(f'"{nome}" deve ser true ou false.')
+
+
+def _campos(request, disponiveis, padrao, extras=()):
+    pedidos = _lista_parametro(request, 'fields') or padrao
+    invalidos = [campo for campo in pedidos if campo not in disponiveis and campo not in extras]
+    if invalidos:
+        raise ErroApi(f'Campos desconhecidos: {", ".join(invalidos)}.')
+    # O id sempre vem: é a chave do cursor e da busca em lote
+    return ['id'] + [campo for campo in pedidos if campo != 'id']
+
+
+def _values(queryset, campos, disponiveis):
+    """ .values() com os nomes públicos (ex.: categoria_nome=F('categoria__nome')). """
+    diretos = [campo for campo in campos if disponiveis.get(campo) == campo]
+    renomeados = {campo: F(disponiveis[campo]) for campo in campos if campo in disponiveis and disponiveis[campo] != campo}
+    return queryset.values(*diretos, **renomeados)
+
+
+async def _responder(request, queryset, campos, disponiveis, depois=None):
+    linhas = _values(queryset, campos, disponiveis)
+
+    ids = _inteiros(request, 'ids')
+    if ids:
+        if len(ids) > LIMITE_IDS:
+            raise ErroApi(f'No máximo {LIMITE_IDS} ids por requisição.')
+        resultados = [linha async for linha in linhas.filter(pk__in=ids).order_by('-id')]
+        proximo_cursor = None
+    else:
+        try:
+            tamanho = min(int(request.GET.get('tamanho', TAMANHO_PADRAO)), TAMANHO_MAXIMO)
+        except ValueError:
+            raise ErroApi('"tamanho" deve ser um número.')
+        pagina = await apaginar_por_cursor(linhas, 'id', request.GET.get('cursor'), max(tamanho, 1))
+        resultados, proximo_cursor = pagina.itens, pagina.proximo_cursor
+
+    if depois:
+        await depois(resultados)
+    return JsonResponse({'resultados': resultados, 'proximo_cursor': proximo_cursor})
+
+
+@_api_view
+async def tarefas(request):
+    campos = _campos(request, CAMPOS_TAREFA, CAMPOS_PADRAO_TAREFA, extras=[CAMPO_ETAPAS])
+    # arquivada=true lê do arquivo frio (TarefaArquivada/EtapaArquivada), com os mesmos campos
+    if _booleano(request, 'arquivada'):
+        queryset = TarefaArquivada.objects.filter(usuario=request.user).annotate(arquivada=Value(True))
+        modelo_etapa = EtapaArquivada
+    else:
+        queryset = Tarefa.objects.filter(usuario=request.user, arquivada=False)
+        modelo_etapa = Etapa
+    status = _lista_parametro(request, 'status')
+    if status:
+        queryset = queryset.filter(status__in=status)
+    categorias = _inteiros(request, 'categoria')
+    if categorias:
+        queryset = queryset.filter(categoria_id__in=categorias)
+    foco = _booleano(request, 'foco')
+    if foco is not None:
+        queryset = queryset.filter(is_foco_atual=foco)
+    prazo_de, prazo_ate = _data(request, 'prazo_de'), _data(request, 'prazo_ate')
+    if prazo_de:
+        queryset = queryset.filter(data_conclusao__gte=prazo_de)
+    if prazo_ate:
+        queryset = queryset.filter(data_conclusao__lte=prazo_ate)
+
+    async def incluir_etapas(resultados):
+        if CAMPO_ETAPAS not in campos:
+            return
+        por_tarefa = {resultado['id']: [] for resultado in resultados}
+        for resultado in resultados:
+            resultado[CAMPO_ETAPAS] = por_tarefa[resultado['id']]
+        etapas = modelo_etapa.objects.filter(tarefa_id__in=list(por_tarefa))\
+            .order_by('tarefa_id', 'ordem', 'id')\
+            .values('id', 'tarefa_id', 'descricao', 'concluida', 'ordem')
+        async for etapa in etapas:
+            por_tarefa[etapa.pop('tarefa_id')].append(etapa)
+
+    campos_valores = [campo for campo in campos if campo != CAMPO_ETAPAS]
+    return await _responder(request, queryset, campos_valores, CAMPOS_TAREFA, depois=incluir_etapas)
+
+
+@_api_view
+async def etapas(request):
+    campos = _campos(request, CAMPOS_ETAPA, CAMPOS_PADRAO_ETAPA)
+    queryset = Etapa.objects.filter(tarefa__usuario=request.user)
+
+    tarefas_ids = _inteiros(request, 'tarefa')
+    if tarefas_ids:
+        queryset = queryset.filter(tarefa_id__in=tarefas_ids)
+    concluida = _booleano(request, 'concluida')
+    if concluida is not None:
+        queryset = queryset.filter(concluida=concluida)
+
+    return await _responder(request, queryset, campos, CAMPOS_ETAPA)
+
+
+@_api_view
+async def categorias(request):
+    campos = _campos(request, CAMPOS_CATEGORIA, CAMPOS_PADRAO_CATEGORIA)
+    queryset = CategoriaDeTarefa.objects.filter(usuario=request.user)
+    return await _responder(request, queryset, campos, CAMPOS_CATEGORIA)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        # Registra os receivers de sinais do app e as verificações do `check --deploy`
+        from tasks import checks, signals  # noqa: F401
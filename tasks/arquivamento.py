@@ -0,0 +1,122 @@
+"""
+Arquivo frio das tarefas.
+
+Arquivar move a tarefa, suas etapas e os vínculos com a base de conhecimento para
+TarefaArquivada/EtapaArquivada (INSERT ... SELECT + DELETE, tudo numa transação), então as
+tabelas quentes e seus índices só guardam o que está em uso. Desarquivar faz o caminho
+inverso com os mesmos ids (links e cursores antigos continuam válidos).
+
+As duas operações trabalham sobre querysets, sem carregar as instâncias, e cuidam do que os
+sinais fariam: índice de busca, snapshot de atrasadas, cache dos usuários e os eventos que
+atualizam as outras abas abertas (ver tasks/eventos.py).
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import busca, cache_usuario
+from .models import BaseConhecimento, Etapa, EtapaArquivada, EventoTarefa, Tarefa, TarefaArquivada
+
+
+def _colunas(modelo, ignorar=()):
+    return [campo.column for campo in modelo._meta.concrete_fields if campo.name not in ignorar]
+
+
+def _subconsulta_ids(queryset):
+    return queryset.order_by().values('pk').query.sql_with_params()
+
+
+def _ids_por_usuario(queryset):
+    """ {usuario_id: [ids]} das tarefas do queryset (uma consulta, antes de mover as linhas). """
+    por_usuario = {}
+    for pk, usuario_id in queryset.order_by().values_list('pk', 'usuario_id'):
+        por_usuario.setdefault(usuario_id, []).append(pk)
+    return por_usuario
+
+
+def _copiar(cursor, origem, destino, colunas, filtro, params, extras=None):
+    """ INSERT INTO destino (colunas + extras) SELECT colunas + valores extras FROM origem WHERE filtro. """
+    extras = extras or {}
+    lista_destino = ', '.join(colunas + list(extras))
+    lista_origem = ', '.join(colunas + [expressao for expressao, _ in extras.values()])
+    params_extras = [valor for _, valores in extras.values() for valor in valores]
+    cursor.execute(
+        f'INSERT INTO {destino._meta.db_table} ({lista_destino}) '
+        f'SELECT {lista_origem} FROM {origem._meta.db_table} WHERE {filtro}',
+        params_extras + list(params),
+    )
+    return cursor.rowcount
+
+
+def _vinculos(modelo):
+    """ (tabela, coluna da tarefa, coluna do conhecimento) da tabela M2M com BaseConhecimento. """
+    intermediaria = modelo.conhecimentos.through
+    tarefa = intermediaria._meta.get_field(modelo._meta.model_name).column
+    conhecimento = intermediaria._meta.get_field(BaseConhecimento._meta.model_name).column
+    return intermediaria._meta.db_table, tarefa, conhecimento
+
+
+def _copiar_vinculos(cursor, origem, destino, ids_sql, params):
+    tabela_origem, tarefa_origem, conhecimento_origem = _vinculos(origem)
+    tabela_destino, tarefa_destino, conhecimento_destino = _vinculos(destino)
+    cursor.execute(
+        f'INSERT INTO {tabela_destino} ({tarefa_destino}, {conhecimento_destino}) '
+        f'SELECT {tarefa_origem}, {conhecimento_origem} FROM {tabela_origem} WHERE {tarefa_origem} IN ({ids_sql})',
+        params,
+    )
+
+
+def arquivar(tarefas, preservar_data=False):
+    """
+    Move as tarefas do queryset para o arquivo frio. Devolve quantas foram movidas.
+    `preservar_data`: arquivada_em vem de atualizada_em (migração de tarefas arquivadas
+    antes do arquivo frio existir); senão, é o momento atual.
+    """
+    por_usuario = _ids_por_usuario(tarefas)
+    if not por_usuario:
+        return 0
+    ids_sql, params = _subconsulta_ids(tarefas)
+    colunas = _colunas(TarefaArquivada, ignorar={'arquivada_em'})
+    if preservar_data:
+        arquivada_em = ('atualizada_em', [])
+    else:
+        # SQL cru: o valor vai no formato que o backend usa para DateTimeField
+        arquivada_em = ('%s', [connection.ops.adapt_datetimefield_value(timezone.now())])
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            movidas = _copiar(cursor, Tarefa, TarefaArquivada, colunas, f'id IN ({ids_sql})', params,
+                              extras={'arquivada_em': arquivada_em})
+            _copiar(cursor, Etapa, EtapaArquivada, _colunas(EtapaArquivada), f'tarefa_id IN ({ids_sql})', params)
+            _copiar_vinculos(cursor, Tarefa, TarefaArquivada, ids_sql, params)
+        tarefas.excluir_em_lote()
+        for usuario_id, ids in por_usuario.items():
+            EventoTarefa.objects.publicar_em_lote(usuario_id, ids, removidas=True)
+            cache_usuario.invalidar(usuario_id)
+    return movidas
+
+
+def desarquivar(arquivadas):
+    """ Devolve as tarefas arquivadas do queryset (e suas etapas) para as tabelas ativas. """
+    por_usuario = _ids_por_usuario(arquivadas)
+    if not por_usuario:
+        return 0
+    ids = [pk for ids_do_usuario in por_usuario.values() for pk in ids_do_usuario]
+    ids_sql, params = _subconsulta_ids(TarefaArquivada.objects.filter(pk__in=ids))
+    colunas = _colunas(Tarefa, ignorar={'arquivada'})
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            restauradas = _copiar(cursor, TarefaArquivada, Tarefa, colunas, f'id IN ({ids_sql})', params,
+                                  extras={'arquivada': ('%s', [False])})
+            _copiar(cursor, EtapaArquivada, Etapa, _colunas(Etapa), f'tarefa_id IN ({ids_sql})', params)
+            _copiar_vinculos(cursor, TarefaArquivada, Tarefa, ids_sql, params)
+        EtapaArquivada.objects.filter(tarefa_id__in=ids).delete()
+        TarefaArquivada.conhecimentos.through.objects.filter(tarefaarquivada_id__in=ids).delete()
+        TarefaArquivada.objects.filter(pk__in=ids)._raw_delete(arquivadas.db)
+
+        busca.indexar_tarefas(ids)
+        Tarefa.objects.filter(pk__in=ids).sincronizar_atrasos()
+        for usuario_id, ids_do_usuario in por_usuario.items():
+            EventoTarefa.objects.publicar_em_lote(usuario_id, ids_do_usuario)
+            cache_usuario.invalidar(usuario_id)
+    return restauradas
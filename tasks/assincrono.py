@@ -0,0 +1,44 @@
+"""
+Apoio às views assíncronas (painel, alternar etapa e API JSON).
+
+No Django 4.2, login_required, require_GET, condition e cache_control só embrulham views
+síncronas, e request.user é resolvido de forma preguiçosa com o ORM síncrono (proibido no
+event loop). Aqui ficam as versões assíncronas usadas pelas views `async def`; a partir do
+Django 5.0 os decoradores nativos já aceitam views assíncronas e request.auser() substitui
+carregar_usuario().
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponseNotAllowed
+from django.utils.functional import empty
+
+
+async def carregar_usuario(request):
+    """
+    Resolve request.user (sessão + usuário) numa única ida à thread do ORM síncrono.
+    Depois disso request.user e request.session já estão carregados e podem ser lidos no event loop.
+    """
+    if getattr(request.user, '_wrapped', None) is empty:
+        await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def login_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        usuario = await carregar_usuario(request)
+        if not usuario.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def require_GET(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return HttpResponseNotAllowed(['GET'])
+        return await view(request, *args, **kwargs)
+    return wrapper
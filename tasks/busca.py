@@ -0,0 +1,181 @@
+"""
+Busca textual (SQLite FTS5) sobre tarefas, etapas e base de conhecimento.
+
+Um único índice `tasks_busca` guarda um documento por tarefa (título + descrição +
+descrições das etapas) e um por item da base de conhecimento. O rowid codifica o tipo
+(par = tarefa, ímpar = conhecimento), então atualizar/remover um documento é um acesso
+direto pela chave, sem varrer o índice.
+
+O dono vai numa coluna indexada ("u<id>") e entra na própria consulta MATCH: o FTS
+cruza as listas de termos já filtradas pelo usuário em vez de filtrar depois. Os termos
+digitados valem só para as colunas de texto (ver `filtro_texto`), senão "u" ou "u<id>"
+casaria com todos os documentos do dono.
+
+O índice é mantido pelos sinais em tasks/signals.py; caminhos em lote (bulk_create,
+update()) chamam `indexar_tarefas` explicitamente. `reindexar_busca` reconstrói tudo.
+"""
+import html
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+
+TABELA = 'tasks_busca'
+TIPO_TAREFA = 0
+TIPO_CONHECIMENTO = 1
+# Pesos do bm25 por coluna (titulo, conteudo, dono): título conta mais que o corpo
+PESOS_BM25 = (10.0, 1.0, 0.0)
+# Marcadores do snippet; trocados por <mark> depois de escapar o HTML do texto
+_INICIO_DESTAQUE = '\x02'
+_FIM_DESTAQUE = '\x03'
+
+SQL_CRIAR_TABELA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} USING fts5("
+    "titulo, conteudo, dono, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+# Documento de cada tarefa montado no próprio banco (usado na indexação unitária, em lote e no rebuild)
+_SQL_DOCUMENTOS_TAREFAS = (
+    f"INSERT INTO {TABELA} (rowid, titulo, conteudo, dono) "
+    "SELECT t.id * 2, t.titulo, "
+    "COALESCE(t.descricao, '') || ' ' || COALESCE("
+    "(SELECT group_concat(e.descricao, ' ') FROM tasks_etapa e WHERE e.tarefa_id = t.id), ''), "
+    "'u' || t.usuario_id "
+    "FROM tasks_tarefa t"
+)
+_SQL_DOCUMENTOS_CONHECIMENTO = (
+    f"INSERT INTO {TABELA} (rowid, titulo, conteudo, dono) "
+    "SELECT c.id * 2 + 1, c.titulo, c.conteudo_markdown, 'u' || c.usuario_id "
+    "FROM tasks_baseconhecimento c"
+)
+
+# SQLite aceita no máximo 999 parâmetros por consulta
+TAMANHO_LOTE_IDS = 900
+
+
+@dataclass
+class ResultadoBusca:
+    tipo: int
+    objeto_id: int
+    titulo: str
+    trecho: str  # HTML seguro, com os termos encontrados em <mark>
+
+    @property
+    def is_tarefa(self):
+        return self.tipo == TIPO_TAREFA
+
+
+def disponivel():
+    """ O índice só existe no SQLite; nos demais bancos a indexação vira no-op. """
+    return connection.vendor == 'sqlite'
+
+
+def montar_consulta(termo):
+    """
+    Converte o texto digitado em uma expressão FTS5 segura: cada palavra vira uma
+    frase entre aspas (sem operadores do usuário) e a última aceita prefixo.
+    """
+    palavras = re.findall(r'\w+', termo or '')
+    if not palavras:
+        return ''
+    frases = [f'"{palavra}"' for palavra in palavras]
+    frases[-1] += '*'
+    return ' '.join(frases)
+
+
+def filtro_texto(consulta):
+    """ Restringe a expressão do usuário às colunas de texto (a coluna `dono` só entra pelo filtro do dono). """
+    return f'{{titulo conteudo}} : ({consulta})'
+
+
+def _em_lotes(ids):
+    ids = list(ids)
+    for inicio in range(0, len(ids), TAMANHO_LOTE_IDS):
+        yield ids[inicio:inicio + TAMANHO_LOTE_IDS]
+
+
+def indexar_tarefas(ids):
+    """ (Re)indexa as tarefas indicadas; ids de tarefas que não existem mais saem do índice. """
+    if not disponivel():
+        return
+    with connection.cursor() as cursor:
+        for lote in _em_lotes(ids):
+            marcadores = ', '.join(['%s'] * len(lote))
+            rowids = [pk * 2 for pk in lote]
+            cursor.execute(f'DELETE FROM {TABELA} WHERE rowid IN ({marcadores})', rowids)
+            cursor.execute(f'{_SQL_DOCUMENTOS_TAREFAS} WHERE t.id IN ({marcadores})', lote)
+
+
+def indexar_conhecimento(pk):
+    if not disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA} WHERE rowid = %s', [pk * 2 + 1])
+        cursor.execute(f'{_SQL_DOCUMENTOS_CONHECIMENTO} WHERE c.id = %s', [pk])
+
+
+def remover(tipo, pk):
+    if not disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA} WHERE rowid = %s', [pk * 2 + tipo])
+
+
+def remover_tarefas_da_consulta(tarefas):
+    """ Tira do índice as tarefas de um queryset num único DELETE (usado antes de apagá-las em lote). """
+    if not disponivel():
+        return
+    sql, params = tarefas.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA} WHERE rowid IN (SELECT id * 2 FROM ({sql}))', params)
+
+
+def reconstruir_indice():
+    """ Apaga e recria todos os documentos com dois INSERT ... SELECT. """
+    if not disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA}')
+        cursor.execute(_SQL_DOCUMENTOS_TAREFAS)
+        cursor.execute(_SQL_DOCUMENTOS_CONHECIMENTO)
+        # Junta os segmentos do índice numa única b-tree (consultas mais rápidas)
+        cursor.execute(f"INSERT INTO {TABELA} ({TABELA}) VALUES ('optimize')")
+
+
+def _destacar(trecho):
+    trecho = html.escape(trecho or '')
+    return trecho.replace(_INICIO_DESTAQUE, '<mark>').replace(_FIM_DESTAQUE, '</mark>')
+
+
+def buscar(usuario, termo, limite=20):
+    """ Resultados do usuário, do mais relevante para o menos (bm25). """
+    consulta = montar_consulta(termo)
+    if not consulta or not disponivel():
+        return []
+
+    pesos = ', '.join(str(peso) for peso in PESOS_BM25)
+    sql = (
+        f"SELECT rowid, titulo, snippet({TABELA}, 1, %s, %s, '…', 12) "
+        f"FROM {TABELA} WHERE {TABELA} MATCH %s "
+        f"ORDER BY bm25({TABELA}, {pesos}) LIMIT %s"
+    )
+    # O dono entra no MATCH: o FTS só considera documentos do usuário
+    filtro = f'dono : u{usuario.pk} AND {filtro_texto(consulta)}'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_INICIO_DESTAQUE, _FIM_DESTAQUE, filtro, limite])
+        linhas = cursor.fetchall()
+
+    return [
+        ResultadoBusca(tipo=rowid & 1, objeto_id=rowid >> 1, titulo=titulo, trecho=_destacar(trecho))
+        for rowid, titulo, trecho in linhas
+    ]
+
+
+def sql_ids_correspondentes(tipo, termo):
+    """
+    (sql, params) de uma subconsulta com os ids do `tipo` que casam com o termo, para usar
+    em `pk__in=RawSQL(...)` (ex.: busca do admin) sem trazer os ids para o Python.
+    """
+    sql = f'SELECT rowid >> 1 FROM {TABELA} WHERE {TABELA} MATCH %s AND (rowid & 1) = %s'
+    return sql, [filtro_texto(montar_consulta(termo)), tipo]
@@ -0,0 +1,165 @@
+"""
+Cache por usuário com chave versionada.
+
+Cada usuário tem um número de versão no cache; os dados (ex.: o painel) ficam sob chaves
+que incluem essa versão. Qualquer alteração nas tarefas, etapas ou categorias do usuário
+incrementa a versão (ver tasks/signals.py), e as entradas antigas simplesmente deixam de
+ser lidas e expiram sozinhas. Não é preciso saber quais chaves apagar.
+
+O backend é o cache configurado em settings.TAREFAS_CACHE_ALIAS (locmem, arquivo, banco...).
+Com mais de um worker ele precisa ser compartilhado: a versão guardada num locmem só muda no
+processo que fez a alteração (`check --deploy` avisa, ver tasks/checks.py).
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+PREFIXO = 'tarefas'
+# Tempo de vida das entradas de dados; a versão em si não expira
+TIMEOUT_DADOS = getattr(settings, 'TAREFAS_CACHE_TIMEOUT', 60 * 60)
+CHAVE_ACERTOS = f'{PREFIXO}:estatisticas:acertos'
+CHAVE_FALHAS = f'{PREFIXO}:estatisticas:falhas'
+
+
+def _cache():
+    return caches[getattr(settings, 'TAREFAS_CACHE_ALIAS', 'default')]
+
+
+def _chave_versao(usuario_id):
+    return f'{PREFIXO}:versao:{usuario_id}'
+
+
+def _chave_modificado(usuario_id):
+    return f'{PREFIXO}:modificado:{usuario_id}'
+
+
+def versao(usuario_id):
+    cache = _cache()
+    atual = cache.get(_chave_versao(usuario_id))
+    if atual is None:
+        # Começa num valor baseado no relógio: se a versão for despejada do cache,
+        # a nova não coincide com a de entradas antigas que ainda estejam guardadas
+        cache.add(_chave_versao(usuario_id), int(time.time() * 1000), timeout=None)
+        atual = cache.get(_chave_versao(usuario_id))
+    return atual
+
+
+def ultima_alteracao(usuario_id):
+    """ Momento da última invalidação (para Last-Modified); sem registro, conta a partir de agora. """
+    cache = _cache()
+    carimbo = cache.get(_chave_modificado(usuario_id))
+    if carimbo is None:
+        cache.add(_chave_modificado(usuario_id), time.time(), timeout=None)
+        carimbo = cache.get(_chave_modificado(usuario_id))
+    return datetime.fromtimestamp(carimbo, tz=dt_timezone.utc)
+
+
+def _incrementar_versao(usuario_id):
+    cache = _cache()
+    cache.set(_chave_modificado(usuario_id), time.time(), timeout=None)
+    try:
+        cache.incr(_chave_versao(usuario_id))
+    except ValueError:
+        # Versão ainda não existe (ou foi despejada): a próxima leitura cria uma nova
+        pass
+
+
+def invalidar(usuario_id):
+    """
+    Invalida todos os dados em cache do usuário. Incrementa agora (para a própria
+    transação não ler dados velhos) e de novo no commit: um leitor concorrente que
+    recalculou antes do commit guardou dados antigos sob a versão intermediária.
+    """
+    _incrementar_versao(usuario_id)
+    transaction.on_commit(lambda: _incrementar_versao(usuario_id))
+
+
+def _contar(chave):
+    cache = _cache()
+    try:
+        cache.incr(chave)
+    except ValueError:
+        if not cache.add(chave, 1, timeout=None):
+            cache.incr(chave)
+
+
+def obter_ou_calcular(usuario_id, nome, calcular, timeout=None):
+    """ Devolve o valor `nome` do usuário do cache ou chama `calcular()` e guarda o resultado. """
+    cache = _cache()
+    chave = f'{PREFIXO}:{nome}:{usuario_id}:v{versao(usuario_id)}'
+
+    valor = cache.get(chave)
+    if valor is not None:
+        _contar(CHAVE_ACERTOS)
+        return valor
+
+    _contar(CHAVE_FALHAS)
+    valor = calcular()
+    cache.set(chave, valor, TIMEOUT_DADOS if timeout is None else timeout)
+    return valor
+
+
+# --- Versões assíncronas (views async def): usam a API assíncrona do cache (aget, aincr...),
+# que também funciona com backends que acessam o banco. Fora de um atomic(), como no ORM
+# assíncrono, o "incrementar de novo no commit" de invalidar() seria imediato e é omitido.
+
+async def aversao(usuario_id):
+    cache = _cache()
+    atual = await cache.aget(_chave_versao(usuario_id))
+    if atual is None:
+        await cache.aadd(_chave_versao(usuario_id), int(time.time() * 1000), timeout=None)
+        atual = await cache.aget(_chave_versao(usuario_id))
+    return atual
+
+
+async def aultima_alteracao(usuario_id):
+    cache = _cache()
+    carimbo = await cache.aget(_chave_modificado(usuario_id))
+    if carimbo is None:
+        await cache.aadd(_chave_modificado(usuario_id), time.time(), timeout=None)
+        carimbo = await cache.aget(_chave_modificado(usuario_id))
+    return datetime.fromtimestamp(carimbo, tz=dt_timezone.utc)
+
+
+async def _acontar(chave):
+    cache = _cache()
+    try:
+        await cache.aincr(chave)
+    except ValueError:
+        if not await cache.aadd(chave, 1, timeout=None):
+            await cache.aincr(chave)
+
+
+async def aobter_ou_calcular(usuario_id, nome, calcular, timeout=None):
+    """ Como obter_ou_calcular(), mas `calcular` é uma função async. """
+    cache = _cache()
+    chave = f'{PREFIXO}:{nome}:{usuario_id}:v{await aversao(usuario_id)}'
+
+    valor = await cache.aget(chave)
+    if valor is not None:
+        await _acontar(CHAVE_ACERTOS)
+        return valor
+
+    await _acontar(CHAVE_FALHAS)
+    valor = await calcular()
+    await cache.aset(chave, valor, TIMEOUT_DADOS if timeout is None else timeout)
+    return valor
+
+
+def estatisticas():
+    cache = _cache()
+    acertos = cache.get(CHAVE_ACERTOS, 0)
+    falhas = cache.get(CHAVE_FALHAS, 0)
+    total = acertos + falhas
+    return {
+        'acertos': acertos,
+        'falhas': falhas,
+        'taxa_acerto': acertos / total if total else 0.0,
+    }
+
+
+def zerar_estatisticas():
+    _cache().delete_many([CHAVE_ACERTOS, CHAVE_FALHAS])
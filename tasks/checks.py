@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends que guardam os dados na memória de cada processo
+BACKENDS_POR_PROCESSO = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+@register(Tags.caches, deploy=True)
+def cache_usuario_compartilhado(app_configs, **kwargs):
+    """
+    A versão por usuário (tasks/cache_usuario.py) e o ETag que sai dela precisam ficar num
+    cache visto por todos os workers: num cache por processo, a invalidação só chega ao
+    worker que fez a alteração e os outros servem o painel antigo (e 304) até expirar.
+    Roda com `check --deploy`, como as demais verificações de produção.
+    """
+    alias = getattr(settings, 'TAREFAS_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in BACKENDS_POR_PROCESSO:
+        return []
+    return [Warning(
+        f"O cache '{alias}' (TAREFAS_CACHE_ALIAS) usa {backend}, que é separado por processo.",
+        hint=(
+            'Com mais de um worker, as versões por usuário ficam dessincronizadas e o painel e as '
+            'respostas 304 saem desatualizados. Use um backend compartilhado (banco, arquivo, Redis, Memcached).'
+        ),
+        id='tasks.W001',
+    )]
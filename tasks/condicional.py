@@ -0,0 +1,87 @@
+"""
+GET condicional (ETag / Last-Modified) para as páginas do usuário.
+
+O validador sai do cache por usuário (tasks/cache_usuario.py), sem consultar o banco:
+a versão muda a cada alteração nas tarefas, etapas ou categorias do usuário. Se o
+navegador mandar o mesmo ETag, a view nem é executada e a resposta é 304.
+Serve tanto para views síncronas quanto para `async def` (ver tasks/assincrono.py).
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib import messages
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from tasks import assincrono, cache_usuario
+
+
+def _validavel(request):
+    # Mensagens pendentes (ex.: depois de um redirect) precisam de uma renderização completa
+    return request.user.is_authenticated and not len(messages.get_messages(request))
+
+
+def _etag(request, versao):
+    partes = [
+        request.user.pk,
+        versao,
+        request.get_full_path(),
+        # O HTML leva o token CSRF, que é trocado junto com a sessão a cada login:
+        # uma página de uma sessão anterior não pode ser reaproveitada
+        request.session.session_key,
+        # Listas como "Para Hoje" e "Atrasadas" mudam com a data, mesmo sem alterações
+        timezone.localdate().isoformat(),
+    ]
+    return hashlib.md5('|'.join(str(parte) for parte in partes).encode('utf-8')).hexdigest()
+
+
+def _inicio_do_dia():
+    return timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def etag_usuario(request, *args, **kwargs):
+    if not _validavel(request):
+        return None
+    return _etag(request, cache_usuario.versao(request.user.pk))
+
+
+def ultima_alteracao_usuario(request, *args, **kwargs):
+    if not _validavel(request):
+        return None
+    return max(cache_usuario.ultima_alteracao(request.user.pk), _inicio_do_dia())
+
+
+def _condicional_assincrona(view):
+    """ O mesmo que condition() + cache_control() fazem abaixo, para views `async def`. """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        await assincrono.carregar_usuario(request)
+        etag = ultima_alteracao = None
+        if _validavel(request):
+            etag = quote_etag(_etag(request, await cache_usuario.aversao(request.user.pk)))
+            ultima = max(await cache_usuario.aultima_alteracao(request.user.pk), _inicio_do_dia())
+            ultima_alteracao = int(ultima.timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=ultima_alteracao)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            if ultima_alteracao and not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(ultima_alteracao)
+            if etag:
+                response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return wrapper
+
+
+def condicional_por_usuario(view):
+    """ Responde 304 quando nada do usuário mudou; `no-cache` faz o navegador sempre revalidar. """
+    if iscoroutinefunction(view):
+        return _condicional_assincrona(view)
+    view = condition(etag_func=etag_usuario, last_modified_func=ultima_alteracao_usuario)(view)
+    return cache_control(private=True, no_cache=True)(view)
@@ -0,0 +1,96 @@
+"""
+Eventos ao vivo das tarefas (Server-Sent Events em /tarefas/eventos/).
+
+Cada alteração publicada (etapa alternada, tarefa salva, ação em lote, arquivamento) vira
+uma linha em EventoTarefa depois do commit: esse é o log de mudanças. O fluxo de cada aba aberta lê do log as linhas
+do usuário com id maior que o último enviado (o navegador devolve esse id no cabeçalho
+Last-Event-ID ao reconectar), então funciona com vários workers ou processos: cada fluxo
+consulta o banco a cada TAREFAS_EVENTOS_INTERVALO segundos. No mesmo processo, quem publica
+ainda acorda na hora os fluxos abertos do usuário (acordar()), sem esperar o intervalo.
+
+Este módulo não importa os models: eles o usam para acordar os fluxos ao publicar.
+"""
+import asyncio
+import json
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Comentário periódico para proxies e balanceadores não derrubarem a conexão ociosa
+PING = 15
+# Espera do navegador antes de reconectar (ms)
+RECONEXAO_MS = 3000
+
+# usuario_id -> {função que acorda um fluxo aberto}
+_assinantes = {}
+_trava = threading.Lock()
+
+
+def intervalo():
+    """ Segundos entre consultas ao log (eventos vindos de outros processos). """
+    return getattr(settings, 'TAREFAS_EVENTOS_INTERVALO', 2)
+
+
+def duracao():
+    """ Duração máxima de uma conexão: o navegador reconecta sozinho e retoma pelo Last-Event-ID. """
+    return getattr(settings, 'TAREFAS_EVENTOS_DURACAO', 5 * 60)
+
+
+def acordar(usuario_id):
+    """ Acorda os fluxos do usuário abertos neste processo (threads ou event loops). """
+    with _trava:
+        despertadores = list(_assinantes.get(usuario_id, ()))
+    for despertar in despertadores:
+        despertar()
+
+
+@contextmanager
+def _registrar(usuario_id, despertar):
+    with _trava:
+        _assinantes.setdefault(usuario_id, set()).add(despertar)
+    try:
+        yield
+    finally:
+        with _trava:
+            restantes = _assinantes.get(usuario_id, set())
+            restantes.discard(despertar)
+            if not restantes:
+                _assinantes.pop(usuario_id, None)
+
+
+@contextmanager
+def assinar(usuario_id):
+    """ Para o fluxo síncrono (WSGI): um threading.Event marcado por acordar(). """
+    sinal = threading.Event()
+    with _registrar(usuario_id, sinal.set):
+        yield sinal
+
+
+@contextmanager
+def aassinar(usuario_id):
+    """ Para o fluxo assíncrono (ASGI): um asyncio.Event do loop atual, marcado de qualquer thread. """
+    sinal = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def despertar():
+        try:
+            loop.call_soon_threadsafe(sinal.set)
+        except RuntimeError:
+            # O loop já foi encerrado (o fluxo terminou enquanto alguém publicava)
+            pass
+
+    with _registrar(usuario_id, despertar):
+        yield sinal
+
+
+def formatar(evento_id, tipo, dados):
+    return f'id: {evento_id}\nevent: {tipo}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n'
+
+
+def inicio():
+    return f'retry: {RECONEXAO_MS}\n\n'
+
+
+def ping():
+    return ': ping\n\n'
@@ -1,6 +1,7 @@
 from django import forms
 from django.forms import inlineformset_factory
 from .models import Tarefa, Etapa, CategoriaDeTarefa
+from . import acoes_lote
 
 class TarefaForm(forms.ModelForm):
     class Meta:
@@ -31,3 +32,47 @@ class CategoriaForm(forms.ModelForm):
 
 class CSVUploadForm(forms.Form):
     arquivo_csv = forms.FileField(label='Selecione o arquivo CSV')
+
+
+class CampoIds(forms.Field):
+    """ Lista de ids vinda de vários checkboxes com o mesmo name (ids=1&ids=2...). """
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return [int(valor) for valor in value or []]
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Seleção de tarefas inválida.')
+
+
+class AcaoEmLoteForm(forms.Form):
+    acao = forms.ChoiceField(choices=acoes_lote.ACOES, label='Ação')
+    ids = CampoIds(required=False)
+    todas = forms.BooleanField(required=False, label='Todas as tarefas da lista')
+    # Valores das ações "Alterar status" / "Alterar categoria"
+    status = forms.ChoiceField(choices=[('', 'Status...')] + Tarefa.StatusChoices.choices, required=False)
+    categoria = forms.ModelChoiceField(queryset=CategoriaDeTarefa.objects.none(), required=False,
+                                       empty_label='Sem categoria')
+    # Filtro usado com "todas"
+    filtro_status = forms.ChoiceField(choices=[('', 'Qualquer status')] + Tarefa.StatusChoices.choices, required=False)
+    filtro_categoria = forms.ModelChoiceField(queryset=CategoriaDeTarefa.objects.none(), required=False,
+                                              empty_label='Qualquer categoria')
+
+    def __init__(self, usuario, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Só as categorias do próprio usuário são aceitas
+        categorias = CategoriaDeTarefa.objects.filter(usuario=usuario).order_by('nome')
+        self.fields['categoria'].queryset = categorias
+        self.fields['filtro_categoria'].queryset = categorias
+
+    def clean(self):
+        dados = super().clean()
+        if not dados.get('todas') and not dados.get('ids'):
+            raise forms.ValidationError('Selecione ao menos uma tarefa.')
+        if len(dados.get('ids') or []) > acoes_lote.LIMITE_IDS:
+            raise forms.ValidationError(
+                f'No máximo {acoes_lote.LIMITE_IDS} tarefas por vez; use "todas" com um filtro.'
+            )
+        if dados.get('acao') == acoes_lote.STATUS and not dados.get('status'):
+            self.add_error('status', 'Escolha o novo status.')
+        return dados
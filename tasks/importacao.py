@@ -0,0 +1,288 @@
+"""
+Importação de tarefas via CSV em fluxo (streaming).
+
+O arquivo é lido linha a linha (sem carregar tudo em memória), as categorias
+são resolvidas por um dicionário pré-carregado do usuário e as tarefas/etapas
+são gravadas com bulk_create em lotes, cada lote em sua própria transação.
+Erros de uma linha são registrados e não interrompem o restante do arquivo.
+"""
+import csv
+import io
+import itertools
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import busca, cache_usuario
+from .models import CategoriaDeTarefa, Etapa, ImportJob, Tarefa
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_DATA = ['%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d']
+TAMANHO_LOTE = 500
+SEPARADOR_ETAPAS = '|'
+# Limite de erros guardados no ImportJob (o arquivo pode ter milhões de linhas ruins)
+LIMITE_ERROS_GUARDADOS = 1000
+
+
+class JobPerdido(Exception):
+    """ O job voltou à fila (ou foi reivindicado por outro worker) enquanto este ainda o processava. """
+
+
+@dataclass
+class ResultadoImportacao:
+    linhas_processadas: int = 0
+    tarefas_criadas: int = 0
+    etapas_criadas: int = 0
+    erros: list = field(default_factory=list)  # [(numero_da_linha, mensagem), ...]
+
+    def registrar_erro(self, linha, mensagem):
+        self.erros.append((linha, mensagem))
+
+
+class ConversorData:
+    """ Detecta o formato na primeira data preenchida da coluna e reaproveita nas próximas linhas. """
+
+    def __init__(self):
+        self.formato = None
+
+    def converter(self, valor):
+        valor = (valor or '').strip()
+        if not valor:
+            return None
+
+        if self.formato:
+            try:
+                return datetime.strptime(valor, self.formato).date()
+            except ValueError:
+                pass  # Coluna com formatos misturados: tenta os demais abaixo
+
+        for formato in FORMATOS_DATA:
+            if formato == self.formato:
+                continue
+            try:
+                data = datetime.strptime(valor, formato).date()
+            except ValueError:
+                continue
+            self.formato = formato
+            return data
+
+        raise ValueError(f'data inválida "{valor}"')
+
+
+class ImportadorTarefas:
+    def __init__(self, usuario, tamanho_lote=TAMANHO_LOTE, ao_progredir=None):
+        self.usuario = usuario
+        self.tamanho_lote = tamanho_lote
+        # Chamado dentro da transação de cada lote com o ResultadoImportacao parcial,
+        # assim o progresso salvo nunca fica à frente (ou atrás) do que foi gravado
+        self.ao_progredir = ao_progredir
+        self.conversores = {'data_inicio': ConversorData(), 'data_conclusao': ConversorData()}
+        self.status_validos = set(Tarefa.StatusChoices.values)
+        self.categorias = None
+
+    def importar(self, arquivo, resultado=None):
+        """
+        Importa de um arquivo binário (ex.: UploadedFile) em UTF-8. Se `resultado` vier de
+        uma execução interrompida, as linhas já processadas são puladas (retomada).
+        """
+        resultado = resultado or ResultadoImportacao()
+        texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+        try:
+            self._importar_texto(texto, resultado)
+        except UnicodeDecodeError:
+            resultado.registrar_erro(
+                resultado.linhas_processadas + 2,
+                'erro de codificação; certifique-se que o arquivo é um CSV UTF-8. Importação interrompida.'
+            )
+        finally:
+            # Devolve o arquivo original sem fechá-lo
+            texto.detach()
+        return resultado
+
+    def _importar_texto(self, texto, resultado):
+        cabecalho = texto.readline()
+        if not cabecalho.strip():
+            return
+
+        # Mesmo critério de antes: se o cabeçalho tem ';' o separador é ';'
+        delimitador = ';' if ';' in cabecalho else ','
+        leitor = csv.DictReader(itertools.chain([cabecalho], texto), delimiter=delimitador)
+        # Normalizar chaves do header para remover espaços
+        leitor.fieldnames = [nome.strip() for nome in leitor.fieldnames]
+
+        if 'titulo' not in leitor.fieldnames:
+            resultado.registrar_erro(1, 'cabeçalho sem a coluna "titulo".')
+            return
+
+        self.categorias = {
+            categoria.nome: categoria
+            for categoria in CategoriaDeTarefa.objects.filter(usuario=self.usuario)
+        }
+
+        # Retomada: pula as linhas que já foram gravadas numa execução anterior
+        leitor_restante = itertools.islice(leitor, resultado.linhas_processadas, None)
+
+        lote = []
+        try:
+            for row in leitor_restante:
+                resultado.linhas_processadas += 1
+                # O cabeçalho é a linha 1 do arquivo
+                numero_linha = leitor.line_num
+                try:
+                    lote.append(self._montar_tarefa(row))
+                except ValueError as erro:
+                    resultado.registrar_erro(numero_linha, str(erro))
+                    continue
+
+                if len(lote) >= self.tamanho_lote:
+                    self._gravar_lote(lote, resultado)
+                    lote = []
+        except UnicodeDecodeError:
+            # As linhas válidas antes do trecho ruim já contam em linhas_processadas:
+            # grava o lote pendente antes de interromper, senão o resumo mentiria
+            if lote:
+                self._gravar_lote(lote, resultado)
+            raise
+
+        if lote:
+            self._gravar_lote(lote, resultado)
+
+    def _montar_tarefa(self, row):
+        titulo = (row.get('titulo') or '').strip()
+        if not titulo:
+            raise ValueError('título vazio.')
+        if len(titulo) > Tarefa._meta.get_field('titulo').max_length:
+            raise ValueError('título com mais de 255 caracteres.')
+
+        datas = {}
+        for coluna, conversor in self.conversores.items():
+            try:
+                datas[coluna] = conversor.converter(row.get(coluna))
+            except ValueError as erro:
+                raise ValueError(f'{coluna}: {erro}.')
+
+        status = (row.get('status') or '').strip()
+        if status not in self.status_validos:
+            status = Tarefa.StatusChoices.NAO_INICIADO
+
+        etapas = []
+        etapas_str = row.get('etapas') or ''
+        if etapas_str.strip():
+            for ordem, descricao in enumerate(etapas_str.split(SEPARADOR_ETAPAS)):
+                descricao = descricao.strip()
+                if not descricao:
+                    continue
+                if len(descricao) > Etapa._meta.get_field('descricao').max_length:
+                    raise ValueError(f'etapa {ordem + 1} com mais de 255 caracteres.')
+                etapas.append((ordem, descricao))
+
+        tarefa = Tarefa(
+            usuario=self.usuario,
+            titulo=titulo,
+            descricao=(row.get('descricao') or '').strip(),
+            data_inicio=datas['data_inicio'],
+            data_conclusao=datas['data_conclusao'],
+            status=status,
+            categoria=self._categoria(row.get('categoria')),
+            # bulk_create não passa pelo Etapa.save(), então os contadores já vão preenchidos
+            etapas_total=len(etapas),
+        )
+        return tarefa, etapas
+
+    def _categoria(self, nome):
+        nome = (nome or '').strip()
+        if not nome:
+            return None
+        if nome not in self.categorias:
+            self.categorias[nome], _ = CategoriaDeTarefa.objects.get_or_create(
+                nome=nome,
+                usuario=self.usuario,
+                defaults={'cor': '#000000'}
+            )
+        return self.categorias[nome]
+
+    def _gravar_lote(self, lote, resultado):
+        with transaction.atomic():
+            tarefas = Tarefa.objects.bulk_create([tarefa for tarefa, _ in lote])
+            etapas = [
+                Etapa(tarefa=tarefa, descricao=descricao, ordem=ordem)
+                for tarefa, (_, descricoes) in zip(tarefas, lote)
+                for ordem, descricao in descricoes
+            ]
+            Etapa.objects.bulk_create(etapas, batch_size=self.tamanho_lote)
+            # bulk_create não dispara os sinais que mantêm o índice de busca, o snapshot de atrasadas e o cache
+            ids = [tarefa.pk for tarefa in tarefas]
+            busca.indexar_tarefas(ids)
+            Tarefa.objects.filter(pk__in=ids).sincronizar_atrasos()
+            cache_usuario.invalidar(self.usuario.pk)
+
+            resultado.tarefas_criadas += len(tarefas)
+            resultado.etapas_criadas += len(etapas)
+            if self.ao_progredir:
+                self.ao_progredir(resultado)
+
+
+def processar_importacao(job):
+    """
+    Executa um ImportJob já reivindicado (status PROCESSANDO). O progresso é salvo na mesma
+    transação de cada lote; se o worker cair, outro worker retoma de onde o job parou.
+    Toda escrita no job é condicionada ao worker que o reivindicou: se ele foi devolvido à
+    fila por parecer abandonado, este worker para no próximo lote em vez de duplicar linhas.
+    """
+    # Último estado gravado junto com um lote: o que veio depois foi desfeito com a transação
+    # do lote que falhou e será relido numa nova tentativa
+    confirmado = {'linhas_processadas': job.linhas_processadas, 'erros': len(job.erros)}
+    meu_job = ImportJob.objects.filter(pk=job.pk, status=ImportJob.StatusChoices.PROCESSANDO, worker=job.worker)
+
+    def salvar_progresso(resultado):
+        salvo = meu_job.update(
+            linhas_processadas=resultado.linhas_processadas,
+            tarefas_criadas=resultado.tarefas_criadas,
+            etapas_criadas=resultado.etapas_criadas,
+            erros=[list(erro) for erro in resultado.erros[:LIMITE_ERROS_GUARDADOS]],
+            atualizado_em=timezone.now(),
+        )
+        if not salvo:
+            # Dentro da transação do lote: o lote é desfeito junto
+            raise JobPerdido(job.pk)
+        confirmado.update(linhas_processadas=resultado.linhas_processadas, erros=len(resultado.erros))
+
+    parcial = ResultadoImportacao(
+        linhas_processadas=job.linhas_processadas,
+        tarefas_criadas=job.tarefas_criadas,
+        etapas_criadas=job.etapas_criadas,
+        erros=[tuple(erro) for erro in job.erros],
+    )
+    importador = ImportadorTarefas(job.usuario, ao_progredir=salvar_progresso)
+    try:
+        with job.arquivo.open('rb') as arquivo:
+            resultado = importador.importar(arquivo, parcial)
+        salvar_progresso(resultado)
+    except JobPerdido:
+        logger.warning('Importação %s devolvida à fila durante o processamento; interrompida', job.pk)
+        return
+    except Exception as erro:
+        logger.exception('Falha ao processar a importação %s', job.pk)
+        # Os erros por linha já registrados continuam no job; a falha entra no fim da lista
+        erros = [list(erro) for erro in parcial.erros[:min(confirmado['erros'], LIMITE_ERROS_GUARDADOS - 1)]]
+        erros.append([0, f'falha inesperada: {erro}'])
+        finalizado = meu_job.update(
+            status=ImportJob.StatusChoices.FALHOU,
+            linhas_processadas=confirmado['linhas_processadas'],
+            erros=erros,
+            atualizado_em=timezone.now(),
+            finalizado_em=timezone.now(),
+        )
+    else:
+        finalizado = meu_job.update(
+            status=ImportJob.StatusChoices.CONCLUIDO,
+            finalizado_em=timezone.now(),
+        )
+
+    if finalizado:
+        # Job encerrado (com sucesso ou não): o CSV não precisa mais ocupar disco
+        job.arquivo.delete(save=False)
@@ -0,0 +1,85 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from tasks import arquivamento
+from tasks.models import Tarefa
+
+
+class Command(BaseCommand):
+    help = (
+        'Arquiva as tarefas concluídas sem alteração há mais de N dias (N por usuário, ver '
+        'Usuarios.dias_arquivamento_automatico), em lotes curtos com pausa entre eles. '
+        'Pode rodar quantas vezes quiser: só pega o que ainda não foi arquivado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=None,
+            help='Limite padrão para quem não configurou o seu (padrão: settings.TAREFAS_ARQUIVAMENTO_AUTOMATICO_DIAS)',
+        )
+        parser.add_argument('--usuario', help='Processa só este e-mail')
+        parser.add_argument('--lote', type=int, default=500, help='Tarefas arquivadas por transação (padrão: 500)')
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0.2,
+            help='Segundos de espera entre os lotes, para não segurar o banco (padrão: 0.2)',
+        )
+        parser.add_argument('--simular', action='store_true', help='Só conta o que seria arquivado')
+
+    def handle(self, *args, **options):
+        dias_padrao = options['dias']
+        if dias_padrao is None:
+            dias_padrao = getattr(settings, 'TAREFAS_ARQUIVAMENTO_AUTOMATICO_DIAS', 30)
+        if dias_padrao < 0 or options['lote'] < 1:
+            raise CommandError('--dias não pode ser negativo e --lote precisa ser positivo.')
+
+        concluidas = Tarefa.objects.filter(arquivada=False, status=Tarefa.StatusChoices.CONCLUIDA)
+        # Só quem tem alguma concluída na lista ativa
+        usuarios = get_user_model().objects.filter(
+            pk__in=concluidas.order_by().values('usuario_id')
+        ).order_by('email')
+        if options['usuario']:
+            usuarios = usuarios.filter(email__iexact=options['usuario'])
+
+        self.pausar = False
+        total = 0
+        for usuario_id, email, dias in usuarios.values_list('pk', 'email', 'dias_arquivamento_automatico'):
+            dias = dias_padrao if dias is None else dias
+            if dias == 0:
+                self.stdout.write(f"{email}: arquivamento automático desativado")
+                continue
+            limite = timezone.now() - timedelta(days=dias)
+            candidatas = concluidas.filter(usuario_id=usuario_id, atualizada_em__lt=limite)
+
+            if options['simular']:
+                arquivadas = candidatas.count()
+            else:
+                arquivadas = self.arquivar(candidatas, options)
+            total += arquivadas
+            self.stdout.write(f"{email}: {arquivadas} tarefa(s) {'a arquivar' if options['simular'] else 'arquivada(s)'} "
+                              f"(concluídas há mais de {dias} dias)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Total: {total} tarefa(s) {'a arquivar' if options['simular'] else 'arquivada(s)'}."
+        ))
+
+    def arquivar(self, candidatas, options):
+        arquivadas = 0
+        while True:
+            # O SQLite não tem UPDATE/DELETE ... LIMIT: o lote é escolhido por id e o filtro é reaplicado
+            ids = list(candidatas.order_by('pk').values_list('pk', flat=True)[:options['lote']])
+            if not ids:
+                return arquivadas
+            if self.pausar:
+                # Entre um lote e outro o banco fica livre para as requisições
+                time.sleep(options['pausa'])
+            # Move o lote para o arquivo frio numa transação (cache e índices tratados lá)
+            arquivadas += arquivamento.arquivar(candidatas.filter(pk__in=ids))
+            self.pausar = True
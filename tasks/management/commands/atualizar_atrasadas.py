@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max
+from django.utils import timezone
+from tasks.models import Tarefa, TarefaAtrasada
+
+
+class Command(BaseCommand):
+    help = (
+        'Atualiza o snapshot de tarefas atrasadas (TarefaAtrasada) para a data de hoje. Incremental: '
+        'só escreve as linhas que entraram, saíram ou mudaram de faixa. Agende para rodar logo após a meia-noite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Quantidade de tarefas (faixa de IDs) verificadas por lote (padrão: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        hoje = timezone.now().date()
+        maior_id = Tarefa.objects.aggregate(maior=Max('id'))['maior'] or 0
+
+        totais = {'inseridas': 0, 'atualizadas': 0, 'removidas': 0}
+        # Por faixas de ID, como o recalcular_etapas: cada lote é uma transação curta
+        for inicio in range(1, maior_id + 1, lote):
+            resultado = Tarefa.objects.filter(pk__gte=inicio, pk__lt=inicio + lote).sincronizar_atrasos(hoje)
+            for chave, quantidade in resultado.items():
+                totais[chave] += quantidade
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot de {hoje}: {totais['inseridas']} inserida(s), {totais['atualizadas']} atualizada(s), "
+            f"{totais['removidas']} removida(s)."
+        ))
+        faixas = dict(TarefaAtrasada.objects.values_list('faixa').annotate(total=Count('pk')).order_by())
+        for faixa, rotulo in TarefaAtrasada.Faixa.choices:
+            self.stdout.write(f"  {rotulo}: {faixas.get(faixa, 0)}")
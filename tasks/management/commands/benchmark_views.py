@@ -0,0 +1,128 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from tasks import urls as tasks_urls
+from tasks.models import CategoriaDeTarefa, Etapa, ImportJob, Tarefa
+
+# Rotas que alteram dados mesmo num GET (ou só aceitam POST): ficam fora da medição
+ROTAS_IGNORADAS = {
+    'arquivar_tarefa': 'arquiva a tarefa no GET',
+    'atualizar_etapa': 'só aceita POST',
+    'acoes_em_lote': 'só aceita POST',
+    'desarquivar_tarefa': 'só aceita POST',
+    'eventos_tarefas': 'fluxo SSE (conexão longa)',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa cada view de tasks.urls pelo test client como um usuário e gera um JSON com '
+        'latência (p50/p95) e quantidade de consultas, para comparar execuções ao longo do tempo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='E-mail do usuário usado nas requisições (ex.: gerado pelo seed_carga)')
+        parser.add_argument('--repeticoes', type=int, default=20, help='Requisições por view (padrão: 20)')
+        parser.add_argument('--frio', action='store_true', help='Limpa os caches antes de cada requisição')
+        parser.add_argument('--host', default='localhost', help='Host usado nas requisições (precisa estar em ALLOWED_HOSTS)')
+        parser.add_argument('--saida', help='Arquivo onde gravar o JSON (padrão: saída padrão)')
+
+    def handle(self, *args, **options):
+        Usuario = get_user_model()
+        try:
+            self.usuario = Usuario.objects.get(email=options['email'])
+        except Usuario.DoesNotExist:
+            raise CommandError(f"Usuário {options['email']} não encontrado.")
+
+        client = Client(HTTP_HOST=options['host'])
+        client.force_login(self.usuario)
+
+        resultados, ignoradas = [], []
+        for padrao in tasks_urls.urlpatterns:
+            if not isinstance(padrao, URLPattern) or not padrao.name:
+                continue
+            if padrao.name in ROTAS_IGNORADAS:
+                ignoradas.append({'rota': padrao.name, 'motivo': ROTAS_IGNORADAS[padrao.name]})
+                continue
+            try:
+                url = reverse(padrao.name, kwargs=self.argumentos(padrao))
+            except LookupError as erro:
+                ignoradas.append({'rota': padrao.name, 'motivo': str(erro)})
+                continue
+            resultados.append(self.medir(client, padrao.name, url, options))
+
+        relatorio = {
+            'gerado_em': timezone.now().isoformat(),
+            'usuario': self.usuario.email,
+            'tarefas_do_usuario': Tarefa.objects.filter(usuario=self.usuario).count(),
+            'repeticoes': options['repeticoes'],
+            'frio': options['frio'],
+            'resultados': resultados,
+            'ignoradas': ignoradas,
+        }
+        conteudo = json.dumps(relatorio, ensure_ascii=False, indent=2)
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                arquivo.write(conteudo)
+            self.stderr.write(self.style.SUCCESS(f"Relatório gravado em {options['saida']}."))
+        else:
+            self.stdout.write(conteudo)
+
+    def argumentos(self, padrao):
+        """ Preenche os parâmetros da rota com objetos do próprio usuário. """
+        if not padrao.pattern.converters:
+            return {}
+
+        if padrao.name in ('categoriatarefa', 'editar_categoria', 'deletar_categoria'):
+            objeto = CategoriaDeTarefa.objects.filter(usuario=self.usuario).first()
+        elif padrao.name == 'progresso_importacao':
+            objeto = ImportJob.objects.filter(usuario=self.usuario).first()
+        elif 'etapa_id' in padrao.pattern.converters:
+            objeto = Etapa.objects.filter(tarefa__usuario=self.usuario).first()
+        else:
+            objeto = Tarefa.objects.filter(usuario=self.usuario, arquivada=False).first()
+
+        if objeto is None:
+            raise LookupError('o usuário não tem dados para preencher a rota')
+        return {nome: objeto.pk for nome in padrao.pattern.converters}
+
+    def medir(self, client, nome, url, options):
+        tempos, consultas, status = [], [], None
+        for _ in range(options['repeticoes']):
+            if options['frio']:
+                for alias in caches:
+                    caches[alias].clear()
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                resposta = client.get(url)
+                # Respostas em streaming só terminam quando o conteúdo é consumido
+                if resposta.streaming:
+                    for _ in resposta.streaming_content:
+                        pass
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(len(capturadas))
+            status = resposta.status_code
+
+        return {
+            'rota': nome,
+            'url': url,
+            'status': status,
+            'p50_ms': round(statistics.median(tempos), 2),
+            'p95_ms': round(self.percentil(tempos, 95), 2),
+            'consultas': max(consultas),
+        }
+
+    @staticmethod
+    def percentil(valores, p):
+        ordenados = sorted(valores)
+        indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))
+        return ordenados[indice]
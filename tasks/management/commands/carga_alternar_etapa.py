@@ -0,0 +1,197 @@
+import asyncio
+import io
+import json
+import statistics
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.middleware.csrf import CSRF_SECRET_LENGTH
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from tasks.models import Etapa
+
+# Etapas do usuário usadas no teste (cada uma recebe um número par de cliques)
+LIMITE_ETAPAS = 200
+MODOS = ['asgi', 'wsgi']
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga do "alternar etapa": dispara os mesmos cliques concorrentes pelo handler ASGI '
+        '(um event loop) e pelo WSGI (uma thread por requisição simultânea), com sessão e CSRF reais, e '
+        'compara vazão e latência num JSON. Cada etapa recebe um número par de cliques, então os dados '
+        'voltam ao estado inicial.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='E-mail do usuário usado nas requisições (ex.: gerado pelo seed_carga)')
+        parser.add_argument('--requisicoes', type=int, default=400, help='Cliques por modo (padrão: 400)')
+        parser.add_argument('--concorrencia', type=int, default=16, help='Requisições simultâneas (padrão: 16)')
+        parser.add_argument('--modo', choices=MODOS + ['ambos'], default='ambos', help='Caminho medido (padrão: ambos)')
+        parser.add_argument('--host', default='localhost', help='Host usado nas requisições (precisa estar em ALLOWED_HOSTS)')
+        parser.add_argument('--saida', help='Arquivo onde gravar o JSON (padrão: saída padrão)')
+
+    def handle(self, *args, **options):
+        Usuario = get_user_model()
+        try:
+            self.usuario = Usuario.objects.get(email=options['email'])
+        except Usuario.DoesNotExist:
+            raise CommandError(f"Usuário {options['email']} não encontrado.")
+        if options['requisicoes'] < 1 or options['concorrencia'] < 1:
+            raise CommandError('--requisicoes e --concorrencia precisam ser positivos.')
+
+        etapas = list(
+            Etapa.objects.filter(tarefa__usuario=self.usuario).order_by('pk').values_list('pk', flat=True)[:LIMITE_ETAPAS]
+        )
+        if not etapas:
+            raise CommandError('O usuário não tem etapas para alternar.')
+
+        # Cliques aos pares na mesma etapa (podem até correr ao mesmo tempo): o saldo de cada modo é zero
+        pares = (options['requisicoes'] + 1) // 2
+        urls = [reverse('atualizar_etapa', args=[etapas[indice % len(etapas)]]) for indice in range(pares) for _ in range(2)]
+        self.preparar_requisicoes(options['host'])
+
+        modos = MODOS if options['modo'] == 'ambos' else [options['modo']]
+        resultados = []
+        for modo in modos:
+            inicio = time.perf_counter()
+            if modo == 'asgi':
+                medidas = self.rodar_asgi(urls, options['concorrencia'])
+            else:
+                medidas = self.rodar_wsgi(urls, options['concorrencia'])
+            resultados.append(self.resumir(modo, medidas, time.perf_counter() - inicio))
+
+        relatorio = {
+            'gerado_em': timezone.now().isoformat(),
+            'usuario': self.usuario.email,
+            'requisicoes': len(urls),
+            'concorrencia': options['concorrencia'],
+            'etapas': min(pares, len(etapas)),
+            'resultados': resultados,
+        }
+        conteudo = json.dumps(relatorio, ensure_ascii=False, indent=2)
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                arquivo.write(conteudo)
+            self.stderr.write(self.style.SUCCESS(f"Relatório gravado em {options['saida']}."))
+        else:
+            self.stdout.write(conteudo)
+
+    def preparar_requisicoes(self, host):
+        """ Cookie de sessão (login) e token CSRF de verdade: as requisições passam por toda a cadeia de middlewares. """
+        client = Client()
+        client.force_login(self.usuario)
+        token = get_random_string(CSRF_SECRET_LENGTH)
+        self.host = host
+        self.cookies = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}; ' \
+                       f'{settings.CSRF_COOKIE_NAME}={token}'
+        self.token = token
+
+    def rodar_asgi(self, urls, concorrencia):
+        """ Chama o ASGIHandler direto (como o uvicorn/daphne faria): um event loop, N requisições em voo. """
+        aplicacao = get_asgi_application()
+        pendentes = iter(urls)
+        cabecalhos = [
+            (b'host', self.host.encode()),
+            (b'cookie', self.cookies.encode()),
+            (b'x-csrftoken', self.token.encode()),
+        ]
+
+        async def requisicao(url):
+            respostas = []
+
+            async def receive():
+                if respostas:
+                    # Corpo já entregue: o servidor só avisaria de uma desconexão
+                    await asyncio.Event().wait()
+                respostas.append(None)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(mensagem):
+                if mensagem['type'] == 'http.response.start':
+                    respostas[0] = mensagem['status']
+
+            escopo = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+                'scheme': 'http', 'path': url, 'raw_path': url.encode(), 'query_string': b'',
+                'root_path': '', 'headers': cabecalhos, 'client': ('127.0.0.1', 0), 'server': (self.host, 80),
+            }
+            await aplicacao(escopo, receive, send)
+            return respostas[0]
+
+        async def trabalhador():
+            medidas = []
+            # Um único event loop: o iterador compartilhado não precisa de trava
+            for url in pendentes:
+                inicio = time.perf_counter()
+                status = await requisicao(url)
+                medidas.append(((time.perf_counter() - inicio) * 1000, status))
+            return medidas
+
+        async def rodar():
+            partes = await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+            return [medida for parte in partes for medida in parte]
+
+        return asyncio.run(rodar())
+
+    def rodar_wsgi(self, urls, concorrencia):
+        """ Chama o WSGIHandler de N threads, como um servidor WSGI com N threads de trabalho. """
+        aplicacao = get_wsgi_application()
+        pendentes = iter(urls)
+        trava = threading.Lock()
+        medidas = []
+
+        def requisicao(url):
+            status = []
+            environ = {
+                'REQUEST_METHOD': 'POST', 'PATH_INFO': url, 'SCRIPT_NAME': '', 'QUERY_STRING': '',
+                'SERVER_NAME': self.host, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': self.host, 'HTTP_COOKIE': self.cookies, 'HTTP_X_CSRFTOKEN': self.token,
+                'CONTENT_LENGTH': '0', 'REMOTE_ADDR': '127.0.0.1',
+                'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+                'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+            }
+            resposta = aplicacao(environ, lambda linha, cabecalhos, exc_info=None: status.append(int(linha.split()[0])))
+            try:
+                for _ in resposta:
+                    pass
+            finally:
+                resposta.close()
+            return status[0]
+
+        def trabalhador():
+            while True:
+                with trava:
+                    url = next(pendentes, None)
+                if url is None:
+                    return
+                inicio = time.perf_counter()
+                status = requisicao(url)
+                medidas.append(((time.perf_counter() - inicio) * 1000, status))
+
+        threads = [threading.Thread(target=trabalhador) for _ in range(concorrencia)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return medidas
+
+    @staticmethod
+    def resumir(modo, medidas, duracao):
+        tempos = sorted(tempo for tempo, _ in medidas)
+        return {
+            'modo': modo,
+            'duracao_s': round(duracao, 3),
+            'req_por_s': round(len(medidas) / max(duracao, 0.001), 1),
+            'p50_ms': round(statistics.median(tempos), 2),
+            'p95_ms': round(tempos[max(0, round(0.95 * len(tempos)) - 1)], 2),
+            'erros': sum(1 for _, status in medidas if status != 200),
+        }
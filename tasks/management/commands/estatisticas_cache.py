@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from tasks import cache_usuario
+
+
+class Command(BaseCommand):
+    help = 'Mostra acertos/falhas do cache por usuário (painel) e, opcionalmente, zera os contadores.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true', help='Zera os contadores depois de exibir')
+
+    def handle(self, *args, **options):
+        dados = cache_usuario.estatisticas()
+        self.stdout.write(
+            f"Acertos: {dados['acertos']} | Falhas: {dados['falhas']} | "
+            f"Taxa de acerto: {dados['taxa_acerto']:.1%}"
+        )
+        if options['zerar']:
+            cache_usuario.zerar_estatisticas()
+            self.stdout.write(self.style.SUCCESS("Contadores zerados."))
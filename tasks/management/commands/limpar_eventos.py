@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from tasks.models import EventoTarefa
+
+
+class Command(BaseCommand):
+    help = (
+        'Apaga do log de eventos ao vivo (EventoTarefa) as linhas mais antigas que a retenção. '
+        'Um fluxo SSE só relê eventos de alguns minutos atrás ao reconectar; agende para rodar de hora em hora.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horas',
+            type=float,
+            default=None,
+            help='Mantém os eventos das últimas N horas (padrão: TAREFAS_EVENTOS_RETENCAO_HORAS)',
+        )
+
+    def handle(self, *args, **options):
+        horas = options['horas']
+        if horas is None:
+            horas = getattr(settings, 'TAREFAS_EVENTOS_RETENCAO_HORAS', 24)
+        if horas < 0:
+            raise CommandError('--horas não pode ser negativo.')
+
+        limite = timezone.now() - timedelta(hours=horas)
+        # Sem sinais nem dependentes, o delete() vira um único DELETE (sem carregar as linhas)
+        apagados, _ = EventoTarefa.objects.filter(criado_em__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f"{apagados} evento(s) anterior(es) a {limite:%d/%m/%Y %H:%M} apagado(s)."))
@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+PAGINAS = ['painel', 'minhas_tarefas', 'tarefas_arquivadas', 'categoriastarefa']
+
+
+class Command(BaseCommand):
+    help = 'Compara latência e consultas de uma renderização completa com a resposta 304 (GET condicional).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='E-mail do usuário cujas páginas serão medidas')
+        parser.add_argument('--repeticoes', type=int, default=30, help='Requisições por cenário (padrão: 30)')
+        parser.add_argument('--host', default='localhost', help='Host usado nas requisições (precisa estar em ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        try:
+            usuario = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Usuário {options['email']} não encontrado.")
+
+        client = Client(HTTP_HOST=options['host'])
+        client.force_login(usuario)
+        repeticoes = options['repeticoes']
+
+        self.stdout.write(f"{'Página':<34}{'Cenário':<12}{'Status':>7}{'Mediana (ms)':>14}{'Consultas':>11}")
+        for nome in PAGINAS:
+            url = reverse(nome)
+            resposta = client.get(url)
+            etag = resposta.get('ETag')
+            if not etag:
+                raise CommandError(f"{url} não devolveu ETag (status {resposta.status_code}).")
+
+            cenarios = [('completa', {}), ('304', {'HTTP_IF_NONE_MATCH': etag})]
+            for cenario, cabecalhos in cenarios:
+                tempos = []
+                for _ in range(repeticoes):
+                    with CaptureQueriesContext(connection) as consultas:
+                        inicio = time.perf_counter()
+                        resposta = client.get(url, **cabecalhos)
+                        tempos.append((time.perf_counter() - inicio) * 1000)
+                self.stdout.write(
+                    f"{url:<34}{cenario:<12}{resposta.status_code:>7}"
+                    f"{statistics.median(tempos):>14.2f}{len(consultas):>11}"
+                )
@@ -0,0 +1,156 @@
+import gzip
+import json
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from GerenciadorDeTarefas import estaticos
+from tasks.models import CategoriaDeTarefa, Tarefa
+
+# Páginas medidas: rota -> modelo do objeto usado nos parâmetros (None = sem parâmetros)
+PAGINAS = {
+    'home': None,
+    'painel': None,
+    'minhas_tarefas': None,
+    'tarefas_arquivadas': None,
+    'categoriastarefa': None,
+    'categoriatarefa': CategoriaDeTarefa,
+    'criar_tarefa': None,
+    'editar_tarefa': Tarefa,
+    'deletar_tarefa': Tarefa,
+    'importar_tarefas': None,
+    'buscar': None,
+    'comentarios': None,
+}
+
+_ESTILO_INLINE = re.compile(r'\sstyle="[^"]*"')
+_BLOCO_INLINE = re.compile(r'<(script|style)(?![^>]*\ssrc=)[^>]*>(.*?)</\1>', re.S | re.I)
+_ASSET = re.compile(r'<(?:link[^>]+href|script[^>]+src)="([^"]+)"', re.I)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o peso das páginas HTML (bytes, estilos e scripts inline) e dos CSS/JS que elas '
+        'carregam (original, minificado, gzip e brotli, como o collectstatic gera). Com --comparar, '
+        'mostra a diferença em relação a um relatório anterior (ex.: gerado antes de uma mudança).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='E-mail do usuário usado nas requisições (ex.: gerado pelo seed_carga)')
+        parser.add_argument('--host', default='localhost', help='Host usado nas requisições (precisa estar em ALLOWED_HOSTS)')
+        parser.add_argument('--saida', help='Arquivo onde gravar o JSON (padrão: saída padrão)')
+        parser.add_argument('--comparar', help='JSON de uma execução anterior: imprime antes -> depois por página')
+
+    def handle(self, *args, **options):
+        Usuario = get_user_model()
+        try:
+            self.usuario = Usuario.objects.get(email=options['email'])
+        except Usuario.DoesNotExist:
+            raise CommandError(f"Usuário {options['email']} não encontrado.")
+
+        client = Client(HTTP_HOST=options['host'])
+        client.force_login(self.usuario)
+
+        paginas, assets = [], {}
+        for rota, modelo in PAGINAS.items():
+            url = self.montar_url(rota, modelo)
+            if url is None:
+                continue
+            resposta = client.get(url)
+            html = resposta.content.decode(resposta.charset or 'utf-8')
+            inline = [conteudo for _, conteudo in _BLOCO_INLINE.findall(html)]
+            referenciados = [self.caminho_estatico(endereco) for endereco in _ASSET.findall(html)]
+            referenciados = [caminho for caminho in referenciados if caminho]
+            paginas.append({
+                'rota': rota,
+                'url': url,
+                'status': resposta.status_code,
+                'html_bytes': len(resposta.content),
+                'html_gzip_bytes': len(gzip.compress(resposta.content, mtime=0)),
+                'estilos_inline': len(_ESTILO_INLINE.findall(html)),
+                'blocos_inline_bytes': sum(len(conteudo.encode()) for conteudo in inline),
+                'assets': referenciados,
+            })
+            for caminho in referenciados:
+                if caminho not in assets:
+                    assets[caminho] = self.medir_asset(caminho)
+
+        relatorio = {
+            'gerado_em': timezone.now().isoformat(),
+            'usuario': self.usuario.email,
+            'brotli': estaticos.brotli is not None,
+            'paginas': paginas,
+            'assets': assets,
+        }
+        conteudo = json.dumps(relatorio, ensure_ascii=False, indent=2)
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                arquivo.write(conteudo)
+            self.stderr.write(self.style.SUCCESS(f"Relatório gravado em {options['saida']}."))
+        else:
+            self.stdout.write(conteudo)
+
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as arquivo:
+                self.comparar(json.load(arquivo), relatorio)
+
+    def montar_url(self, rota, modelo):
+        if modelo is None:
+            return reverse(rota)
+        objeto = modelo.objects.filter(usuario=self.usuario).first()
+        if objeto is None:
+            return None
+        argumento = 'categoria_id' if rota == 'categoriatarefa' else 'pk'
+        return reverse(rota, kwargs={argumento: objeto.pk})
+
+    @staticmethod
+    def caminho_estatico(endereco):
+        """ Caminho relativo ao STATIC_URL (sem o hash do manifesto), ou None se não for um estático local. """
+        caminho = urlsplit(endereco).path
+        prefixo = urlsplit(settings.STATIC_URL).path
+        if not prefixo.startswith('/'):
+            prefixo = '/' + prefixo
+        if not caminho.startswith(prefixo):
+            return None
+        caminho = caminho[len(prefixo):]
+        # Com o manifesto carregado a página já aponta para o nome com hash
+        return re.sub(r'\.[0-9a-f]{12}(\.\w+)$', r'\1', caminho)
+
+    @staticmethod
+    def medir_asset(caminho):
+        arquivo = finders.find(caminho)
+        if arquivo is None:
+            return {'erro': 'não encontrado pelos finders'}
+        with open(arquivo, 'rb') as entrada:
+            original = entrada.read()
+        extensao = '.' + caminho.rsplit('.', 1)[-1].lower()
+        minificado = original
+        if extensao in estaticos.MINIFICADORES:
+            minificado = estaticos.MINIFICADORES[extensao](original.decode('utf-8')).encode('utf-8')
+        comprimidos = estaticos.comprimir(minificado)
+        return {
+            'original_bytes': len(original),
+            'minificado_bytes': len(minificado),
+            'gzip_bytes': len(comprimidos['.gz']) if '.gz' in comprimidos else None,
+            'brotli_bytes': len(comprimidos['.br']) if '.br' in comprimidos else None,
+        }
+
+    def comparar(self, antes, depois):
+        anteriores = {pagina['rota']: pagina for pagina in antes['paginas']}
+        self.stderr.write(self.style.MIGRATE_HEADING('Página: HTML (bytes) | estilos inline | blocos inline (bytes)'))
+        for pagina in depois['paginas']:
+            anterior = anteriores.get(pagina['rota'])
+            if anterior is None:
+                continue
+            self.stderr.write(
+                f"{pagina['rota']}: {anterior['html_bytes']} -> {pagina['html_bytes']} "
+                f"({pagina['html_bytes'] - anterior['html_bytes']:+d}) | "
+                f"{anterior['estilos_inline']} -> {pagina['estilos_inline']} | "
+                f"{anterior['blocos_inline_bytes']} -> {pagina['blocos_inline_bytes']}"
+            )
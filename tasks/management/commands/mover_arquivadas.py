@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from tasks import arquivamento
+from tasks.models import Tarefa
+
+
+class Command(BaseCommand):
+    help = (
+        'Migração única: move para o arquivo frio (TarefaArquivada/EtapaArquivada) as tarefas que '
+        'ainda estão em Tarefa com arquivada=True, em lotes curtos com pausa entre eles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Tarefas movidas por transação (padrão: 1000)')
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0.2,
+            help='Segundos de espera entre os lotes, para não segurar o banco (padrão: 0.2)',
+        )
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help='No fim, roda VACUUM (SQLite) para devolver ao disco o espaço liberado',
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote precisa ser positivo.')
+
+        pendentes = Tarefa.objects.filter(arquivada=True)
+        total = 0
+        while True:
+            ids = list(pendentes.order_by('pk').values_list('pk', flat=True)[:options['lote']])
+            if not ids:
+                break
+            if total:
+                time.sleep(options['pausa'])
+            # arquivada_em = atualizada_em: a data em que a tarefa foi arquivada originalmente
+            total += arquivamento.arquivar(pendentes.filter(pk__in=ids), preservar_data=True)
+            self.stdout.write(f"{total} tarefa(s) movida(s)...")
+
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+
+        self.stdout.write(self.style.SUCCESS(f"{total} tarefa(s) arquivada(s) movida(s) para o arquivo frio."))
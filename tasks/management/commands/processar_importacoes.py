@@ -0,0 +1,68 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
+from tasks.importacao import processar_importacao
+from tasks.models import ImportJob
+
+class Command(BaseCommand):
+    help = 'Worker que processa as importações de CSV pendentes (ImportJob). Vários workers podem rodar ao mesmo tempo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--uma-vez',
+            action='store_true',
+            help='Processa os jobs pendentes e encerra (em vez de ficar aguardando novos)',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=2.0,
+            help='Segundos de espera entre verificações quando a fila está vazia (padrão: 2)',
+        )
+        parser.add_argument(
+            '--abandonado-apos',
+            type=int,
+            default=30,
+            help='Minutos sem progresso para um job em processamento voltar à fila (padrão: 30)',
+        )
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Worker {worker} iniciado."))
+
+        while True:
+            self.recuperar_abandonados(options['abandonado_apos'])
+
+            job = ImportJob.reivindicar_proximo(worker)
+            if job is None:
+                if options['uma_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(f"Processando {job.nome_original} (job {job.pk})...")
+            processar_importacao(job)
+            job.refresh_from_db()
+
+            estilo = self.style.SUCCESS if job.status == ImportJob.StatusChoices.CONCLUIDO else self.style.ERROR
+            self.stdout.write(estilo(
+                f"Job {job.pk}: {job.get_status_display()} - {job.tarefas_criadas} tarefas, {len(job.erros)} erro(s)."
+            ))
+
+    def recuperar_abandonados(self, minutos):
+        """
+        Jobs cujo worker morreu no meio do caminho voltam a ficar pendentes. Se o worker só
+        estava lento, o próximo lote dele não encontra mais o job reivindicado (worker=''
+        ou outro nome) e ele para sem gravar nada: ver processar_importacao().
+        """
+        limite = timezone.now() - timedelta(minutes=minutos)
+        devolvidos = ImportJob.objects.filter(
+            Q(status=ImportJob.StatusChoices.PROCESSANDO) & Q(atualizado_em__lt=limite)
+        ).update(status=ImportJob.StatusChoices.PENDENTE, worker='')
+        if devolvidos:
+            self.stdout.write(self.style.WARNING(f"{devolvidos} job(s) abandonado(s) devolvido(s) à fila."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from tasks.models import Tarefa
+
+class Command(BaseCommand):
+    help = 'Recalcula em lotes os contadores etapas_total/etapas_concluidas das tarefas, corrigindo divergências.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Quantidade de tarefas (faixa de IDs) verificadas por lote (padrão: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        maior_id = Tarefa.objects.aggregate(maior=Max('id'))['maior'] or 0
+
+        corrigidas = 0
+        # Percorre por faixas de ID: cada lote é uma transação curta e usa o índice da PK
+        for inicio in range(1, maior_id + 1, lote):
+            with transaction.atomic():
+                corrigidas += Tarefa.objects.filter(
+                    pk__gte=inicio, pk__lt=inicio + lote
+                ).recalcular_contadores_etapas()
+
+        if corrigidas:
+            self.stdout.write(self.style.WARNING(f"{corrigidas} tarefa(s) com contadores corrigidos."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Nenhuma divergência encontrada."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tasks import busca
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca (FTS5) de tarefas, etapas e base de conhecimento.'
+
+    def handle(self, *args, **options):
+        if not busca.disponivel():
+            self.stdout.write(self.style.WARNING("A busca textual só está disponível no SQLite."))
+            return
+
+        with transaction.atomic():
+            busca.reconstruir_indice()
+
+        with busca.connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {busca.TABELA}')
+            total = cursor.fetchone()[0]
+        self.stdout.write(self.style.SUCCESS(f"Índice de busca reconstruído com {total} documento(s)."))
@@ -0,0 +1,168 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from tasks import arquivamento, busca
+from tasks.models import CategoriaDeTarefa, Etapa, Tarefa
+
+VERBOS = ['Revisar', 'Enviar', 'Preparar', 'Comprar', 'Agendar', 'Atualizar', 'Organizar', 'Estudar',
+          'Pagar', 'Ligar para', 'Escrever', 'Planejar', 'Corrigir', 'Publicar', 'Arquivar']
+OBJETOS = ['relatório mensal', 'orçamento', 'apresentação', 'contrato', 'reunião de equipe', 'documentação',
+           'fatura', 'backup', 'campanha', 'proposta comercial', 'mercado', 'consulta médica', 'viagem',
+           'curso de inglês', 'planilha de gastos', 'entrevista', 'servidor', 'aniversário', 'cliente']
+PASSOS = ['Levantar informações', 'Fazer rascunho', 'Pedir aprovação', 'Conferir valores', 'Enviar por e-mail',
+          'Marcar horário', 'Separar documentos', 'Testar', 'Revisar com a equipe', 'Finalizar']
+CATEGORIAS = ['Trabalho', 'Casa', 'Estudos', 'Saúde', 'Finanças', 'Lazer', 'Projetos', 'Família',
+              'Compras', 'Viagens', 'Carro', 'Pets']
+CORES = ['#e57373', '#64b5f6', '#81c784', '#ffb74d', '#ba68c8', '#4db6ac', '#f06292', '#a1887f']
+
+SQL_INSERIR_ETAPA = (
+    f"INSERT INTO {Etapa._meta.db_table} (tarefa_id, descricao, concluida, ordem) VALUES (%s, %s, %s, %s)"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera dados sintéticos em volume (usuários x tarefas x etapas x categorias) com bulk_create, '
+        'para testes de carga e benchmarks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=10, help='Quantidade de usuários (padrão: 10)')
+        parser.add_argument('--tarefas', type=int, default=1000, help='Tarefas por usuário (padrão: 1000)')
+        parser.add_argument('--etapas', type=int, default=3, help='Média de etapas por tarefa (padrão: 3)')
+        parser.add_argument('--categorias', type=int, default=5, help='Categorias por usuário (padrão: 5)')
+        parser.add_argument('--lote', type=int, default=5000, help='Tarefas gravadas por transação (padrão: 5000)')
+        parser.add_argument('--semente', type=int, default=None, help='Semente do gerador aleatório (reprodutível)')
+        parser.add_argument('--prefixo', default='carga', help='Prefixo dos e-mails dos usuários gerados')
+        parser.add_argument('--senha', default='carga123', help='Senha de todos os usuários gerados')
+        parser.add_argument(
+            '--sem-busca',
+            action='store_true',
+            help='Não indexa na busca textual (mais rápido; rode `reindexar_busca` depois)',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['semente'])
+        self.hoje = timezone.now().date()
+        self.options = options
+        inicio = time.perf_counter()
+
+        usuarios = self.criar_usuarios()
+        totais = {'tarefas': 0, 'etapas': 0}
+        for numero, usuario in enumerate(usuarios, start=1):
+            categorias = self.criar_categorias(usuario)
+            criadas, etapas = self.criar_tarefas(usuario, categorias)
+            totais['tarefas'] += criadas
+            totais['etapas'] += etapas
+            self.stdout.write(f"[{numero}/{len(usuarios)}] {usuario.email}: {criadas} tarefas, {etapas} etapas")
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(usuarios)} usuário(s), {totais['tarefas']} tarefa(s) e {totais['etapas']} etapa(s) "
+            f"criados em {duracao:.1f}s ({totais['tarefas'] / max(duracao, 0.001):.0f} tarefas/s)."
+        ))
+
+    def criar_usuarios(self):
+        Usuario = get_user_model()
+        prefixo = self.options['prefixo']
+        # Continua a numeração se o comando já rodou antes com o mesmo prefixo
+        existentes = Usuario.objects.filter(email__startswith=prefixo, email__endswith='@carga.local').count()
+        # O hash da senha é caro: calculado uma única vez para todos
+        senha = make_password(self.options['senha'])
+        novos = [
+            Usuario(email=f'{prefixo}{indice}@carga.local', nome=f'Usuário de Carga {indice}', password=senha)
+            for indice in range(existentes, existentes + self.options['usuarios'])
+        ]
+        return Usuario.objects.bulk_create(novos)
+
+    def criar_categorias(self, usuario):
+        quantidade = min(self.options['categorias'], len(CATEGORIAS))
+        nomes = self.rng.sample(CATEGORIAS, quantidade)
+        return CategoriaDeTarefa.objects.bulk_create([
+            CategoriaDeTarefa(nome=nome, cor=self.rng.choice(CORES), usuario=usuario) for nome in nomes
+        ])
+
+    def criar_tarefas(self, usuario, categorias):
+        # Poucas categorias concentram a maioria das tarefas (distribuição tipo Zipf)
+        pesos_categorias = [1 / (posicao + 1) for posicao in range(len(categorias))]
+        criadas = etapas_criadas = 0
+        lote = []
+
+        for _ in range(self.options['tarefas']):
+            lote.append(self.montar_tarefa(usuario, categorias, pesos_categorias))
+            if len(lote) >= self.options['lote']:
+                etapas_criadas += self.gravar_lote(lote)
+                criadas += len(lote)
+                lote = []
+        if lote:
+            etapas_criadas += self.gravar_lote(lote)
+            criadas += len(lote)
+        return criadas, etapas_criadas
+
+    def montar_tarefa(self, usuario, categorias, pesos_categorias):
+        rng = self.rng
+        total = rng.randint(0, 2 * self.options['etapas'])
+        if total:
+            # ~40% sem nenhuma etapa feita, ~25% com todas, o resto no meio do caminho
+            sorteio = rng.random()
+            feitas = 0 if sorteio < 0.4 else total if sorteio < 0.65 else rng.randint(0, total)
+            if feitas == total:
+                status = Tarefa.StatusChoices.CONCLUIDA
+            elif feitas:
+                status = Tarefa.StatusChoices.EM_ANDAMENTO
+            else:
+                status = Tarefa.StatusChoices.NAO_INICIADO
+        else:
+            feitas = 0
+            status = rng.choices(Tarefa.StatusChoices.values, weights=[40, 35, 25])[0]
+
+        concluida = status == Tarefa.StatusChoices.CONCLUIDA
+        # Prazos concentrados em torno de hoje, com cauda para o passado (atrasadas) e o futuro
+        data_conclusao = None
+        if rng.random() > 0.1:
+            data_conclusao = self.hoje + timedelta(days=round(rng.gauss(5, 20)))
+
+        tarefa = Tarefa(
+            usuario=usuario,
+            titulo=f'{rng.choice(VERBOS)} {rng.choice(OBJETOS)}',
+            descricao=rng.choice(['', '', f'Lembrar de {rng.choice(OBJETOS)}.']),
+            data_conclusao=data_conclusao,
+            data_inicio=data_conclusao - timedelta(days=rng.randint(0, 14)) if data_conclusao else None,
+            status=status,
+            is_foco_atual=not concluida and rng.random() < 0.05,
+            arquivada=concluida and rng.random() < 0.4,
+            categoria=rng.choices(categorias, weights=pesos_categorias)[0] if categorias and rng.random() > 0.15 else None,
+            # bulk_create não passa pelo Etapa.save(): contadores já vão preenchidos
+            etapas_total=total,
+            etapas_concluidas=feitas,
+        )
+        passos = rng.sample(PASSOS, min(total, len(PASSOS))) + [f'Passo extra {n}' for n in range(total - len(PASSOS))]
+        etapas = [(ordem, descricao, ordem < feitas) for ordem, descricao in enumerate(passos)]
+        return tarefa, etapas
+
+    def gravar_lote(self, lote):
+        with transaction.atomic():
+            tarefas = Tarefa.objects.bulk_create([tarefa for tarefa, _ in lote], batch_size=self.options['lote'])
+            etapas = [
+                (tarefa.pk, descricao, concluida, ordem)
+                for tarefa, (_, passos) in zip(tarefas, lote)
+                for ordem, descricao, concluida in passos
+            ]
+            # As etapas são ~3x o volume das tarefas e não precisam dos ids de volta: um executemany
+            # direto evita o custo de montar o SQL do bulk_create objeto por objeto
+            with connection.cursor() as cursor:
+                cursor.executemany(SQL_INSERIR_ETAPA, etapas)
+            ids = [tarefa.pk for tarefa in tarefas]
+            # bulk_create não dispara os sinais: o snapshot de atrasadas é atualizado aqui
+            Tarefa.objects.filter(pk__in=ids).sincronizar_atrasos(self.hoje)
+            if not self.options['sem_busca']:
+                busca.indexar_tarefas(ids)
+            # As "arquivadas" vão para o arquivo frio, como numa base real
+            arquivamento.arquivar(Tarefa.objects.filter(pk__in=ids, arquivada=True))
+        return len(etapas)
@@ -1,50 +1,212 @@
-from django.core.management.base import BaseCommand
-from tasks.models import Tarefa
-from django.utils import timezone
+import csv
+import json
 from datetime import timedelta
 
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BooleanField, Count, F, Min, Value
+from django.utils import timezone
+from tasks.models import Tarefa, TarefaArquivada, TarefaAtrasada
+
+DIAS_ATRASO_PADRAO = 15
+TAMANHO_LOTE = 2000
+
+# Colunas da saída (csv/jsonl); o texto usa as mesmas chaves
+CAMPOS = [
+    'id', 'titulo', 'descricao', 'status', 'data_conclusao', 'arquivada',
+    'usuario__email', 'categoria__nome',
+]
+# Na consulta, `arquivada` sai da tabela de origem (anotação no fim do SELECT, igual nos dois lados do UNION)
+CAMPOS_CONSULTA = [campo for campo in CAMPOS if campo != 'arquivada']
+STATUS_DISPLAY = dict(Tarefa.StatusChoices.choices)
+
+
 class Command(BaseCommand):
-    help = 'Lista tarefas registradas com detalhes e filtro de atraso superior a 15 dias.'
+    help = (
+        'Lista tarefas registradas com filtros (usuário, status, categoria, atraso) em texto, CSV ou JSON Lines. '
+        'Atrasadas e --resumo leem o snapshot mantido pelo comando `atualizar_atrasadas`.'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--atrasadas',
             action='store_true',
-            help='Exibe apenas tarefas que estão em atraso há mais de 15 dias',
+            help=f'Exibe apenas tarefas em atraso há mais de --dias dias (padrão: {DIAS_ATRASO_PADRAO})',
+        )
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=None,
+            help=f'Dias de atraso considerados (padrão: {DIAS_ATRASO_PADRAO}); implica --atrasadas',
+        )
+        parser.add_argument('--usuario', help='E-mail ou id do usuário')
+        parser.add_argument(
+            '--status',
+            action='append',
+            choices=Tarefa.StatusChoices.values,
+            help='Filtra pelo status (pode ser repetido)',
+        )
+        parser.add_argument('--categoria', help='Nome (sem diferenciar maiúsculas) ou id da categoria')
+        parser.add_argument('--formato', choices=['text', 'csv', 'jsonl'], default='text', help='Formato da saída')
+        parser.add_argument(
+            '--resumo',
+            action='store_true',
+            help='Em vez de listar, conta as tarefas atrasadas por usuário e categoria (uma única consulta)',
         )
 
     def handle(self, *args, **options):
-        hoje = timezone.now().date()
-        limite_atraso = hoje - timedelta(days=15)
-        
-        if options['atrasadas']:
-            # Filtro: Status diferente de CONCLUIDA e data_conclusao < (hoje - 15 dias)
-            tarefas = Tarefa.objects.exclude(
-                status=Tarefa.StatusChoices.CONCLUIDA
-            ).filter(
-                data_conclusao__lt=limite_atraso
-            ).order_by('data_conclusao')
-            
-            self.stdout.write(self.style.WARNING('\n=== TAREFAS COM MAIS DE 15 DIAS DE ATRASO ===\n'))
-        else:
-            tarefas = Tarefa.objects.all().order_by('-data_conclusao')
-            self.stdout.write(self.style.MIGRATE_HEADING('\n=== LISTAGEM GERAL DE TAREFAS ===\n'))
+        self.hoje = timezone.now().date()
+        self.formato = options['formato']
+        self.dias = dias = options['dias'] if options['dias'] is not None else DIAS_ATRASO_PADRAO
+        if dias < 0:
+            raise CommandError('--dias não pode ser negativo.')
+        atrasadas = options['atrasadas'] or options['dias'] is not None or options['resumo']
+        self.limite_atraso = self.hoje - timedelta(days=dias)
 
-        if not tarefas.exists():
-            self.stdout.write(self.style.NOTICE("Nenhuma tarefa encontrada para os critérios selecionados."))
+        if options['resumo']:
+            atrasos = TarefaAtrasada.objects.filter(data_conclusao__lt=self.limite_atraso)
+            self.resumo(self.filtrar(atrasos, options, prefixo='tarefa__'), dias)
             return
 
-        for tarefa in tarefas:
-            self.stdout.write(self.style.SUCCESS(f"Título: {tarefa.titulo}"))
-            self.stdout.write(f"Descrição: {tarefa.descricao or 'Sem descrição'}")
-            self.stdout.write(f"Data de Conclusão Prevista: {tarefa.data_conclusao}")
-            self.stdout.write(f"Status: {tarefa.get_status_display()}")
-            
+        tarefas = self.filtrar(Tarefa.objects.all(), options).values(*CAMPOS_CONSULTA, em_arquivo=self.origem(False))
+        if atrasadas:
+            # Lidas do snapshot (ver `atualizar_atrasadas`): pendentes, não arquivadas e com prazo vencido
+            tarefas = tarefas.filter(atraso__data_conclusao__lt=self.limite_atraso).order_by('data_conclusao', 'id')
+            titulo = f'=== TAREFAS COM MAIS DE {dias} DIAS DE ATRASO ==='
+        else:
+            # As arquivadas ficam no arquivo frio (ver tasks/arquivamento.py): entram com um UNION ALL
+            arquivadas = self.filtrar(TarefaArquivada.objects.order_by(), options)\
+                .values(*CAMPOS_CONSULTA, em_arquivo=self.origem(True))
+            tarefas = tarefas.order_by().union(arquivadas, all=True).order_by('-data_conclusao', '-id')
+            titulo = '=== LISTAGEM GERAL DE TAREFAS ==='
+
+        # values() + iterator(): linhas em lotes direto do cursor, sem instanciar models nem guardar tudo na memória
+        linhas = self.com_arquivada(tarefas.iterator(chunk_size=TAMANHO_LOTE))
+        if self.formato == 'text':
+            self.stdout.write(self.style.WARNING(f'\n{titulo}\n') if atrasadas else self.style.MIGRATE_HEADING(f'\n{titulo}\n'))
+            total = self.escrever_texto(linhas)
+        elif self.formato == 'csv':
+            total = self.escrever_csv(linhas, CAMPOS)
+        else:
+            total = self.escrever_jsonl(linhas)
+
+        if not total:
+            mensagem = 'Nenhuma tarefa encontrada para os critérios selecionados.'
+            # Em csv/jsonl a saída padrão fica só com os dados
+            if self.formato == 'text':
+                self.stdout.write(self.style.NOTICE(mensagem))
+            else:
+                self.stderr.write(mensagem)
+
+    def filtrar(self, queryset, options, prefixo=''):
+        """ Aplica os filtros da linha de comando; `prefixo` é o caminho até a tarefa (ex.: no snapshot). """
+        filtros = {}
+        usuario = options['usuario']
+        if usuario:
+            if usuario.isdigit():
+                filtros['usuario_id'] = int(usuario)
+            else:
+                filtros['usuario__email__iexact'] = usuario
+        if options['status']:
+            filtros['status__in'] = options['status']
+        categoria = options['categoria']
+        if categoria:
+            if categoria.isdigit():
+                filtros['categoria_id'] = int(categoria)
+            else:
+                filtros['categoria__nome__iexact'] = categoria
+        return queryset.filter(**{f'{prefixo}{campo}': valor for campo, valor in filtros.items()})
+
+    @staticmethod
+    def origem(arquivada):
+        return Value(arquivada, output_field=BooleanField())
+
+    @staticmethod
+    def com_arquivada(linhas):
+        """ Devolve as linhas com as chaves de CAMPOS, `arquivada` indicando a tabela de onde a linha veio. """
+        for linha in linhas:
+            linha['arquivada'] = bool(linha.pop('em_arquivo'))
+            yield {campo: linha[campo] for campo in CAMPOS}
+
+    def dias_atraso(self, linha):
+        if linha['data_conclusao'] and linha['status'] != Tarefa.StatusChoices.CONCLUIDA:
+            return (self.hoje - linha['data_conclusao']).days
+        return 0
+
+    def escrever_texto(self, linhas):
+        total = 0
+        for linha in linhas:
+            total += 1
+            self.stdout.write(self.style.SUCCESS(f"Título: {linha['titulo']}"))
+            self.stdout.write(f"Descrição: {linha['descricao'] or 'Sem descrição'}")
+            self.stdout.write(f"Data de Conclusão Prevista: {linha['data_conclusao']}")
+            self.stdout.write(f"Status: {STATUS_DISPLAY.get(linha['status'], linha['status'])}")
+
             # Cálculo de dias de atraso para exibição visual
-            if tarefa.data_conclusao and tarefa.status != Tarefa.StatusChoices.CONCLUIDA:
-                dias_atraso = (hoje - tarefa.data_conclusao).days
-                if dias_atraso > 0:
-                    color_style = self.style.ERROR if dias_atraso > 15 else self.style.WARNING
-                    self.stdout.write(color_style(f"Duração do Atraso: {dias_atraso} dias"))
-            
-            self.stdout.write("-" * 50)
\ No newline at end of file
+            dias_atraso = self.dias_atraso(linha)
+            if dias_atraso > 0:
+                color_style = self.style.ERROR if dias_atraso > self.dias else self.style.WARNING
+                self.stdout.write(color_style(f"Duração do Atraso: {dias_atraso} dias"))
+
+            self.stdout.write("-" * 50)
+        return total
+
+    def escrever_csv(self, linhas, campos):
+        escritor = csv.writer(self.stdout, lineterminator='\n')
+        escritor.writerow(campos + ['dias_atraso'])
+        total = 0
+        for linha in linhas:
+            total += 1
+            escritor.writerow([linha[campo] for campo in campos] + [self.dias_atraso(linha)])
+        return total
+
+    def escrever_jsonl(self, linhas):
+        total = 0
+        for linha in linhas:
+            total += 1
+            linha['dias_atraso'] = self.dias_atraso(linha)
+            self.stdout.write(json.dumps(linha, cls=DjangoJSONEncoder, ensure_ascii=False))
+        return total
+
+    def resumo(self, atrasos, dias):
+        """ Uma única consulta agregada (GROUP BY usuário, categoria); os totais por usuário saem dela. """
+        grupos = list(
+            atrasos.values('usuario_id', 'usuario__email', categoria__nome=F('tarefa__categoria__nome'))
+            .annotate(atrasadas=Count('pk'), prazo_mais_antigo=Min('data_conclusao'))
+            .order_by('usuario__email', 'categoria__nome')
+        )
+        for grupo in grupos:
+            grupo['dias_maior_atraso'] = (self.hoje - grupo.pop('prazo_mais_antigo')).days
+
+        if self.formato == 'jsonl':
+            for grupo in grupos:
+                self.stdout.write(json.dumps(grupo, ensure_ascii=False))
+            return
+        if self.formato == 'csv':
+            colunas = ['usuario_id', 'usuario__email', 'categoria__nome', 'atrasadas', 'dias_maior_atraso']
+            escritor = csv.writer(self.stdout, lineterminator='\n')
+            escritor.writerow(colunas)
+            for grupo in grupos:
+                escritor.writerow([grupo[coluna] for coluna in colunas])
+            return
+
+        self.stdout.write(self.style.WARNING(f'\n=== RESUMO DE TAREFAS COM MAIS DE {dias} DIAS DE ATRASO ===\n'))
+        if not grupos:
+            self.stdout.write(self.style.NOTICE('Nenhuma tarefa encontrada para os critérios selecionados.'))
+            return
+
+        por_usuario = {}
+        for grupo in grupos:
+            por_usuario[grupo['usuario__email']] = por_usuario.get(grupo['usuario__email'], 0) + grupo['atrasadas']
+
+        usuario_atual = None
+        for grupo in grupos:
+            if grupo['usuario__email'] != usuario_atual:
+                usuario_atual = grupo['usuario__email']
+                self.stdout.write(self.style.SUCCESS(f"{usuario_atual}: {por_usuario[usuario_atual]} atrasada(s)"))
+            self.stdout.write(
+                f"  {grupo['categoria__nome'] or 'Sem categoria'}: {grupo['atrasadas']} "
+                f"(maior atraso: {grupo['dias_maior_atraso']} dias)"
+            )
+        self.stdout.write("-" * 50)
+        self.stdout.write(f"Total: {sum(por_usuario.values())} tarefa(s) atrasada(s)")
@@ -0,0 +1,155 @@
+"""
+Instrumentação por requisição: consultas SQL (quantidade e tempo) e tempo de renderização
+de templates, enviados no cabeçalho Server-Timing (aparece na aba "Timing" do DevTools).
+
+Opcional: com settings.TAREFAS_INSTRUMENTACAO = False o middleware levanta MiddlewareNotUsed
+e o Django o remove da cadeia na inicialização, ou seja, custo zero quando desligado.
+
+Requisições acima de TAREFAS_INSTRUMENTACAO_MAX_CONSULTAS ou TAREFAS_INSTRUMENTACAO_MAX_MS
+são registradas no logger "tasks.instrumentacao" com o SQL executado; comandos repetidos
+(mesmo SQL com parâmetros diferentes) são marcados como suspeitos de N+1.
+
+Funciona nos dois modos: sob WSGI fica síncrono e sob ASGI atende direto no event loop, sem
+forçar o Django a adaptar a cadeia inteira para síncrona.
+"""
+import contextvars
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('tasks.instrumentacao')
+
+# Medição da requisição atual (None fora de uma requisição instrumentada)
+_medicao_atual = contextvars.ContextVar('medicao_atual', default=None)
+_templates_instrumentados = False
+
+
+class Medicao:
+    def __init__(self):
+        self.consultas = []  # [(sql, duracao_ms), ...]
+        self.tempo_sql = 0.0
+        self.tempo_templates = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Usado como execute_wrapper das conexões
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = (time.perf_counter() - inicio) * 1000
+            self.tempo_sql += duracao
+            self.consultas.append((sql, duracao))
+
+    def repetidas(self):
+        """ SQL executado mais de uma vez na requisição (o texto vem sem os valores dos parâmetros). """
+        return {sql: vezes for sql, vezes in Counter(sql for sql, _ in self.consultas).items() if vezes > 1}
+
+
+def _instrumentar_templates():
+    """
+    Mede o render dos templates de nível mais alto (render(), render_to_string...).
+    Os {% include %} usam o Template interno e já entram no tempo do template que os inclui.
+    """
+    global _templates_instrumentados
+    if _templates_instrumentados:
+        return
+    from django.template.backends.django import Template
+
+    render_original = Template.render
+
+    def render_medido(self, context=None, request=None):
+        medicao = _medicao_atual.get()
+        if medicao is None:
+            return render_original(self, context, request)
+        inicio = time.perf_counter()
+        try:
+            return render_original(self, context, request)
+        finally:
+            medicao.tempo_templates += (time.perf_counter() - inicio) * 1000
+
+    Template.render = render_medido
+    _templates_instrumentados = True
+
+
+def _instalar_wrappers(pilha, medicao):
+    # Os wrappers das conexões são por thread e baratos; a conexão em si continua preguiçosa
+    for conexao in connections.all():
+        pilha.enter_context(conexao.execute_wrapper(medicao))
+
+
+class InstrumentacaoSQLMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TAREFAS_INSTRUMENTACAO', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.max_consultas = getattr(settings, 'TAREFAS_INSTRUMENTACAO_MAX_CONSULTAS', 50)
+        self.max_ms = getattr(settings, 'TAREFAS_INSTRUMENTACAO_MAX_MS', 500)
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+        _instrumentar_templates()
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pilha:
+                _instalar_wrappers(pilha, medicao)
+                response = self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+        return self.finalizar(request, response, medicao, inicio)
+
+    async def __acall__(self, request):
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pilha:
+                # O ORM (síncrono ou assíncrono) roda na thread "sensível" da requisição, a mesma
+                # do sync_to_async abaixo: os wrappers precisam estar nas conexões de lá
+                await sync_to_async(_instalar_wrappers)(pilha, medicao)
+                try:
+                    response = await self.get_response(request)
+                finally:
+                    await sync_to_async(pilha.close)()
+        finally:
+            _medicao_atual.reset(token)
+        return self.finalizar(request, response, medicao, inicio)
+
+    def finalizar(self, request, response, medicao, inicio):
+        total = (time.perf_counter() - inicio) * 1000
+        response['Server-Timing'] = ', '.join([
+            f'db;desc="{len(medicao.consultas)} consultas";dur={medicao.tempo_sql:.1f}',
+            f'tpl;desc="templates";dur={medicao.tempo_templates:.1f}',
+            f'total;dur={total:.1f}',
+        ])
+
+        if len(medicao.consultas) > self.max_consultas or total > self.max_ms:
+            self.registrar_lenta(request, response, medicao, total)
+        return response
+
+    def registrar_lenta(self, request, response, medicao, total):
+        repetidas = medicao.repetidas()
+        linhas = []
+        for sql, duracao in medicao.consultas:
+            marca = f'[N+1? {repetidas[sql]}x] ' if sql in repetidas else ''
+            linhas.append(f'{marca}{duracao:.1f}ms {sql}')
+        logger.warning(
+            'Requisição lenta: %s %s -> %s em %.1fms; %d consultas (%.1fms), templates %.1fms; %d SQL repetido(s)\n%s',
+            request.method, request.get_full_path(), response.status_code, total,
+            len(medicao.consultas), medicao.tempo_sql, medicao.tempo_templates, len(repetidas),
+            '\n'.join(linhas),
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.25 on 2026-10-18 10:27
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def preencher_contadores(apps, schema_editor):
+    Tarefa = apps.get_model('tasks', 'Tarefa')
+    Etapa = apps.get_model('tasks', 'Etapa')
+    etapas = Etapa.objects.filter(tarefa=OuterRef('pk')).order_by().values('tarefa')
+    Tarefa.objects.update(
+        etapas_total=Coalesce(Subquery(etapas.annotate(c=Count('id')).values('c')), 0),
+        etapas_concluidas=Coalesce(Subquery(etapas.filter(concluida=True).annotate(c=Count('id')).values('c')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_tarefa_arquivada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarefa',
+            name='etapas_concluidas',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Etapas Concluídas'),
+        ),
+        migrations.AddField(
+            model_name='tarefa',
+            name='etapas_total',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de Etapas'),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
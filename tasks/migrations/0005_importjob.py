@@ -0,0 +1,41 @@
+# Generated by Django 4.2.25 on 2026-10-18 10:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0004_tarefa_contadores_etapas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('arquivo', models.FileField(upload_to='importacoes/%Y/%m/', verbose_name='Arquivo CSV')),
+                ('nome_original', models.CharField(max_length=255, verbose_name='Nome do Arquivo')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluido', 'Concluído'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('linhas_processadas', models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')),
+                ('tarefas_criadas', models.PositiveIntegerField(default=0, verbose_name='Tarefas Criadas')),
+                ('etapas_criadas', models.PositiveIntegerField(default=0, verbose_name='Etapas Criadas')),
+                ('erros', models.JSONField(blank=True, default=list, verbose_name='Erros por Linha')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado em')),
+                ('finalizado_em', models.DateTimeField(blank=True, null=True, verbose_name='Finalizado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Última atualização')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='importacoes', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Importação de Tarefas',
+                'verbose_name_plural': 'Importações de Tarefas',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['status', 'criado_em'], name='importjob_status_criado_idx')],
+            },
+        ),
+    ]
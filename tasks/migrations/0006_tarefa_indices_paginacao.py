@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_importjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tarefa',
+            index=models.Index(fields=['usuario', 'arquivada', 'criada_em', 'id'], name='tarefa_usuario_criada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarefa',
+            index=models.Index(fields=['usuario', 'arquivada', 'atualizada_em', 'id'], name='tarefa_usuario_atualizada_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.25 on 2026-10-18 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_tarefa_indices_paginacao'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tarefa',
+            name='tarefa_usuario_criada_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tarefa',
+            name='tarefa_usuario_atualizada_idx',
+        ),
+        migrations.AddIndex(
+            model_name='tarefa',
+            index=models.Index(condition=models.Q(('arquivada', False)), fields=['usuario', 'criada_em', 'id'], name='tarefa_ativa_criada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarefa',
+            index=models.Index(condition=models.Q(('arquivada', True)), fields=['usuario', 'atualizada_em', 'id'], name='tarefa_arq_atualizada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarefa',
+            index=models.Index(condition=models.Q(('arquivada', False)), fields=['usuario', 'status', 'data_conclusao', 'is_foco_atual'], name='tarefa_ativa_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarefa',
+            index=models.Index(condition=models.Q(('arquivada', False), models.Q(('status', 'concluida'), _negated=True)), fields=['usuario', 'data_conclusao'], name='tarefa_pendente_prazo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarefa',
+            index=models.Index(condition=models.Q(('arquivada', False), ('is_foco_atual', True), models.Q(('status', 'concluida'), _negated=True)), fields=['usuario'], name='tarefa_pendente_foco_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarefa',
+            index=models.Index(condition=models.Q(('status', 'concluida'), _negated=True), fields=['data_conclusao'], name='tarefa_atrasada_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# SQL congelado aqui (e não importado de tasks.busca): mudanças futuras no módulo não alteram
+# o que esta migração faz, e tudo passa pelo schema_editor do banco sendo migrado
+SQL_CRIAR_TABELA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_busca USING fts5("
+    "titulo, conteudo, dono, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+SQL_DOCUMENTOS_TAREFAS = (
+    "INSERT INTO tasks_busca (rowid, titulo, conteudo, dono) "
+    "SELECT t.id * 2, t.titulo, "
+    "COALESCE(t.descricao, '') || ' ' || COALESCE("
+    "(SELECT group_concat(e.descricao, ' ') FROM tasks_etapa e WHERE e.tarefa_id = t.id), ''), "
+    "'u' || t.usuario_id "
+    "FROM tasks_tarefa t"
+)
+SQL_DOCUMENTOS_CONHECIMENTO = (
+    "INSERT INTO tasks_busca (rowid, titulo, conteudo, dono) "
+    "SELECT c.id * 2 + 1, c.titulo, c.conteudo_markdown, 'u' || c.usuario_id "
+    "FROM tasks_baseconhecimento c"
+)
+
+
+def criar_indice_busca(apps, schema_editor):
+    # FTS5 é específico do SQLite; nos outros bancos a busca fica desativada
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(SQL_CRIAR_TABELA)
+    schema_editor.execute(SQL_DOCUMENTOS_TAREFAS)
+    schema_editor.execute(SQL_DOCUMENTOS_CONHECIMENTO)
+
+
+def remover_indice_busca(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS tasks_busca')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_tarefa_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
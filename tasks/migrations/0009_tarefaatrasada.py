@@ -0,0 +1,54 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def preencher_snapshot(apps, schema_editor):
+    # Carga inicial; daqui em diante o comando `atualizar_atrasadas` e os sinais mantêm a tabela
+    Tarefa = apps.get_model('tasks', 'Tarefa')
+    TarefaAtrasada = apps.get_model('tasks', 'TarefaAtrasada')
+    hoje = timezone.now().date()
+
+    def faixa_para(dias):
+        for limite, faixa in ((7, 'ate_7'), (30, 'ate_30'), (90, 'ate_90')):
+            if dias <= limite:
+                return faixa
+        return 'mais_90'
+
+    atrasadas = Tarefa.objects.filter(arquivada=False, data_conclusao__lt=hoje).exclude(status='concluida')
+    TarefaAtrasada.objects.bulk_create(
+        (
+            TarefaAtrasada(tarefa_id=pk, usuario_id=usuario_id, data_conclusao=prazo, faixa=faixa_para((hoje - prazo).days))
+            for pk, usuario_id, prazo in atrasadas.values_list('pk', 'usuario_id', 'data_conclusao').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0008_busca_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaAtrasada',
+            fields=[
+                ('tarefa', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='atraso', serialize=False, to='tasks.tarefa', verbose_name='Tarefa')),
+                ('data_conclusao', models.DateField(verbose_name='Prazo')),
+                ('faixa', models.CharField(choices=[('ate_7', 'Até 7 dias'), ('ate_30', '8 a 30 dias'), ('ate_90', '31 a 90 dias'), ('mais_90', 'Mais de 90 dias')], max_length=10, verbose_name='Faixa de Atraso')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tarefas_atrasadas', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Tarefa Atrasada',
+                'verbose_name_plural': 'Tarefas Atrasadas',
+                'indexes': [models.Index(fields=['usuario', 'faixa'], name='atrasada_usuario_faixa_idx'), models.Index(fields=['data_conclusao'], name='atrasada_prazo_idx')],
+            },
+        ),
+        migrations.RunPython(preencher_snapshot, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0009_tarefaatrasada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EtapaArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('descricao', models.CharField(max_length=255, verbose_name='Descrição da Etapa')),
+                ('concluida', models.BooleanField(default=False, verbose_name='Concluída?')),
+                ('ordem', models.PositiveIntegerField(default=0, verbose_name='Ordem de Execução')),
+            ],
+            options={
+                'verbose_name': 'Etapa Arquivada',
+                'verbose_name_plural': 'Etapas Arquivadas',
+                'ordering': ['ordem'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TarefaArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('titulo', models.CharField(max_length=255, verbose_name='Título da Tarefa')),
+                ('descricao', models.TextField(blank=True, null=True, verbose_name='Descrição')),
+                ('data_inicio', models.DateField(blank=True, null=True, verbose_name='Data de Início')),
+                ('data_conclusao', models.DateField(blank=True, null=True, verbose_name='Data de Conclusão')),
+                ('status', models.CharField(choices=[('nao_iniciado', 'Não Iniciado'), ('em_andamento', 'Em Andamento'), ('concluida', 'Concluída')], max_length=20, verbose_name='Status')),
+                ('is_foco_atual', models.BooleanField(default=False, verbose_name='Foco Atual?')),
+                ('etapas_total', models.PositiveIntegerField(default=0, verbose_name='Total de Etapas')),
+                ('etapas_concluidas', models.PositiveIntegerField(default=0, verbose_name='Etapas Concluídas')),
+                ('criada_em', models.DateTimeField(verbose_name='Criada em')),
+                ('atualizada_em', models.DateTimeField(verbose_name='Última atualização')),
+                ('arquivada_em', models.DateTimeField(verbose_name='Arquivada em')),
+            ],
+            options={
+                'verbose_name': 'Tarefa Arquivada',
+                'verbose_name_plural': 'Tarefas Arquivadas',
+                'ordering': ['-arquivada_em'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='tarefa',
+            name='tarefa_arq_atualizada_idx',
+        ),
+        migrations.AddField(
+            model_name='tarefaarquivada',
+            name='categoria',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tarefas_arquivadas', to='tasks.categoriadetarefa', verbose_name='Categoria'),
+        ),
+        migrations.AddField(
+            model_name='tarefaarquivada',
+            name='conhecimentos',
+            field=models.ManyToManyField(blank=True, related_name='tarefas_arquivadas', to='tasks.baseconhecimento', verbose_name='Conhecimentos Relacionados'),
+        ),
+        migrations.AddField(
+            model_name='tarefaarquivada',
+            name='usuario',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='arquivo_tarefas', to=settings.AUTH_USER_MODEL, verbose_name='Usuário Responsável'),
+        ),
+        migrations.AddField(
+            model_name='etapaarquivada',
+            name='tarefa',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='etapas', to='tasks.tarefaarquivada', verbose_name='Tarefa Associada'),
+        ),
+        migrations.AddIndex(
+            model_name='tarefaarquivada',
+            index=models.Index(fields=['usuario', 'arquivada_em', 'id'], name='arquivada_usuario_data_idx'),
+        ),
+    ]
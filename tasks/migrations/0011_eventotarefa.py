@@ -0,0 +1,32 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0010_arquivo_frio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoTarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etapa_id', models.BigIntegerField(blank=True, null=True, verbose_name='Etapa')),
+                ('etapa_concluida', models.BooleanField(blank=True, null=True, verbose_name='Etapa Concluída?')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('tarefa', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.tarefa', verbose_name='Tarefa')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_tarefas', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Evento de Tarefa',
+                'verbose_name_plural': 'Eventos de Tarefas',
+                'indexes': [models.Index(fields=['usuario', 'id'], name='evento_usuario_id_idx'), models.Index(fields=['criado_em'], name='evento_criado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_eventotarefa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventotarefa',
+            name='removida',
+            field=models.BooleanField(default=False, verbose_name='Tarefa Removida?'),
+        ),
+        migrations.AlterField(
+            model_name='eventotarefa',
+            name='tarefa',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.tarefa', verbose_name='Tarefa'),
+        ),
+    ]
@@ -1,5 +1,12 @@
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
 from django.conf import settings 
+from django.utils import timezone
+
+from tasks import busca, cache_usuario, eventos
 
 # 1. Model CategoriaDeTarefa (Já existia, mantido)
 class CategoriaDeTarefa(models.Model):
@@ -43,6 +50,120 @@ class BaseConhecimento(models.Model):
         verbose_name_plural = 'Bases de Conhecimento'
 
 
+# QuerySet customizado da Tarefa
+class TarefaQuerySet(models.QuerySet):
+    def com_progresso(self):
+        """ Anota a porcentagem de progresso a partir dos contadores desnormalizados (sem JOIN com etapas). """
+        return self.annotate(
+            progresso_total=F('etapas_total'),
+            progresso_feitas=F('etapas_concluidas'),
+            progresso_porcentagem=Case(
+                When(etapas_total=0, then=Value(0)),
+                default=F('etapas_concluidas') * 100 / F('etapas_total'),
+                output_field=IntegerField(),
+            ),
+        )
+
+    def recalcular_contadores_etapas(self):
+        """ Corrige etapas_total/etapas_concluidas comparando com a contagem real. Retorna quantas foram corrigidas. """
+        etapas = Etapa.objects.filter(tarefa=OuterRef('pk')).order_by().values('tarefa')
+        reais = self.annotate(
+            real_total=Coalesce(Subquery(etapas.annotate(c=Count('id')).values('c')), 0),
+            real_feitas=Coalesce(Subquery(etapas.filter(concluida=True).annotate(c=Count('id')).values('c')), 0),
+        ).filter(
+            ~Q(etapas_total=F('real_total')) | ~Q(etapas_concluidas=F('real_feitas'))
+        ).values_list('pk', 'real_total', 'real_feitas', 'usuario_id')
+
+        corrigidas = [
+            Tarefa(pk=pk, etapas_total=total, etapas_concluidas=feitas, usuario_id=usuario_id)
+            for pk, total, feitas, usuario_id in reais
+        ]
+        Tarefa.objects.bulk_update(corrigidas, ['etapas_total', 'etapas_concluidas'])
+        # bulk_update não dispara sinais
+        for usuario_id in {tarefa.usuario_id for tarefa in corrigidas}:
+            cache_usuario.invalidar(usuario_id)
+        return len(corrigidas)
+
+    def recontar_etapas(self):
+        """
+        Reconta etapas_total/etapas_concluidas das tarefas deste queryset num único UPDATE
+        (usado pelos delete()/update() em lote das etapas, que não passam por Etapa.save/delete).
+        """
+        etapas = Etapa.objects.filter(tarefa=OuterRef('pk')).order_by().values('tarefa')
+        with transaction.atomic(using=self.db):
+            alteradas = self.update(
+                etapas_total=Coalesce(Subquery(etapas.annotate(c=Count('id')).values('c')), 0),
+                etapas_concluidas=Coalesce(Subquery(etapas.filter(concluida=True).annotate(c=Count('id')).values('c')), 0),
+                # Chave do cache dos cards, como em Etapa._ajustar_contadores
+                atualizada_em=timezone.now(),
+            )
+            for usuario_id in self.order_by().values_list('usuario_id', flat=True).distinct():
+                cache_usuario.invalidar(usuario_id)
+        return alteradas
+
+    def excluir_em_lote(self):
+        """
+        Apaga as tarefas deste queryset sem carregá-las. O delete() comum buscaria cada tarefa
+        e etapa para disparar os sinais de exclusão; aqui os dependentes saem por subconsulta
+        e as tarefas num único DELETE. Quem chama cuida do cache dos usuários.
+        """
+        tarefas = self.order_by()
+        ids = tarefas.values('pk')
+        busca.remover_tarefas_da_consulta(tarefas)
+        TarefaAtrasada.objects.filter(tarefa__in=ids).delete()
+        Tarefa.conhecimentos.through.objects.filter(tarefa__in=ids).delete()
+        Etapa.objects.filter(tarefa__in=ids)._raw_delete(self.db)
+        return tarefas._raw_delete(self.db)
+
+    def atrasadas(self, hoje=None):
+        """ Pendentes (não arquivadas e não concluídas) com o prazo vencido. """
+        hoje = hoje or timezone.now().date()
+        return self.filter(arquivada=False, data_conclusao__lt=hoje).exclude(status=Tarefa.StatusChoices.CONCLUIDA)
+
+    def sincronizar_atrasos(self, hoje=None):
+        """
+        Atualiza o snapshot TarefaAtrasada das tarefas deste queryset. Compara com o que já está
+        gravado e só escreve as linhas que mudaram (entrou/saiu do atraso, trocou de prazo ou de faixa).
+        Retorna a quantidade de linhas inseridas, atualizadas e removidas.
+        """
+        hoje = hoje or timezone.now().date()
+        vencidas = {
+            pk: (usuario_id, prazo)
+            for pk, usuario_id, prazo in self.atrasadas(hoje).values_list('pk', 'usuario_id', 'data_conclusao')
+        }
+        existentes = TarefaAtrasada.objects.filter(tarefa__in=self.order_by().values('pk'))
+
+        novas, alteradas, removidas, usuarios = [], [], [], set()
+        for atraso in existentes:
+            atual = vencidas.pop(atraso.tarefa_id, None)
+            if atual is None:
+                removidas.append(atraso.pk)
+                usuarios.add(atraso.usuario_id)
+                continue
+            usuario_id, prazo = atual
+            faixa = TarefaAtrasada.faixa_para((hoje - prazo).days)
+            if (atraso.usuario_id, atraso.data_conclusao, atraso.faixa) != (usuario_id, prazo, faixa):
+                atraso.usuario_id, atraso.data_conclusao, atraso.faixa = usuario_id, prazo, faixa
+                alteradas.append(atraso)
+                usuarios.add(usuario_id)
+        for pk, (usuario_id, prazo) in vencidas.items():
+            novas.append(TarefaAtrasada(
+                tarefa_id=pk, usuario_id=usuario_id, data_conclusao=prazo,
+                faixa=TarefaAtrasada.faixa_para((hoje - prazo).days),
+            ))
+            usuarios.add(usuario_id)
+
+        if usuarios:
+            with transaction.atomic():
+                TarefaAtrasada.objects.filter(pk__in=removidas).delete()
+                TarefaAtrasada.objects.bulk_create(novas, batch_size=500)
+                TarefaAtrasada.objects.bulk_update(alteradas, ['usuario', 'data_conclusao', 'faixa'], batch_size=500)
+        # O painel lê do snapshot: quem teve linhas alteradas perde o cache
+        for usuario_id in usuarios:
+            cache_usuario.invalidar(usuario_id)
+        return {'inseridas': len(novas), 'atualizadas': len(alteradas), 'removidas': len(removidas)}
+
+
 # 3. Model Tarefa
 class Tarefa(models.Model):
     # Definição do ENUM para o status
@@ -92,24 +213,60 @@ class Tarefa(models.Model):
         verbose_name='Conhecimentos Relacionados'
     )
 
+    # Contadores desnormalizados das etapas (mantidos pela Etapa com F(), ver Etapa.save/delete)
+    etapas_total = models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de Etapas')
+    etapas_concluidas = models.PositiveIntegerField(default=0, editable=False, verbose_name='Etapas Concluídas')
+
     # Timestamps
     criada_em = models.DateTimeField(auto_now_add=True, verbose_name='Criada em')
     atualizada_em = models.DateTimeField(auto_now=True, verbose_name='Última atualização')
     
+    objects = TarefaQuerySet.as_manager()
+
+    CAMPOS_CONTADORES = ('etapas_total', 'etapas_concluidas')
+
+    def save(self, *args, **kwargs):
+        # Os contadores só mudam via F() nas etapas. Um save() comum de uma instância
+        # antiga em memória não pode sobrescrevê-los, então ficam fora do UPDATE.
+        if not args and not self._state.adding and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CAMPOS_CONTADORES
+            ]
+        super().save(*args, **kwargs)
+
+    def status_pelas_etapas(self):
+        """ Decide o status pelos contadores: todas feitas -> Concluída, alguma -> Em Andamento, nenhuma -> Não Iniciado. """
+        if self.etapas_total == 0:
+            return self.status
+        if self.etapas_concluidas >= self.etapas_total:
+            return Tarefa.StatusChoices.CONCLUIDA
+        if self.etapas_concluidas > 0:
+            return Tarefa.StatusChoices.EM_ANDAMENTO
+        return Tarefa.StatusChoices.NAO_INICIADO
+
     def get_progresso(self):
-        total_etapas = self.etapas.count()
-        if total_etapas == 0:
+        # Anotações vindas de Tarefa.objects.com_progresso()
+        if hasattr(self, 'progresso_porcentagem'):
+            return {
+                'total': self.progresso_total,
+                'feitas': self.progresso_feitas,
+                'porcentagem': self.progresso_porcentagem,
+            }
+
+        # Leitura O(1) dos contadores desnormalizados
+        if self.etapas_total == 0:
             return {
                 'total': 0, 
                 'feitas': 0, 
                 'porcentagem': 0
             }
-        etapas_feitas = self.etapas.filter(concluida=True).count()
-        porcentagem = int((etapas_feitas / total_etapas) * 100)
+        porcentagem = int((self.etapas_concluidas / self.etapas_total) * 100)
         
         return {
-            'total': total_etapas,
-            'feitas': etapas_feitas,
+            'total': self.etapas_total,
+            'feitas': self.etapas_concluidas,
             'porcentagem': porcentagem
         }
 
@@ -120,9 +277,146 @@ class Tarefa(models.Model):
         verbose_name = 'Tarefa'
         verbose_name_plural = 'Tarefas'
         ordering = ['-criada_em'] # Padrão: mostra as mais novas primeiro
+        indexes = [
+            # O Django gera "NOT arquivada" / "arquivada" para o filtro booleano, que o SQLite não
+            # usa como igualdade num índice composto. Por isso arquivada vira condição de índices parciais.
+            # Paginação por cursor da lista ativa em (criada_em, id); o arquivo fica em TarefaArquivada
+            models.Index(
+                fields=['usuario', 'criada_em', 'id'],
+                condition=Q(arquivada=False),
+                name='tarefa_ativa_criada_idx',
+            ),
+            # Painel: os contadores por status/prazo/foco saem só do índice (sem ler a tabela)
+            models.Index(
+                fields=['usuario', 'status', 'data_conclusao', 'is_foco_atual'],
+                condition=Q(arquivada=False),
+                name='tarefa_ativa_status_idx',
+            ),
+            # Só tarefas pendentes (não arquivadas e não concluídas): "Para Hoje", "Atrasadas" e "Foco Atual"
+            models.Index(
+                fields=['usuario', 'data_conclusao'],
+                condition=Q(arquivada=False) & ~Q(status='concluida'),
+                name='tarefa_pendente_prazo_idx',
+            ),
+            models.Index(
+                fields=['usuario'],
+                condition=Q(arquivada=False, is_foco_atual=True) & ~Q(status='concluida'),
+                name='tarefa_pendente_foco_idx',
+            ),
+            # Comando `tarefas --atrasadas`: atraso de todos os usuários
+            models.Index(
+                fields=['data_conclusao'],
+                condition=~Q(status='concluida'),
+                name='tarefa_atrasada_idx',
+            ),
+        ]
+
+
+# 4. Snapshot das tarefas atrasadas (atualizado pelo comando `atualizar_atrasadas` e pelos sinais)
+class TarefaAtrasadaQuerySet(models.QuerySet):
+    def totais_por_usuario(self):
+        """ Total de atrasadas por usuário e por faixa de atraso, numa única agregação. """
+        por_faixa = {
+            faixa: Count('pk', filter=Q(faixa=faixa)) for faixa in TarefaAtrasada.Faixa.values
+        }
+        return self.values('usuario_id').annotate(total=Count('pk'), **por_faixa).order_by('usuario_id')
+
+
+class TarefaAtrasada(models.Model):
+    """
+    Uma linha por tarefa pendente com prazo vencido. O "está atrasada?" depende da data,
+    então não dá para mantê-lo só pelas alterações nos dados: o comando diário move as
+    tarefas que venceram e as que mudaram de faixa; os sinais cuidam das edições no meio do dia.
+    """
+    class Faixa(models.TextChoices):
+        ATE_7 = 'ate_7', 'Até 7 dias'
+        ATE_30 = 'ate_30', '8 a 30 dias'
+        ATE_90 = 'ate_90', '31 a 90 dias'
+        MAIS_90 = 'mais_90', 'Mais de 90 dias'
+
+    # (maior quantidade de dias, faixa), em ordem crescente
+    LIMITES_FAIXAS = ((7, Faixa.ATE_7), (30, Faixa.ATE_30), (90, Faixa.ATE_90))
+
+    tarefa = models.OneToOneField(
+        Tarefa,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='atraso',
+        verbose_name='Tarefa'
+    )
+    # Copiados da tarefa para contar por usuário/faixa sem JOIN
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tarefas_atrasadas',
+        verbose_name='Usuário'
+    )
+    data_conclusao = models.DateField(verbose_name='Prazo')
+    faixa = models.CharField(max_length=10, choices=Faixa.choices, verbose_name='Faixa de Atraso')
 
+    objects = TarefaAtrasadaQuerySet.as_manager()
 
-# 4. Model Etapa
+    @classmethod
+    def faixa_para(cls, dias):
+        for limite, faixa in cls.LIMITES_FAIXAS:
+            if dias <= limite:
+                return faixa
+        return cls.Faixa.MAIS_90
+
+    @property
+    def dias_atraso(self):
+        # Derivado do prazo: assim a virada do dia só reescreve as linhas que trocam de faixa
+        return (timezone.now().date() - self.data_conclusao).days
+
+    def __str__(self):
+        return f"{self.tarefa_id} ({self.get_faixa_display()})"
+
+    class Meta:
+        verbose_name = 'Tarefa Atrasada'
+        verbose_name_plural = 'Tarefas Atrasadas'
+        indexes = [
+            models.Index(fields=['usuario', 'faixa'], name='atrasada_usuario_faixa_idx'),
+            models.Index(fields=['data_conclusao'], name='atrasada_prazo_idx'),
+        ]
+
+
+# QuerySet customizado da Etapa
+class EtapaQuerySet(models.QuerySet):
+    """
+    delete() e update(concluida=/tarefa=) em lote não chamam Etapa.delete()/save(), que mantêm
+    os contadores da tarefa: aqui as tarefas afetadas são recontadas depois da operação.
+    """
+    CAMPOS_CONTADORES = {'concluida', 'tarefa', 'tarefa_id'}
+
+    def _tarefas_afetadas(self):
+        return set(self.order_by().values_list('tarefa_id', flat=True).distinct())
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            tarefas = self._tarefas_afetadas()
+            resultado = super().delete()
+            Tarefa.objects.filter(pk__in=tarefas).recontar_etapas()
+        return resultado
+
+    def update(self, **kwargs):
+        if not self.CAMPOS_CONTADORES & kwargs.keys():
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            tarefas = self._tarefas_afetadas()
+            alteradas = super().update(**kwargs)
+            # Etapas movidas: a tarefa de destino também muda
+            destino = kwargs.get('tarefa_id', kwargs.get('tarefa'))
+            if destino is not None:
+                tarefas.add(getattr(destino, 'pk', destino))
+            Tarefa.objects.filter(pk__in=tarefas).recontar_etapas()
+        return alteradas
+
+    def _atualizar_sem_contadores(self, **kwargs):
+        """ update() simples, para quem já ajusta os contadores no mesmo passo (ver Etapa.alternar). """
+        return super().update(**kwargs)
+
+
+# 5. Model Etapa
 class Etapa(models.Model):
     descricao = models.CharField(max_length=255, verbose_name='Descrição da Etapa')
     concluida = models.BooleanField(default=False, verbose_name='Concluída?')
@@ -135,10 +429,384 @@ class Etapa(models.Model):
         verbose_name='Tarefa Associada'
     )
 
+    objects = EtapaQuerySet.as_manager()
+
+    @classmethod
+    def alternar(cls, etapa_id, usuario):
+        """
+        Alterna a etapa com UPDATE atômico (SET concluida = NOT concluida) e deriva o status
+        da tarefa pai no mesmo UPDATE dos contadores. Custo constante, sem read-modify-write.
+        Retorna None se a etapa não existir ou não pertencer ao usuário.
+        """
+        with transaction.atomic():
+            alteradas = cls.objects.filter(pk=etapa_id, tarefa__usuario=usuario)._atualizar_sem_contadores(
+                concluida=~F('concluida')
+            )
+            if not alteradas:
+                return None
+
+            tarefa_id, concluida = cls.objects.filter(pk=etapa_id).values_list('tarefa_id', 'concluida').get()
+            # No SET, todas as expressões enxergam os valores antigos da linha
+            feitas = F('etapas_concluidas') + (1 if concluida else -1)
+            Tarefa.objects.filter(pk=tarefa_id).update(
+                etapas_concluidas=feitas,
+                status=cls._status_pelas_etapas(feitas),
+                atualizada_em=timezone.now(),
+            )
+            status, prazo, arquivada = Tarefa.objects.filter(pk=tarefa_id)\
+                .values_list('status', 'data_conclusao', 'arquivada').get()
+
+        # update() não dispara sinais: invalida o cache, publica o evento e atualiza o snapshot de atrasos aqui
+        cache_usuario.invalidar(usuario.pk)
+        EventoTarefa.objects.publicar(usuario.pk, tarefa_id, etapa_id, concluida)
+        if not arquivada and prazo and prazo < timezone.now().date():
+            # Só tarefa com prazo vencido pode entrar/sair do snapshot ao mudar de status
+            Tarefa.objects.filter(pk=tarefa_id).sincronizar_atrasos()
+
+        return {
+            'etapa_concluida': concluida,
+            'tarefa_id': tarefa_id,
+            'tarefa_status': status,
+        }
+
+    @classmethod
+    async def aalternar(cls, etapa_id, usuario):
+        """
+        alternar() para a view async. O ORM assíncrono ainda não abre transações, então a
+        troca inteira roda numa única ida à thread síncrona: o UPDATE atômico da etapa e o
+        delta dos contadores continuam na mesma transação, sem uma segunda implementação.
+        """
+        return await sync_to_async(cls.alternar)(etapa_id, usuario)
+
+    @staticmethod
+    def _status_pelas_etapas(feitas):
+        """ Status da tarefa derivado de `feitas` (expressão com as etapas concluídas), no próprio UPDATE. """
+        return Case(
+            When(etapas_total=0, then=F('status')),
+            When(etapas_total__lte=feitas, then=Value(Tarefa.StatusChoices.CONCLUIDA)),
+            When(GreaterThan(feitas, 0), then=Value(Tarefa.StatusChoices.EM_ANDAMENTO)),
+            default=Value(Tarefa.StatusChoices.NAO_INICIADO),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Guarda o estado original para calcular o delta dos contadores no save()
+        instancia._concluida_original = instancia.__dict__.get('concluida')
+        instancia._tarefa_original = instancia.__dict__.get('tarefa_id')
+        return instancia
+
+    def _ajustar_contadores(self, tarefa_id, delta_total, delta_feitas):
+        # Mesmo sem delta (ex.: só a descrição mudou) a tarefa é marcada como atualizada:
+        # o cache do card (id + atualizada_em) depende disso para enxergar mudanças nas etapas
+        Tarefa.objects.filter(pk=tarefa_id).update(
+            etapas_total=F('etapas_total') + delta_total,
+            etapas_concluidas=F('etapas_concluidas') + delta_feitas,
+            atualizada_em=timezone.now(),
+        )
+        # Mantém coerente a tarefa que já está em memória (ex.: formset.instance)
+        if Etapa.tarefa.is_cached(self) and self.tarefa.pk == tarefa_id:
+            self.tarefa.etapas_total += delta_total
+            self.tarefa.etapas_concluidas += delta_feitas
+
+    def save(self, *args, **kwargs):
+        nova = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        concluida_original = getattr(self, '_concluida_original', None)
+        tarefa_original = getattr(self, '_tarefa_original', None)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if nova:
+                self._ajustar_contadores(self.tarefa_id, 1, int(self.concluida))
+            elif concluida_original is None or tarefa_original is None:
+                # Estado original desconhecido (campo adiado): recalcula só esta tarefa
+                Tarefa.objects.filter(pk=self.tarefa_id).recalcular_contadores_etapas()
+                self._ajustar_contadores(self.tarefa_id, 0, 0)
+            elif tarefa_original != self.tarefa_id:
+                self._ajustar_contadores(tarefa_original, -1, -int(concluida_original))
+                self._ajustar_contadores(self.tarefa_id, 1, int(self.concluida))
+            else:
+                delta_feitas = int(self.concluida) - int(concluida_original)
+                if update_fields is not None and 'concluida' not in update_fields:
+                    delta_feitas = 0
+                self._ajustar_contadores(self.tarefa_id, 0, delta_feitas)
+
+        self._concluida_original = self.concluida
+        self._tarefa_original = self.tarefa_id
+
+    def delete(self, *args, **kwargs):
+        concluida = getattr(self, '_concluida_original', None)
+        if concluida is None:
+            concluida = self.concluida
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            self._ajustar_contadores(self.tarefa_id, -1, -int(concluida))
+        return resultado
+
     def __str__(self):
         return f"{self.ordem} - {self.descricao}"
 
     class Meta:
         verbose_name = 'Etapa'
         verbose_name_plural = 'Etapas'
-        ordering = ['ordem'] # Garante que sempre venha ordenado 1, 2, 3...
\ No newline at end of file
+        ordering = ['ordem'] # Garante que sempre venha ordenado 1, 2, 3...
+
+# 6. Arquivo frio: tarefas arquivadas (e suas etapas) saem das tabelas quentes.
+# Mantêm o id original, então voltam para Tarefa/Etapa com os mesmos ids (ver tasks/arquivamento.py).
+class TarefaArquivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    titulo = models.CharField(max_length=255, verbose_name='Título da Tarefa')
+    descricao = models.TextField(verbose_name='Descrição', blank=True, null=True)
+    data_inicio = models.DateField(verbose_name='Data de Início', null=True, blank=True)
+    data_conclusao = models.DateField(verbose_name='Data de Conclusão', null=True, blank=True)
+    status = models.CharField(max_length=20, choices=Tarefa.StatusChoices.choices, verbose_name='Status')
+    is_foco_atual = models.BooleanField(default=False, verbose_name='Foco Atual?')
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='arquivo_tarefas',
+        verbose_name='Usuário Responsável'
+    )
+    categoria = models.ForeignKey(
+        CategoriaDeTarefa,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tarefas_arquivadas',
+        verbose_name='Categoria'
+    )
+    conhecimentos = models.ManyToManyField(
+        BaseConhecimento,
+        blank=True,
+        related_name='tarefas_arquivadas',
+        verbose_name='Conhecimentos Relacionados'
+    )
+
+    etapas_total = models.PositiveIntegerField(default=0, verbose_name='Total de Etapas')
+    etapas_concluidas = models.PositiveIntegerField(default=0, verbose_name='Etapas Concluídas')
+
+    criada_em = models.DateTimeField(verbose_name='Criada em')
+    atualizada_em = models.DateTimeField(verbose_name='Última atualização')
+    arquivada_em = models.DateTimeField(verbose_name='Arquivada em')
+
+    def __str__(self):
+        return self.titulo
+
+    class Meta:
+        verbose_name = 'Tarefa Arquivada'
+        verbose_name_plural = 'Tarefas Arquivadas'
+        ordering = ['-arquivada_em']
+        indexes = [
+            # Paginação por cursor da tela de arquivadas e exportação
+            models.Index(fields=['usuario', 'arquivada_em', 'id'], name='arquivada_usuario_data_idx'),
+        ]
+
+
+class EtapaArquivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    descricao = models.CharField(max_length=255, verbose_name='Descrição da Etapa')
+    concluida = models.BooleanField(default=False, verbose_name='Concluída?')
+    ordem = models.PositiveIntegerField(default=0, verbose_name='Ordem de Execução')
+
+    tarefa = models.ForeignKey(
+        TarefaArquivada,
+        on_delete=models.CASCADE,
+        related_name='etapas',
+        verbose_name='Tarefa Associada'
+    )
+
+    def __str__(self):
+        return f"{self.ordem} - {self.descricao}"
+
+    class Meta:
+        verbose_name = 'Etapa Arquivada'
+        verbose_name_plural = 'Etapas Arquivadas'
+        ordering = ['ordem']
+
+
+# 7. Model ImportJob (importação de CSV processada fora da requisição HTTP)
+class ImportJob(models.Model):
+    class StatusChoices(models.TextChoices):
+        PENDENTE = 'pendente', 'Pendente'
+        PROCESSANDO = 'processando', 'Processando'
+        CONCLUIDO = 'concluido', 'Concluído'
+        FALHOU = 'falhou', 'Falhou'
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='importacoes',
+        verbose_name='Usuário'
+    )
+    arquivo = models.FileField(upload_to='importacoes/%Y/%m/', verbose_name='Arquivo CSV')
+    nome_original = models.CharField(max_length=255, verbose_name='Nome do Arquivo')
+
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDENTE,
+        verbose_name='Status'
+    )
+    linhas_processadas = models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')
+    tarefas_criadas = models.PositiveIntegerField(default=0, verbose_name='Tarefas Criadas')
+    etapas_criadas = models.PositiveIntegerField(default=0, verbose_name='Etapas Criadas')
+    erros = models.JSONField(default=list, blank=True, verbose_name='Erros por Linha')
+
+    # Identifica qual worker pegou o job (ex.: host:pid)
+    worker = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    iniciado_em = models.DateTimeField(null=True, blank=True, verbose_name='Iniciado em')
+    finalizado_em = models.DateTimeField(null=True, blank=True, verbose_name='Finalizado em')
+    # Batimento do worker: atualizado a cada lote, usado para recuperar jobs abandonados
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name='Última atualização')
+
+    @classmethod
+    def reivindicar_proximo(cls, worker):
+        """
+        Pega o job pendente mais antigo para este worker. A troca de status é um UPDATE
+        condicional (WHERE status = 'pendente'): se dois workers tentarem o mesmo job,
+        só um deles afeta a linha e o outro tenta o próximo.
+        """
+        while True:
+            candidato = cls.objects.filter(
+                status=cls.StatusChoices.PENDENTE
+            ).order_by('criado_em', 'id').values_list('id', flat=True).first()
+            if candidato is None:
+                return None
+
+            reivindicado = cls.objects.filter(pk=candidato, status=cls.StatusChoices.PENDENTE).update(
+                status=cls.StatusChoices.PROCESSANDO,
+                worker=worker,
+                iniciado_em=timezone.now(),
+                atualizado_em=timezone.now(),
+            )
+            if reivindicado:
+                return cls.objects.get(pk=candidato)
+
+    @property
+    def finalizado(self):
+        return self.status in (self.StatusChoices.CONCLUIDO, self.StatusChoices.FALHOU)
+
+    def __str__(self):
+        return f"{self.nome_original} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = 'Importação de Tarefas'
+        verbose_name_plural = 'Importações de Tarefas'
+        ordering = ['-criado_em']
+        indexes = [
+            models.Index(fields=['status', 'criado_em'], name='importjob_status_criado_idx'),
+        ]
+
+
+# 8. Log de eventos das tarefas (o que os fluxos SSE enviam, ver tasks/eventos.py)
+class EventoTarefaQuerySet(models.QuerySet):
+    def publicar(self, usuario_id, tarefa_id, etapa_id=None, etapa_concluida=None):
+        """ Grava o evento quando a transação atual confirmar (na hora, fora de uma) e acorda os fluxos. """
+        def gravar():
+            self.create(usuario_id=usuario_id, tarefa_id=tarefa_id, etapa_id=etapa_id, etapa_concluida=etapa_concluida)
+            eventos.acordar(usuario_id)
+        transaction.on_commit(gravar)
+
+    def publicar_em_lote(self, usuario_id, tarefa_ids, removidas=False):
+        """
+        Um evento por tarefa alterada (ou removida: arquivada/excluída) pelos caminhos em lote,
+        que não passam pelos sinais. Gravados com um único INSERT quando a transação confirmar.
+        """
+        tarefa_ids = list(tarefa_ids)
+        if not tarefa_ids:
+            return
+
+        def gravar():
+            self.bulk_create(
+                [self.model(usuario_id=usuario_id, tarefa_id=tarefa_id, removida=removidas) for tarefa_id in tarefa_ids],
+                batch_size=500,
+            )
+            eventos.acordar(usuario_id)
+        transaction.on_commit(gravar)
+
+    def pendentes(self, usuario_id, ultimo_id, limite=100):
+        """
+        Eventos do usuário depois de `ultimo_id`, com o estado ATUAL da tarefa (LEFT JOIN): vários
+        eventos da mesma tarefa trazem o mesmo estado e o fluxo nunca envia um progresso velho.
+        Alterações de tarefas que já não estão na tabela (excluídas, arquivadas) ficam de fora;
+        a remoção em si chega pelo evento `removida`.
+        """
+        return self.filter(
+            Q(removida=True) | Q(tarefa__status__isnull=False), usuario_id=usuario_id, id__gt=ultimo_id,
+        ).order_by('id').values(
+            'id', 'tarefa_id', 'etapa_id', 'etapa_concluida', 'removida',
+            status=F('tarefa__status'),
+            etapas_total=F('tarefa__etapas_total'),
+            etapas_concluidas=F('tarefa__etapas_concluidas'),
+            categoria_nome=F('tarefa__categoria__nome'),
+            categoria_cor=F('tarefa__categoria__cor'),
+        )[:limite]
+
+    async def aultimo_id(self, usuario_id):
+        """ Id do último evento do usuário (0 se não houver): um fluxo novo começa depois dele. """
+        agregado = await self.filter(usuario_id=usuario_id).aaggregate(ultimo=Max('id'))
+        return agregado['ultimo'] or 0
+
+
+class EventoTarefa(models.Model):
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='eventos_tarefas',
+        verbose_name='Usuário'
+    )
+    # Sem constraint nem cascata: o log não pesa nas exclusões (nem nas em lote, com _raw_delete);
+    # eventos de tarefas que sumiram só deixam de sair no fluxo e são apagados por `limpar_eventos`.
+    # null=True só para o JOIN de pendentes() ser LEFT: o evento de remoção chega sem a tarefa
+    tarefa = models.ForeignKey(
+        Tarefa,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+',
+        verbose_name='Tarefa'
+    )
+    # Preenchidos quando o evento é uma etapa alternada (as outras abas marcam o checkbox)
+    etapa_id = models.BigIntegerField(null=True, blank=True, verbose_name='Etapa')
+    etapa_concluida = models.BooleanField(null=True, blank=True, verbose_name='Etapa Concluída?')
+    # A tarefa saiu das listas (arquivada ou excluída): as outras abas tiram o card
+    removida = models.BooleanField(default=False, verbose_name='Tarefa Removida?')
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+
+    objects = EventoTarefaQuerySet.as_manager()
+
+    @staticmethod
+    def dados(linha):
+        """ Corpo (JSON) do evento SSE a partir de uma linha de pendentes(). """
+        if linha['removida']:
+            return {'tarefa_id': linha['tarefa_id'], 'removida': True}
+        total, feitas = linha['etapas_total'], linha['etapas_concluidas']
+        return {
+            'tarefa_id': linha['tarefa_id'],
+            'removida': False,
+            'status': linha['status'],
+            'status_label': Tarefa.StatusChoices(linha['status']).label,
+            'etapas_total': total,
+            'etapas_concluidas': feitas,
+            'progresso': int(feitas / total * 100) if total else 0,
+            'etapa_id': linha['etapa_id'],
+            'etapa_concluida': linha['etapa_concluida'],
+            'categoria_nome': linha['categoria_nome'],
+            'categoria_cor': linha['categoria_cor'],
+        }
+
+    def __str__(self):
+        return f"{self.tarefa_id} ({self.criado_em:%d/%m/%Y %H:%M})"
+
+    class Meta:
+        verbose_name = 'Evento de Tarefa'
+        verbose_name_plural = 'Eventos de Tarefas'
+        indexes = [
+            models.Index(fields=['usuario', 'id'], name='evento_usuario_id_idx'),
+            models.Index(fields=['criado_em'], name='evento_criado_idx'),
+        ]
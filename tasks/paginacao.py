@@ -0,0 +1,94 @@
+"""
+Paginação por cursor (keyset) para listas ordenadas por (campo DESC, id DESC).
+
+Em vez de OFFSET, cada página começa logo após o último item da anterior, então o
+custo é o mesmo na primeira página ou na milésima (desde que exista um índice
+cobrindo o filtro + campo + id).
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+@dataclass
+class PaginaCursor:
+    itens: list
+    proximo_cursor: str = None
+
+    @property
+    def tem_mais(self):
+        return self.proximo_cursor is not None
+
+
+def _valor(item, campo):
+    # Aceita instâncias de model e dicionários vindos de .values()
+    return item[campo] if isinstance(item, dict) else getattr(item, campo)
+
+
+def codificar_cursor(valor, pk):
+    if isinstance(valor, (date, datetime)):
+        valor = valor.isoformat()
+    bruto = json.dumps([valor, pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, campo_modelo):
+    """ Retorna (valor, pk) ou levanta ValueError se o cursor for inválido. """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valor, pk = json.loads(bruto)
+        # As conversões também ficam aqui: um cursor em base64/JSON válido ainda pode
+        # trazer um valor ou pk do tipo errado (ex.: ["abc", 1] ou ["2024-01-01", null])
+        if valor is not None:
+            valor = campo_modelo.to_python(valor)
+        pk = int(pk)
+    except (TypeError, ValueError, ValidationError):
+        raise ValueError('Cursor inválido.')
+    return valor, pk
+
+
+def _filtrar_pelo_cursor(queryset, campo, cursor):
+    queryset = queryset.order_by(f'-{campo}', '-id')
+
+    if cursor:
+        try:
+            valor, pk = decodificar_cursor(cursor, queryset.model._meta.get_field(campo))
+        except ValueError:
+            valor = pk = None
+        if pk is not None:
+            # "campo <= valor" permite ao banco ir direto ao ponto no índice;
+            # o OR só desempata os itens com o mesmo valor pelo id.
+            queryset = queryset.filter(
+                Q(**{f'{campo}__lte': valor}),
+                Q(**{f'{campo}__lt': valor}) | Q(id__lt=pk),
+            )
+    return queryset
+
+
+def _montar_pagina(itens, campo, tamanho):
+    proximo_cursor = None
+    if len(itens) > tamanho:
+        itens = itens[:tamanho]
+        ultimo = itens[-1]
+        proximo_cursor = codificar_cursor(_valor(ultimo, campo), _valor(ultimo, 'id'))
+
+    return PaginaCursor(itens=itens, proximo_cursor=proximo_cursor)
+
+
+def paginar_por_cursor(queryset, campo, cursor=None, tamanho=25):
+    """
+    Pagina `queryset` por (campo DESC, id DESC). Um cursor inválido volta para a
+    primeira página, como o Paginator.get_page faz com números de página inválidos.
+    """
+    queryset = _filtrar_pelo_cursor(queryset, campo, cursor)
+    return _montar_pagina(list(queryset[:tamanho + 1]), campo, tamanho)
+
+
+async def apaginar_por_cursor(queryset, campo, cursor=None, tamanho=25):
+    """ Versão assíncrona de paginar_por_cursor() (para views `async def`). """
+    queryset = _filtrar_pelo_cursor(queryset, campo, cursor)
+    return _montar_pagina([item async for item in queryset[:tamanho + 1]], campo, tamanho)
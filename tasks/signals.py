@@ -0,0 +1,122 @@
+import threading
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from tasks import busca, cache_usuario
+from tasks.models import BaseConhecimento, CategoriaDeTarefa, Etapa, EventoTarefa, Tarefa
+
+
+@receiver(connection_created)
+def configurar_sqlite(sender, connection, **kwargs):
+    """ No SQLite, o modo WAL deixa leitores e escritor trabalharem ao mesmo tempo. """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL;')
+            cursor.execute('PRAGMA synchronous=NORMAL;')
+
+
+# --- Índice de busca (FTS5): mantido a cada save/delete ---
+
+CAMPOS_TEXTO_TAREFA = {'titulo', 'descricao'}
+
+
+@receiver(post_save, sender=Tarefa)
+def indexar_tarefa(sender, instance, update_fields=None, **kwargs):
+    # save(update_fields=[...]) que não mexe no texto (status, foco...) não precisa reindexar
+    if update_fields is not None and not CAMPOS_TEXTO_TAREFA & set(update_fields):
+        return
+    busca.indexar_tarefas([instance.pk])
+
+
+@receiver(post_delete, sender=Tarefa)
+def remover_tarefa_da_busca(sender, instance, **kwargs):
+    busca.remover(busca.TIPO_TAREFA, instance.pk)
+
+
+# Tarefas com etapas alteradas na transação em andamento (por thread, como as conexões)
+_etapas_pendentes = threading.local()
+
+
+def _reindexar_pendentes():
+    tarefas = getattr(_etapas_pendentes, 'tarefas', set())
+    _etapas_pendentes.tarefas = set()
+    if tarefas:
+        busca.indexar_tarefas(tarefas)
+
+
+@receiver(post_save, sender=Etapa)
+@receiver(post_delete, sender=Etapa)
+def reindexar_tarefa_da_etapa(sender, instance, update_fields=None, **kwargs):
+    # As etapas fazem parte do documento da tarefa (marcar como concluída não muda o texto)
+    if update_fields is not None and not {'descricao', 'tarefa'} & set(update_fields):
+        return
+    # No post_save, _tarefa_original ainda aponta para a tarefa anterior se a etapa mudou de tarefa
+    tarefas = {instance.tarefa_id, getattr(instance, '_tarefa_original', None)} - {None}
+    # Reindexa no commit, uma vez por tarefa: salvar um formset com N etapas não refaz o documento
+    # (e o group_concat das etapas) N vezes. Fora de uma transação, o on_commit roda na hora
+    if not hasattr(_etapas_pendentes, 'tarefas'):
+        _etapas_pendentes.tarefas = set()
+    _etapas_pendentes.tarefas.update(tarefas)
+    transaction.on_commit(_reindexar_pendentes)
+
+
+@receiver(post_save, sender=BaseConhecimento)
+def indexar_conhecimento(sender, instance, **kwargs):
+    busca.indexar_conhecimento(instance.pk)
+
+
+@receiver(post_delete, sender=BaseConhecimento)
+def remover_conhecimento_da_busca(sender, instance, **kwargs):
+    busca.remover(busca.TIPO_CONHECIMENTO, instance.pk)
+
+
+# --- Cache por usuário: qualquer alteração invalida os dados em cache do dono ---
+
+@receiver(post_save, sender=Tarefa)
+@receiver(post_delete, sender=Tarefa)
+@receiver(post_save, sender=CategoriaDeTarefa)
+@receiver(post_delete, sender=CategoriaDeTarefa)
+@receiver(post_save, sender=BaseConhecimento)
+@receiver(post_delete, sender=BaseConhecimento)
+def invalidar_cache_do_dono(sender, instance, **kwargs):
+    cache_usuario.invalidar(instance.usuario_id)
+
+
+@receiver(post_save, sender=Etapa)
+@receiver(post_delete, sender=Etapa)
+def invalidar_cache_da_etapa(sender, instance, **kwargs):
+    if Etapa.tarefa.is_cached(instance):
+        usuario_id = instance.tarefa.usuario_id
+    else:
+        usuario_id = Tarefa.objects.filter(pk=instance.tarefa_id).values_list('usuario_id', flat=True).first()
+    if usuario_id is not None:
+        cache_usuario.invalidar(usuario_id)
+
+
+# --- Snapshot de atrasadas: edições no meio do dia entram/saem na hora ---
+
+CAMPOS_ATRASO_TAREFA = {'status', 'data_conclusao', 'arquivada', 'usuario'}
+
+
+@receiver(post_save, sender=Tarefa)
+def sincronizar_atraso_da_tarefa(sender, instance, created=False, update_fields=None, **kwargs):
+    if update_fields is not None and not CAMPOS_ATRASO_TAREFA & set(update_fields):
+        return
+    hoje = timezone.now().date()
+    # Tarefa nova sem prazo vencido não pode ter linha no snapshot
+    if created and not (instance.data_conclusao and instance.data_conclusao < hoje):
+        return
+    Tarefa.objects.filter(pk=instance.pk).sincronizar_atrasos(hoje)
+
+
+# --- Eventos ao vivo (SSE): as outras abas do dono atualizam status e progresso ---
+
+@receiver(post_save, sender=Tarefa)
+def publicar_evento_da_tarefa(sender, instance, created=False, **kwargs):
+    # Tarefa nova não está em nenhuma página aberta; o evento sai no commit (ver EventoTarefa.publicar)
+    if not created:
+        EventoTarefa.objects.publicar(instance.usuario_id, instance.pk)
@@ -1,7 +1,24 @@
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, override_settings
 from django.contrib.auth import get_user_model
-from tasks.models import Tarefa, CategoriaDeTarefa, Etapa
+from tasks.models import Tarefa, TarefaArquivada, EtapaArquivada, TarefaAtrasada, CategoriaDeTarefa, Etapa, EventoTarefa
+from tasks.forms import EtapaFormSet
+from tasks.paginacao import paginar_por_cursor
+from tasks.checks import cache_usuario_compartilhado
+from django.core.management import call_command
+from io import StringIO
+import asyncio
+import base64
+import json
+import threading
+from unittest import mock
+from asgiref.sync import async_to_sync, sync_to_async
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.core.cache import cache, caches
+from tasks import acoes_lote, arquivamento, busca, cache_usuario
+from datetime import timedelta
 
 User = get_user_model()
 
@@ -33,6 +50,101 @@ class TarefaModelTest(TestCase):
         self.assertEqual(progresso['feitas'], 1)
         self.assertEqual(progresso['porcentagem'], 50)
 
+    def test_get_progresso_com_anotacao_nao_consulta(self):
+        Etapa.objects.create(descricao='Step 1', tarefa=self.tarefa, concluida=True)
+        Etapa.objects.create(descricao='Step 2', tarefa=self.tarefa, concluida=True)
+        Etapa.objects.create(descricao='Step 3', tarefa=self.tarefa, concluida=False)
+
+        tarefa = Tarefa.objects.com_progresso().get(pk=self.tarefa.pk)
+        with self.assertNumQueries(0):
+            progresso = tarefa.get_progresso()
+        self.assertEqual(progresso, {'total': 3, 'feitas': 2, 'porcentagem': 66})
+
+        tarefa = Tarefa.objects.prefetch_related('etapas').get(pk=self.tarefa.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(tarefa.get_progresso(), progresso)
+
+class ContadoresEtapasTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='contador@example.com', nome='Contador', password='password')
+        self.tarefa = Tarefa.objects.create(titulo='Checklist', usuario=self.user)
+
+    def contadores(self):
+        self.tarefa.refresh_from_db()
+        return self.tarefa.etapas_total, self.tarefa.etapas_concluidas
+
+    def test_contadores_acompanham_criacao_alteracao_e_exclusao(self):
+        etapa = Etapa.objects.create(descricao='A', tarefa=self.tarefa)
+        Etapa.objects.create(descricao='B', tarefa=self.tarefa, concluida=True)
+        self.assertEqual(self.contadores(), (2, 1))
+
+        etapa = Etapa.objects.get(pk=etapa.pk)
+        etapa.concluida = True
+        etapa.save()
+        self.assertEqual(self.contadores(), (2, 2))
+
+        etapa.delete()
+        self.assertEqual(self.contadores(), (1, 1))
+
+    def test_update_e_delete_em_lote_mantem_contadores(self):
+        etapa = Etapa.objects.create(descricao='A', tarefa=self.tarefa)
+        Etapa.objects.create(descricao='B', tarefa=self.tarefa)
+        outra = Tarefa.objects.create(titulo='Outra', usuario=self.user)
+
+        Etapa.objects.filter(tarefa=self.tarefa).update(concluida=True)
+        self.assertEqual(self.contadores(), (2, 2))
+
+        # Etapa movida: as duas tarefas são recontadas
+        Etapa.objects.filter(pk=etapa.pk).update(tarefa=outra)
+        self.assertEqual(self.contadores(), (1, 1))
+        outra.refresh_from_db()
+        self.assertEqual((outra.etapas_total, outra.etapas_concluidas), (1, 1))
+
+        Etapa.objects.filter(tarefa__usuario=self.user).delete()
+        self.assertEqual(self.contadores(), (0, 0))
+        self.assertEqual(Tarefa.objects.filter(usuario=self.user).recalcular_contadores_etapas(), 0)
+
+    def test_save_da_tarefa_nao_sobrescreve_contadores(self):
+        tarefa_antiga = Tarefa.objects.get(pk=self.tarefa.pk)
+        Etapa.objects.create(descricao='A', tarefa=self.tarefa)
+        tarefa_antiga.titulo = 'Novo título'
+        tarefa_antiga.save()
+        self.assertEqual(self.contadores(), (1, 0))
+
+    def test_formset_mantem_contadores(self):
+        etapa = Etapa.objects.create(descricao='A', tarefa=self.tarefa)
+        formset = EtapaFormSet({
+            'etapas-TOTAL_FORMS': '2',
+            'etapas-INITIAL_FORMS': '1',
+            'etapas-0-id': str(etapa.pk),
+            'etapas-0-descricao': 'A',
+            'etapas-0-concluida': 'on',
+            'etapas-1-descricao': 'B',
+        }, instance=self.tarefa)
+        self.assertTrue(formset.is_valid())
+        formset.save()
+        self.assertEqual(self.contadores(), (2, 1))
+
+    def test_comando_recalcula_divergencia(self):
+        Etapa.objects.create(descricao='A', tarefa=self.tarefa, concluida=True)
+        Tarefa.objects.filter(pk=self.tarefa.pk).update(etapas_total=7, etapas_concluidas=0)
+
+        out = StringIO()
+        call_command('recalcular_etapas', '--lote', '1', stdout=out)
+        self.assertIn('1 tarefa(s) com contadores corrigidos.', out.getvalue())
+        self.assertEqual(self.contadores(), (1, 1))
+
+    def test_toggle_atualiza_status_pelos_contadores(self):
+        etapa = Etapa.objects.create(descricao='A', tarefa=self.tarefa)
+        Etapa.objects.create(descricao='B', tarefa=self.tarefa, concluida=True)
+
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(reverse('atualizar_etapa', args=[etapa.pk]))
+        self.assertEqual(response.json()['tarefa_status_code'], Tarefa.StatusChoices.CONCLUIDA)
+        self.assertEqual(self.contadores(), (2, 2))
+
+
 class CategoriaViewTest(TestCase):
     def setUp(self):
         self.user_a = User.objects.create_user(email='user_a@example.com', nome='User A', password='password')
@@ -63,3 +175,852 @@ class CategoriaViewTest(TestCase):
         self.assertEqual(response.status_code, 403)
  
 
+
+class PainelViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='painel@example.com', nome='Painel User', password='password')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.hoje = timezone.now().date()
+
+    def criar_tarefas(self, quantidade):
+        categoria = CategoriaDeTarefa.objects.create(nome=f'Cat {quantidade}', usuario=self.user)
+        for i in range(quantidade):
+            tarefa = Tarefa.objects.create(
+                titulo=f'Tarefa {i}',
+                usuario=self.user,
+                categoria=categoria,
+                data_conclusao=self.hoje - timedelta(days=i % 3),
+                is_foco_atual=(i % 2 == 0),
+                status=Tarefa.StatusChoices.CONCLUIDA if i % 5 == 0 else Tarefa.StatusChoices.NAO_INICIADO,
+            )
+            Etapa.objects.create(descricao='Etapa', tarefa=tarefa)
+
+    def test_painel_contagens_e_grupos(self):
+        pendente_hoje = Tarefa.objects.create(titulo='Hoje e foco', usuario=self.user, data_conclusao=self.hoje, is_foco_atual=True)
+        atrasada = Tarefa.objects.create(titulo='Atrasada', usuario=self.user, data_conclusao=self.hoje - timedelta(days=2))
+        concluida = Tarefa.objects.create(titulo='Feita', usuario=self.user, data_conclusao=self.hoje, status=Tarefa.StatusChoices.CONCLUIDA)
+        Tarefa.objects.create(titulo='Futura', usuario=self.user, data_conclusao=self.hoje + timedelta(days=2))
+        Tarefa.objects.create(titulo='Arquivada', usuario=self.user, data_conclusao=self.hoje, arquivada=True)
+
+        response = self.client.get(reverse('painel'))
+
+        self.assertEqual(response.context['total'], 4)
+        self.assertEqual(response.context['hoje'], 1)
+        self.assertEqual(response.context['foco'], 1)
+        self.assertEqual(response.context['atrasadas'], 1)
+        self.assertEqual(response.context['concluidas'], 1)
+        self.assertEqual(response.context['tarefas_hoje_list'], [pendente_hoje])
+        self.assertEqual(response.context['tarefas_foco_list'], [pendente_hoje])
+        self.assertEqual(response.context['tarefas_atrasadas_list'], [atrasada])
+        self.assertEqual(response.context['tarefas_concluidas_list'], [concluida])
+
+    def test_painel_orcamento_fixo_de_consultas(self):
+        # sessão + usuário + agregação + tarefas + etapas (prefetch)
+        for quantidade in (3, 40):
+            self.criar_tarefas(quantidade)
+            with self.assertNumQueries(5):
+                response = self.client.get(reverse('painel'))
+            self.assertEqual(response.status_code, 200)
+
+    def test_painel_em_cache_nao_consulta_tarefas(self):
+        self.criar_tarefas(10)
+        self.client.get(reverse('painel'))
+
+        # Só sessão + usuário; nenhuma consulta em tarefas/etapas
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(reverse('painel'))
+        self.assertEqual(len(contexto.captured_queries), 2)
+        self.assertFalse(any('tasks_' in consulta['sql'] for consulta in contexto.captured_queries))
+        self.assertEqual(response.context['total'], 10)
+        self.assertEqual(cache_usuario.estatisticas()['acertos'], 1)
+
+    def test_alteracoes_invalidam_o_cache(self):
+        tarefa = Tarefa.objects.create(titulo='Foco', usuario=self.user, is_foco_atual=True)
+        etapa = Etapa.objects.create(descricao='Etapa', tarefa=tarefa)
+        self.assertEqual(self.client.get(reverse('painel')).context['foco'], 1)
+
+        # Etapa alternada via UPDATE (sem sinais) -> tarefa concluída
+        Etapa.alternar(etapa.pk, self.user)
+        response = self.client.get(reverse('painel'))
+        self.assertEqual(response.context['foco'], 0)
+        self.assertEqual(response.context['concluidas'], 1)
+
+        Tarefa.objects.create(titulo='Nova', usuario=self.user)
+        self.assertEqual(self.client.get(reverse('painel')).context['total'], 2)
+
+        # Alterações de outro usuário não invalidam este
+        outro = User.objects.create_user(email='outro-painel@example.com', nome='Outro', password='password')
+        Tarefa.objects.create(titulo='Dele', usuario=outro)
+        self.client.get(reverse('painel'))
+        self.assertEqual(cache_usuario.estatisticas()['acertos'], 1)
+
+
+class SnapshotAtrasadasTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='atraso@example.com', nome='Atraso', password='password')
+        self.hoje = timezone.now().date()
+
+    def test_sinais_mantem_o_snapshot(self):
+        tarefa = Tarefa.objects.create(titulo='Vencida', usuario=self.user, data_conclusao=self.hoje - timedelta(days=10))
+        Tarefa.objects.create(titulo='Em dia', usuario=self.user, data_conclusao=self.hoje)
+
+        atraso = TarefaAtrasada.objects.get()
+        self.assertEqual(atraso.tarefa, tarefa)
+        self.assertEqual(atraso.faixa, TarefaAtrasada.Faixa.ATE_30)
+        self.assertEqual(atraso.dias_atraso, 10)
+
+        tarefa.status = Tarefa.StatusChoices.CONCLUIDA
+        tarefa.save()
+        self.assertFalse(TarefaAtrasada.objects.exists())
+
+        # Etapa alternada por UPDATE (sem sinais) também tira/recoloca a tarefa no snapshot
+        tarefa.status = Tarefa.StatusChoices.NAO_INICIADO
+        tarefa.save()
+        etapa = Etapa.objects.create(descricao='Única', tarefa=tarefa)
+        Etapa.alternar(etapa.pk, self.user)
+        self.assertFalse(TarefaAtrasada.objects.exists())
+        Etapa.alternar(etapa.pk, self.user)
+        self.assertTrue(TarefaAtrasada.objects.filter(tarefa=tarefa).exists())
+
+    def test_sincronizacao_incremental(self):
+        tarefas = [
+            Tarefa.objects.create(titulo=f'T{dias}', usuario=self.user, data_conclusao=self.hoje - timedelta(days=dias))
+            for dias in (0, 3, 7, 40)
+        ]
+        self.assertEqual(
+            Tarefa.objects.all().sincronizar_atrasos(),
+            {'inseridas': 0, 'atualizadas': 0, 'removidas': 0},
+        )
+
+        # Dia seguinte: a de hoje entra, a de 7 dias muda de faixa, as demais ficam intactas
+        amanha = self.hoje + timedelta(days=1)
+        self.assertEqual(
+            Tarefa.objects.all().sincronizar_atrasos(amanha),
+            {'inseridas': 1, 'atualizadas': 1, 'removidas': 0},
+        )
+        self.assertEqual(TarefaAtrasada.objects.get(tarefa=tarefas[2]).faixa, TarefaAtrasada.Faixa.ATE_30)
+        self.assertEqual(
+            list(TarefaAtrasada.objects.totais_por_usuario()),
+            [{'usuario_id': self.user.pk, 'total': 4, 'ate_7': 2, 'ate_30': 1, 'ate_90': 1, 'mais_90': 0}],
+        )
+
+    def test_painel_le_do_snapshot(self):
+        client = Client()
+        client.force_login(self.user)
+        tarefa = Tarefa.objects.create(titulo='Vencida', usuario=self.user, data_conclusao=self.hoje - timedelta(days=2))
+        self.assertEqual(client.get(reverse('painel')).context['tarefas_atrasadas_list'], [tarefa])
+
+        # Fora do snapshot (ex.: antes da atualização diária), não aparece como atrasada
+        TarefaAtrasada.objects.all().delete()
+        cache.clear()
+        response = client.get(reverse('painel'))
+        self.assertEqual(response.context['atrasadas'], 0)
+        self.assertEqual(response.context['tarefas_atrasadas_list'], [])
+
+
+class ListaTarefasViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='lista@example.com', nome='Lista User', password='password')
+        self.categoria = CategoriaDeTarefa.objects.create(nome='Cat Lista', usuario=self.user)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def criar_tarefas(self, quantidade):
+        for i in range(quantidade):
+            tarefa = Tarefa.objects.create(titulo=f'Tarefa {i}', usuario=self.user, categoria=self.categoria)
+            Etapa.objects.create(descricao='A', tarefa=tarefa, concluida=True)
+            Etapa.objects.create(descricao='B', tarefa=tarefa)
+
+    def test_listas_com_consultas_constantes(self):
+        urls = [reverse('minhas_tarefas'), reverse('categoriatarefa', args=[self.categoria.id])]
+        for url in urls:
+            self.criar_tarefas(2)
+            with CaptureQueriesContext(connection) as poucas:
+                self.client.get(url)
+            self.criar_tarefas(20)
+            with CaptureQueriesContext(connection) as muitas:
+                response = self.client.get(url)
+            self.assertEqual(len(poucas), len(muitas))
+            self.assertContains(response, '1/2')
+
+
+class GetCondicionalTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='etag@example.com', nome='ETag', password='password')
+        self.tarefa = Tarefa.objects.create(titulo='Validar', usuario=self.user, is_foco_atual=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_304_sem_consultar_tarefas_e_renovado_apos_alteracao(self):
+        for nome in ('painel', 'minhas_tarefas', 'tarefas_arquivadas', 'categoriastarefa'):
+            resposta = self.client.get(reverse(nome))
+            etag = resposta['ETag']
+            self.assertIn('private', resposta['Cache-Control'])
+
+            with CaptureQueriesContext(connection) as contexto:
+                resposta = self.client.get(reverse(nome), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resposta.status_code, 304)
+            # Só sessão + usuário
+            self.assertEqual(len(contexto.captured_queries), 2)
+
+        etag = self.client.get(reverse('painel'))['ETag']
+        Etapa.objects.create(descricao='Nova', tarefa=self.tarefa)
+        resposta = self.client.get(reverse('painel'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta['ETag'], etag)
+
+    def test_etag_depende_da_url_e_do_usuario(self):
+        etag = self.client.get(reverse('minhas_tarefas'))['ETag']
+        self.assertEqual(self.client.get(reverse('buscar'), {'q': 'x'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        outro = User.objects.create_user(email='etag2@example.com', nome='Outro', password='password')
+        self.client.force_login(outro)
+        self.assertEqual(self.client.get(reverse('minhas_tarefas'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_comando_de_medicao(self):
+        out = StringIO()
+        call_command('medir_get_condicional', self.user.email, '--repeticoes', '2', '--host', 'testserver', stdout=out)
+        self.assertIn('304', out.getvalue())
+
+    def test_check_deploy_avisa_cache_por_processo(self):
+        self.assertEqual([aviso.id for aviso in cache_usuario_compartilhado(None)], ['tasks.W001'])
+        with override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/tarefas-cache'},
+        }):
+            self.assertEqual(cache_usuario_compartilhado(None), [])
+
+
+class InstrumentacaoMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='timing@example.com', nome='Timing', password='password')
+        Tarefa.objects.create(titulo='Medida', usuario=self.user)
+
+    def get(self, url):
+        # O middleware é carregado (ou descartado) quando o Client monta a cadeia
+        client = Client()
+        client.force_login(self.user)
+        return client.get(url)
+
+    def test_desligado_nao_participa(self):
+        self.assertNotIn('Server-Timing', self.get(reverse('minhas_tarefas')))
+
+    @override_settings(TAREFAS_INSTRUMENTACAO=True, TAREFAS_INSTRUMENTACAO_MAX_CONSULTAS=1000)
+    def test_server_timing(self):
+        response = self.get(reverse('minhas_tarefas'))
+        self.assertRegex(response['Server-Timing'], r'db;desc="\d+ consultas";dur=[\d.]+, tpl;desc="templates";dur=[\d.]+, total;dur=')
+        self.assertNotIn('tpl;desc="templates";dur=0.0', response['Server-Timing'])
+
+    @override_settings(TAREFAS_INSTRUMENTACAO=True, TAREFAS_INSTRUMENTACAO_MAX_CONSULTAS=1000)
+    async def test_server_timing_no_modo_assincrono(self):
+        # Cadeia assíncrona: as consultas do ORM assíncrono também são medidas
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse('painel'))
+        self.assertRegex(response['Server-Timing'], r'db;desc="[1-9]\d* consultas"')
+
+    @override_settings(TAREFAS_INSTRUMENTACAO=True, TAREFAS_INSTRUMENTACAO_MAX_CONSULTAS=1)
+    def test_requisicao_acima_do_limite_e_registrada_com_n_mais_1(self):
+        with self.assertLogs('tasks.instrumentacao', level='WARNING') as logs:
+            self.get(reverse('api_tarefas') + '?fields=titulo')
+        self.assertIn('Requisição lenta: GET /tarefas/api/tarefas/', logs.output[0])
+        self.assertIn('tasks_tarefa', logs.output[0])
+
+        from tasks.middleware import Medicao
+        medicao = Medicao()
+        medicao.consultas = [('SELECT 1 WHERE id = %s', 1.0)] * 3 + [('SELECT 2', 1.0)]
+        self.assertEqual(medicao.repetidas(), {'SELECT 1 WHERE id = %s': 3})
+
+
+class CacheCardTarefaTest(TestCase):
+    def setUp(self):
+        caches['template_fragments'].clear()
+        self.user = User.objects.create_user(email='card@example.com', nome='Card User', password='password')
+        self.categoria = CategoriaDeTarefa.objects.create(nome='Trabalho', cor='#123456', usuario=self.user)
+        self.tarefa = Tarefa.objects.create(titulo='Original', usuario=self.user, categoria=self.categoria)
+        self.etapa = Etapa.objects.create(descricao='Primeira etapa', tarefa=self.tarefa)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_card_inalterado_vem_do_cache(self):
+        self.client.get(reverse('minhas_tarefas'))
+        # update() sem mexer em atualizada_em: a chave do card continua a mesma
+        Tarefa.objects.filter(pk=self.tarefa.pk).update(titulo='Alterado por fora')
+
+        response = self.client.get(reverse('minhas_tarefas'))
+        self.assertContains(response, 'Original')
+        self.assertNotContains(response, 'Alterado por fora')
+
+    def test_alteracoes_em_etapas_e_categoria_renovam_o_card(self):
+        urls = [reverse('minhas_tarefas'), reverse('categoriatarefa', args=[self.categoria.id])]
+        for url in urls:
+            self.assertContains(self.client.get(url), '0/1')
+
+        Etapa.alternar(self.etapa.pk, self.user)
+        for url in urls:
+            self.assertContains(self.client.get(url), '1/1')
+
+        etapa = Etapa.objects.get(pk=self.etapa.pk)
+        etapa.descricao = 'Etapa renomeada'
+        etapa.save()
+        for url in urls:
+            self.assertContains(self.client.get(url), 'Etapa renomeada')
+
+        self.categoria.cor = '#abcdef'
+        self.categoria.save()
+        for url in urls:
+            self.assertContains(self.client.get(url), '#abcdef')
+
+    def test_card_do_painel(self):
+        self.tarefa.is_foco_atual = True
+        self.tarefa.save()
+        self.assertContains(self.client.get(reverse('painel')), 'Primeira etapa')
+
+        etapa = Etapa.objects.get(pk=self.etapa.pk)
+        etapa.descricao = 'Nova descrição'
+        etapa.save()
+        self.assertContains(self.client.get(reverse('painel')), 'Nova descrição')
+
+
+class AlternarEtapaConcorrenciaTest(TransactionTestCase):
+    """ Cliques simultâneos (várias abas) não podem perder atualizações. """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='concorrente@example.com', nome='Concorrente', password='password')
+        self.tarefa = Tarefa.objects.create(titulo='Concorrida', usuario=self.user)
+        self.etapas = [Etapa.objects.create(descricao=f'E{i}', tarefa=self.tarefa) for i in range(2)]
+
+    def test_wal_ativo(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode;')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+
+    def test_toggles_paralelos_nao_perdem_atualizacao(self):
+        clientes = []
+        for _ in range(8):
+            client = Client()
+            client.force_login(self.user)
+            clientes.append(client)
+
+        erros = []
+
+        def clicar(client, etapa, vezes):
+            try:
+                for _ in range(vezes):
+                    response = client.post(reverse('atualizar_etapa', args=[etapa.pk]))
+                    if response.status_code != 200:
+                        erros.append(response.status_code)
+            finally:
+                connection.close()
+
+        # 8 threads; a etapa 0 recebe 4x5=20 cliques (par) e a etapa 1 recebe 4x5+1=21 (ímpar)
+        threads = [
+            threading.Thread(target=clicar, args=(client, self.etapas[i % 2], 5))
+            for i, client in enumerate(clientes)
+        ]
+        threads.append(threading.Thread(target=clicar, args=(clientes[0], self.etapas[1], 1)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erros, [])
+        self.assertFalse(Etapa.objects.get(pk=self.etapas[0].pk).concluida)
+        self.assertTrue(Etapa.objects.get(pk=self.etapas[1].pk).concluida)
+        self.tarefa.refresh_from_db()
+        self.assertEqual((self.tarefa.etapas_total, self.tarefa.etapas_concluidas), (2, 1))
+        self.assertEqual(self.tarefa.status, Tarefa.StatusChoices.EM_ANDAMENTO)
+
+
+class AlternarEtapaViewTest(TestCase):
+    def setUp(self):
+        self.dono = User.objects.create_user(email='dono@example.com', nome='Dono', password='password')
+        self.outro = User.objects.create_user(email='outro@example.com', nome='Outro', password='password')
+        self.tarefa = Tarefa.objects.create(titulo='Minha', usuario=self.dono)
+        self.etapa = Etapa.objects.create(descricao='A', tarefa=self.tarefa)
+        self.client = Client()
+
+    def test_outro_usuario_nao_alterna(self):
+        self.client.force_login(self.outro)
+        response = self.client.post(reverse('atualizar_etapa', args=[self.etapa.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Etapa.objects.get(pk=self.etapa.pk).concluida)
+
+    def test_toggle_com_consultas_constantes(self):
+        for i in range(30):
+            Etapa.objects.create(descricao=f'Extra {i}', tarefa=self.tarefa)
+        self.client.force_login(self.dono)
+        # sessão + usuário + SELECT etapa + UPDATE etapa (compare-and-swap) + UPDATE tarefa + SELECT status
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post(reverse('atualizar_etapa', args=[self.etapa.pk]))
+        self.assertEqual(response.json()['tarefa_status_code'], Tarefa.StatusChoices.EM_ANDAMENTO)
+        self.assertLessEqual(len(consultas), 8)
+
+
+class ViewsAssincronasTest(TestCase):
+    """ Painel, alternar etapa e API pelo caminho ASGI (AsyncClient). """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='async@example.com', nome='Async', password='password')
+        self.tarefa = Tarefa.objects.create(titulo='Assíncrona', usuario=self.user)
+        self.etapas = [Etapa.objects.create(descricao=f'E{i}', tarefa=self.tarefa, ordem=i) for i in range(2)]
+        self.async_client.force_login(self.user)
+
+    async def test_toggles_simultaneos_no_event_loop(self):
+        url = reverse('atualizar_etapa', args=[self.etapas[0].pk])
+        # 5 cliques na etapa 0 e 2 na etapa 1, intercalados no mesmo event loop
+        respostas = await asyncio.gather(
+            *[self.async_client.post(url) for _ in range(5)],
+            *[self.async_client.post(reverse('atualizar_etapa', args=[self.etapas[1].pk])) for _ in range(2)],
+        )
+        self.assertEqual({resposta.status_code for resposta in respostas}, {200})
+        self.assertEqual(sorted(r.json()['etapa_concluida'] for r in respostas[:5]), [False, False, True, True, True])
+
+        tarefa = await Tarefa.objects.aget(pk=self.tarefa.pk)
+        self.assertEqual((tarefa.etapas_concluidas, tarefa.status), (1, Tarefa.StatusChoices.EM_ANDAMENTO))
+        self.assertTrue((await Etapa.objects.aget(pk=self.etapas[0].pk)).concluida)
+
+    async def test_painel_e_get_condicional(self):
+        resposta = await self.async_client.get(reverse('painel'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['total'], 1)
+        self.assertIn('private', resposta['Cache-Control'])
+
+        resposta = await self.async_client.get(reverse('painel'), headers={'If-None-Match': resposta['ETag']})
+        self.assertEqual(resposta.status_code, 304)
+
+    async def test_api_e_login(self):
+        dados = (await self.async_client.get(reverse('api_tarefas'), {'fields': 'titulo,etapas'})).json()
+        self.assertEqual(dados['resultados'][0]['titulo'], 'Assíncrona')
+        self.assertEqual(len(dados['resultados'][0]['etapas']), 2)
+        self.assertEqual((await self.async_client.post(reverse('api_tarefas'))).status_code, 405)
+
+        self.async_client.cookies.clear()
+        self.assertEqual((await self.async_client.get(reverse('api_tarefas'))).status_code, 401)
+        self.assertEqual((await self.async_client.get(reverse('painel'))).status_code, 302)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'painel-async'},
+    'template_fragments': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_fragmentos_teste'},
+})
+class PainelAssincronoCacheEmBancoTest(TestCase):
+    """ A renderização (tag {% cache %} e context processors) não pode rodar no event loop. """
+
+    def setUp(self):
+        call_command('createcachetable', verbosity=0)
+        self.user = User.objects.create_user(email='async-db@example.com', nome='Async DB', password='password')
+        Tarefa.objects.create(titulo='Foco', is_foco_atual=True, usuario=self.user)
+        self.async_client.force_login(self.user)
+
+    async def test_painel_com_cache_de_fragmentos_no_banco(self):
+        for _ in range(2):
+            resposta = await self.async_client.get(reverse('painel'))
+            self.assertEqual(resposta.status_code, 200)
+            self.assertContains(resposta, 'Foco')
+
+
+@override_settings(TAREFAS_EVENTOS_DURACAO=0.3, TAREFAS_EVENTOS_INTERVALO=0.05)
+class EventosTarefaTest(TestCase):
+    """ Log de eventos (EventoTarefa) e o fluxo SSE em /tarefas/eventos/. """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='sse@example.com', nome='SSE', password='password')
+        self.outro = User.objects.create_user(email='sse2@example.com', nome='Outro', password='password')
+        self.tarefa = Tarefa.objects.create(titulo='Ao vivo', usuario=self.user)
+        self.etapas = [Etapa.objects.create(descricao=f'E{i}', tarefa=self.tarefa, ordem=i) for i in range(2)]
+        EventoTarefa.objects.all().delete()
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    @staticmethod
+    def ler_eventos(conteudo):
+        blocos = [bloco for bloco in conteudo.split('\n\n') if bloco.startswith('id: ')]
+        return [(int(bloco.split('\n')[0][4:]), json.loads(bloco.split('data: ', 1)[1])) for bloco in blocos]
+
+    def test_publica_depois_do_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Etapa.alternar(self.etapas[0].pk, self.user)
+            # Nada gravado antes do commit: um fluxo nunca vê um estado que pode ser desfeito
+            self.assertFalse(EventoTarefa.objects.exists())
+        evento = EventoTarefa.objects.get()
+        self.assertEqual((evento.tarefa_id, evento.etapa_id, evento.etapa_concluida), (self.tarefa.pk, self.etapas[0].pk, True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tarefa.titulo = 'Renomeada'
+            self.tarefa.save()
+        self.assertEqual(EventoTarefa.objects.count(), 2)
+
+    def test_fluxo_retoma_pelo_last_event_id(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Etapa.alternar(self.etapas[0].pk, self.user)
+            Etapa.alternar(self.etapas[1].pk, self.user)
+            removida = Tarefa.objects.create(titulo='Removida', usuario=self.user)
+            EventoTarefa.objects.publicar(self.user.pk, removida.pk)
+            EventoTarefa.objects.publicar(self.outro.pk, Tarefa.objects.create(titulo='Alheia', usuario=self.outro).pk)
+        removida.delete()
+        primeiro = EventoTarefa.objects.filter(usuario=self.user).order_by('id').first()
+
+        resposta = self.client.get(reverse('eventos_tarefas'), HTTP_LAST_EVENT_ID=str(primeiro.pk - 1))
+        self.assertEqual(resposta['Content-Type'], 'text/event-stream')
+        conteudo = b''.join(resposta.streaming_content).decode()
+        self.assertTrue(conteudo.startswith('retry: '))
+        recebidos = self.ler_eventos(conteudo)
+        # Só os do usuário, sem a tarefa excluída, e todos com o estado atual (2/2, concluída)
+        self.assertEqual([dados['etapa_id'] for _, dados in recebidos], [self.etapas[0].pk, self.etapas[1].pk])
+        self.assertEqual({(dados['status'], dados['progresso']) for _, dados in recebidos}, {(Tarefa.StatusChoices.CONCLUIDA, 100)})
+
+        # Reconexão depois do último id recebido: nada repetido
+        resposta = self.client.get(reverse('eventos_tarefas'), HTTP_LAST_EVENT_ID=str(recebidos[-1][0]))
+        self.assertEqual(self.ler_eventos(b''.join(resposta.streaming_content).decode()), [])
+
+    def test_acoes_em_lote_e_arquivo_frio_publicam_eventos(self):
+        categoria = CategoriaDeTarefa.objects.create(nome='Casa', cor='#112233', usuario=self.user)
+        concluida = Tarefa.objects.create(titulo='Pronta', status=Tarefa.StatusChoices.CONCLUIDA, usuario=self.user)
+        EventoTarefa.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # O filtro por status deixa de casar depois do UPDATE: os ids são pegos antes
+            acoes_lote.executar(self.user, acoes_lote.escopo(self.user, status=Tarefa.StatusChoices.NAO_INICIADO),
+                                acoes_lote.STATUS, Tarefa.StatusChoices.EM_ANDAMENTO)
+        with self.captureOnCommitCallbacks(execute=True):
+            acoes_lote.executar(self.user, acoes_lote.escopo(self.user, ids=[self.tarefa.pk]), acoes_lote.CATEGORIA, categoria)
+        with self.captureOnCommitCallbacks(execute=True):
+            acoes_lote.executar(self.user, acoes_lote.escopo(self.user), acoes_lote.ARQUIVAR)
+
+        resposta = self.client.get(reverse('eventos_tarefas'), HTTP_LAST_EVENT_ID='0')
+        recebidos = [dados for _, dados in self.ler_eventos(b''.join(resposta.streaming_content).decode())]
+        self.assertEqual([(dados['tarefa_id'], dados['removida']) for dados in recebidos],
+                         [(self.tarefa.pk, False), (self.tarefa.pk, False), (concluida.pk, True)])
+        self.assertEqual(recebidos[0]['status'], Tarefa.StatusChoices.EM_ANDAMENTO)
+        self.assertEqual((recebidos[1]['categoria_nome'], recebidos[1]['categoria_cor']), ('Casa', '#112233'))
+
+        ultimo = EventoTarefa.objects.latest('id').pk
+        with self.captureOnCommitCallbacks(execute=True):
+            arquivamento.desarquivar(TarefaArquivada.objects.filter(pk=concluida.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            acoes_lote.executar(self.user, acoes_lote.escopo(self.user, ids=[self.tarefa.pk]), acoes_lote.DELETAR)
+        resposta = self.client.get(reverse('eventos_tarefas'), HTTP_LAST_EVENT_ID=str(ultimo))
+        recebidos = [dados for _, dados in self.ler_eventos(b''.join(resposta.streaming_content).decode())]
+        self.assertEqual([(dados['tarefa_id'], dados['removida']) for dados in recebidos],
+                         [(concluida.pk, False), (self.tarefa.pk, True)])
+
+    def test_conexao_nova_ignora_o_historico_e_exige_login(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Etapa.alternar(self.etapas[0].pk, self.user)
+        resposta = self.client.get(reverse('eventos_tarefas'))
+        self.assertEqual(self.ler_eventos(b''.join(resposta.streaming_content).decode()), [])
+
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('eventos_tarefas')).status_code, 302)
+
+    @override_settings(TAREFAS_EVENTOS_DURACAO=2, TAREFAS_EVENTOS_INTERVALO=60)
+    async def test_fluxo_assincrono_acorda_ao_publicar(self):
+        resposta = await self.async_client.get(reverse('eventos_tarefas'))
+        partes = aiter(resposta.streaming_content)
+        self.assertIn(b'retry: ', await anext(partes))
+
+        # Com o intervalo de 60s, só o acordar() de quem publica entrega o evento a tempo.
+        # O evento sai no commit; dentro do TestCase o commit é simulado na thread do banco.
+        def alternar():
+            with self.captureOnCommitCallbacks(execute=True):
+                async_to_sync(Etapa.aalternar)(self.etapas[1].pk, self.user)
+        await sync_to_async(alternar)()
+        parte = (await asyncio.wait_for(anext(partes), 1)).decode()
+        (_, dados), = self.ler_eventos(parte)
+        self.assertEqual((dados['etapa_id'], dados['etapa_concluida'], dados['status']), (self.etapas[1].pk, True, Tarefa.StatusChoices.EM_ANDAMENTO))
+        await partes.aclose()
+
+
+class AcoesEmLoteTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='lote@example.com', nome='Lote', password='password')
+        self.outro = User.objects.create_user(email='lote-outro@example.com', nome='Outro', password='password')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.tarefas = [Tarefa.objects.create(titulo=f'Lote {i}', usuario=self.user) for i in range(4)]
+        self.alheia = Tarefa.objects.create(titulo='Alheia', usuario=self.outro)
+
+    def post(self, **dados):
+        return self.client.post(reverse('acoes_em_lote'), dados, HTTP_ACCEPT='application/json')
+
+    def test_status_em_um_unico_update(self):
+        ids = [self.tarefas[0].pk, self.tarefas[1].pk, self.alheia.pk]
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.post(acao='status', status='concluida', ids=ids)
+
+        self.assertEqual(response.json(), {'acao': 'status', 'afetadas': 2})
+        updates = [c['sql'] for c in consultas.captured_queries if c['sql'].startswith('UPDATE "tasks_tarefa"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Tarefa.objects.filter(status='concluida').count(), 2)
+        self.assertEqual(Tarefa.objects.get(pk=self.alheia.pk).status, Tarefa.StatusChoices.NAO_INICIADO)
+
+    def test_status_sincroniza_atraso_so_das_afetadas(self):
+        ontem = timezone.now().date() - timedelta(days=1)
+        Tarefa.objects.filter(pk__in=[self.tarefas[0].pk, self.tarefas[1].pk]).update(data_conclusao=ontem)
+        Tarefa.objects.filter(usuario=self.user).sincronizar_atrasos()
+        # Linha "perdida" de uma tarefa fora do lote: não é responsabilidade desta ação
+        TarefaAtrasada.objects.filter(tarefa=self.tarefas[1]).delete()
+
+        self.post(acao='status', status='concluida', ids=[self.tarefas[0].pk])
+
+        self.assertFalse(TarefaAtrasada.objects.exists())
+
+    def test_arquivar_concluidas_por_filtro(self):
+        Tarefa.objects.filter(pk__in=[self.tarefas[0].pk, self.alheia.pk]).update(status='concluida')
+        response = self.post(acao='arquivar', todas='on')
+
+        self.assertEqual(response.json()['afetadas'], 1)
+        self.assertEqual(list(TarefaArquivada.objects.values_list('pk', flat=True)), [self.tarefas[0].pk])
+        self.assertFalse(Tarefa.objects.filter(pk=self.tarefas[0].pk).exists())
+
+    def test_categoria_e_foco(self):
+        categoria = CategoriaDeTarefa.objects.create(nome='Lote', usuario=self.user)
+        alheia = CategoriaDeTarefa.objects.create(nome='Alheia', usuario=self.outro)
+
+        self.assertEqual(self.post(acao='categoria', categoria=categoria.pk, ids=[self.tarefas[0].pk]).json()['afetadas'], 1)
+        self.assertEqual(Tarefa.objects.get(pk=self.tarefas[0].pk).categoria, categoria)
+        # Categoria de outro usuário é recusada pelo formulário
+        self.assertEqual(self.post(acao='categoria', categoria=alheia.pk, ids=[self.tarefas[1].pk]).status_code, 400)
+
+        self.post(acao='foco', todas='on')
+        self.assertEqual(Tarefa.objects.filter(usuario=self.user, is_foco_atual=True).count(), 4)
+
+    def test_deletar_apaga_dependentes_com_consultas_constantes(self):
+        for tarefa in self.tarefas:
+            Etapa.objects.create(descricao='Etapa', tarefa=tarefa)
+        vencida = Tarefa.objects.create(titulo='Vencida', usuario=self.user, data_conclusao=timezone.now().date() - timedelta(days=3))
+        Etapa.objects.create(descricao='Etapa', tarefa=vencida)
+
+        with CaptureQueriesContext(connection) as poucas:
+            self.post(acao='deletar', ids=[self.tarefas[0].pk])
+        with CaptureQueriesContext(connection) as muitas:
+            response = self.post(acao='deletar', todas='on')
+
+        self.assertEqual(response.json()['afetadas'], 4)
+        self.assertEqual(len(poucas), len(muitas))
+        self.assertEqual(list(Tarefa.objects.all()), [self.alheia])
+        self.assertFalse(Etapa.objects.exists())
+        self.assertFalse(TarefaAtrasada.objects.exists())
+        self.assertEqual(busca.buscar(self.user, 'lote'), [])
+
+    def test_formulario_da_pagina_redireciona_com_mensagem(self):
+        response = self.client.post(reverse('acoes_em_lote'), {'acao': 'foco'}, follow=True)
+        self.assertContains(response, 'Selecione ao menos uma tarefa.')
+
+        response = self.client.post(reverse('acoes_em_lote'), {'acao': 'foco', 'ids': [self.tarefas[0].pk]}, follow=True)
+        self.assertContains(response, 'Foco alternado em 1 tarefa(s).')
+        self.assertContains(response, 'id="form-lote"')
+
+
+class ExportarArquivadasTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='export@example.com', nome='Export', password='password')
+        self.categoria = CategoriaDeTarefa.objects.create(nome='Arquivo', usuario=self.user)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def criar_arquivadas(self, quantidade):
+        for i in range(quantidade):
+            tarefa = Tarefa.objects.create(titulo=f'Arq {i}', usuario=self.user, categoria=self.categoria,
+                                           status=Tarefa.StatusChoices.CONCLUIDA)
+            Etapa.objects.create(descricao='Passo 1', tarefa=tarefa, concluida=True, ordem=0)
+            Etapa.objects.create(descricao='Passo 2', tarefa=tarefa, ordem=1)
+            arquivamento.arquivar(Tarefa.objects.filter(pk=tarefa.pk))
+
+    def exportar(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('exportar_tarefas_arquivadas'))
+            conteudo = b''.join(response.streaming_content).decode('utf-8')
+        return conteudo, len(consultas)
+
+    def test_exporta_tarefas_com_etapas_em_streaming(self):
+        self.criar_arquivadas(2)
+        Tarefa.objects.create(titulo='Ativa', usuario=self.user)
+        arquivamento.arquivar(Tarefa.objects.filter(pk=Tarefa.objects.create(titulo='Sem etapas', usuario=self.user).pk))
+
+        conteudo, _ = self.exportar()
+        linhas = conteudo.strip().splitlines()
+
+        self.assertEqual(linhas[0], 'Título,Descrição,Data de Conclusão,Categoria,Etapas')
+        self.assertEqual(len(linhas), 4)
+        self.assertIn('Arq 0', linhas[1])
+        self.assertTrue(linhas[1].endswith('Arquivo,[x] Passo 1 | [ ] Passo 2'))
+        self.assertTrue(linhas[3].endswith('Sem Categoria,'))
+        self.assertNotIn('Ativa', conteudo)
+
+    def test_etapa_orfa_nao_trava_as_tarefas_seguintes(self):
+        self.criar_arquivadas(3)
+        primeira = TarefaArquivada.objects.order_by('id').first()
+
+        # Simula a tarefa saindo do arquivo entre as duas consultas: a etapa dela ainda vem
+        with mock.patch.object(TarefaArquivada, 'objects', TarefaArquivada.objects.exclude(pk=primeira.pk)):
+            conteudo, _ = self.exportar()
+        linhas = conteudo.strip().splitlines()
+
+        self.assertEqual(len(linhas), 3)
+        self.assertTrue(linhas[1].endswith('Arquivo,[x] Passo 1 | [ ] Passo 2'))
+        self.assertTrue(linhas[2].endswith('Arquivo,[x] Passo 1 | [ ] Passo 2'))
+
+    def test_consultas_constantes(self):
+        self.criar_arquivadas(2)
+        _, poucas = self.exportar()
+        self.criar_arquivadas(30)
+        _, muitas = self.exportar()
+        self.assertEqual(poucas, muitas)
+
+
+class ArquivoFrioTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='frio@example.com', nome='Frio', password='password')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.tarefa = Tarefa.objects.create(titulo='Relatório anual', usuario=self.user, status=Tarefa.StatusChoices.CONCLUIDA)
+        self.etapas = [Etapa.objects.create(descricao=f'Passo {i}', tarefa=self.tarefa, ordem=i) for i in range(2)]
+
+    def test_arquivar_e_desarquivar_movem_entre_as_tabelas(self):
+        self.client.get(reverse('arquivar_tarefa', args=[self.tarefa.pk]))
+
+        self.assertFalse(Tarefa.objects.exists())
+        self.assertFalse(Etapa.objects.exists())
+        arquivada = TarefaArquivada.objects.get(pk=self.tarefa.pk)
+        self.assertEqual(arquivada.titulo, 'Relatório anual')
+        self.assertEqual(arquivada.etapas_total, 2)
+        self.assertEqual(list(EtapaArquivada.objects.values_list('pk', flat=True)), [etapa.pk for etapa in self.etapas])
+        self.assertEqual(busca.buscar(self.user, 'relatorio'), [])
+        self.assertContains(self.client.get(reverse('tarefas_arquivadas')), 'Relatório anual')
+
+        self.client.post(reverse('desarquivar_tarefa', args=[self.tarefa.pk]))
+
+        self.assertFalse(TarefaArquivada.objects.exists())
+        restaurada = Tarefa.objects.get(pk=self.tarefa.pk)
+        self.assertFalse(restaurada.arquivada)
+        self.assertEqual(restaurada.criada_em, self.tarefa.criada_em)
+        self.assertEqual(list(restaurada.etapas.values_list('descricao', flat=True)), ['Passo 0', 'Passo 1'])
+        self.assertEqual([r.titulo for r in busca.buscar(self.user, 'relatorio')], ['Relatório anual'])
+        self.assertContains(self.client.get(reverse('minhas_tarefas')), 'Relatório anual')
+
+    def test_so_o_dono_desarquiva(self):
+        arquivamento.arquivar(Tarefa.objects.filter(pk=self.tarefa.pk))
+        outro = User.objects.create_user(email='frio-outro@example.com', nome='Outro', password='password')
+        self.client.force_login(outro)
+        self.assertEqual(self.client.post(reverse('desarquivar_tarefa', args=[self.tarefa.pk])).status_code, 404)
+        self.assertTrue(TarefaArquivada.objects.filter(pk=self.tarefa.pk).exists())
+
+    def test_mover_arquivadas_antigas_em_lotes(self):
+        Tarefa.objects.filter(pk=self.tarefa.pk).update(arquivada=True)
+        atualizada_em = Tarefa.objects.get(pk=self.tarefa.pk).atualizada_em
+        for i in range(4):
+            Tarefa.objects.create(titulo=f'Antiga {i}', usuario=self.user, arquivada=True)
+        Tarefa.objects.create(titulo='Ativa', usuario=self.user)
+
+        out = StringIO()
+        call_command('mover_arquivadas', '--lote', '2', '--pausa', '0', stdout=out)
+
+        self.assertIn('5 tarefa(s) arquivada(s) movida(s)', out.getvalue())
+        self.assertEqual(list(Tarefa.objects.values_list('titulo', flat=True)), ['Ativa'])
+        self.assertEqual(TarefaArquivada.objects.get(pk=self.tarefa.pk).arquivada_em, atualizada_em)
+        self.assertEqual(EtapaArquivada.objects.count(), 2)
+
+
+class PaginacaoCursorTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='cursor@example.com', nome='Cursor', password='password')
+        self.client = Client()
+        self.client.force_login(self.user)
+        agora = timezone.now()
+        for i in range(60):
+            Tarefa.objects.create(titulo=f'T{i:02d}', usuario=self.user)
+        # Metade com o mesmo criada_em para exercitar o desempate pelo id
+        Tarefa.objects.filter(titulo__lt='T30').update(criada_em=agora)
+
+    def test_percorre_todas_as_paginas_sem_repetir(self):
+        vistos = []
+        cursor = None
+        while True:
+            pagina = paginar_por_cursor(Tarefa.objects.filter(usuario=self.user), 'criada_em', cursor, tamanho=7)
+            vistos.extend(tarefa.pk for tarefa in pagina.itens)
+            if not pagina.tem_mais:
+                break
+            cursor = pagina.proximo_cursor
+
+        esperado = list(Tarefa.objects.filter(usuario=self.user).order_by('-criada_em', '-id').values_list('pk', flat=True))
+        self.assertEqual(vistos, esperado)
+
+    def test_cursor_invalido_volta_para_primeira_pagina(self):
+        pagina = paginar_por_cursor(Tarefa.objects.all(), 'criada_em', 'lixo!!', tamanho=5)
+        self.assertEqual(len(pagina.itens), 5)
+
+        # base64/JSON bem formados, mas com valor ou pk do tipo errado
+        for bruto in (['abc', 1], ['2024-01-01', [1]], ['2024-01-01', None], 7):
+            cursor = base64.urlsafe_b64encode(json.dumps(bruto).encode()).decode().rstrip('=')
+            pagina = paginar_por_cursor(Tarefa.objects.all(), 'criada_em', cursor, tamanho=5)
+            self.assertEqual(len(pagina.itens), 5)
+        response = self.client.get(reverse('minhas_tarefas'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 200)
+
+    def test_lista_com_carregar_mais(self):
+        response = self.client.get(reverse('minhas_tarefas'))
+        self.assertEqual(len(response.context['tarefas']), 25)
+        cursor = response.context['proximo_cursor']
+        self.assertContains(response, f'?cursor={cursor}')
+
+        with CaptureQueriesContext(connection) as primeira:
+            self.client.get(reverse('minhas_tarefas'), {'parcial': 1})
+        with CaptureQueriesContext(connection) as segunda:
+            response = self.client.get(reverse('minhas_tarefas'), {'cursor': cursor, 'parcial': 1})
+        self.assertTemplateUsed(response, 'partials/_tarefas_pagina.html')
+        self.assertTemplateNotUsed(response, 'tarefas.html')
+        self.assertEqual(len(response.context['tarefas']), 25)
+        self.assertEqual(len(primeira), len(segunda))
+
+    def test_arquivadas_paginadas(self):
+        arquivamento.arquivar(Tarefa.objects.filter(usuario=self.user))
+        response = self.client.get(reverse('tarefas_arquivadas'))
+        self.assertEqual(len(response.context['tarefas']), 25)
+        response = self.client.get(reverse('tarefas_arquivadas'), {'cursor': response.context['proximo_cursor']})
+        self.assertEqual(len(response.context['tarefas']), 25)
+
+class PlanoConsultasTest(TestCase):
+    """ Garante que as consultas quentes usam índice (nenhum SCAN completo em tabelas de tarefas). """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='plano@example.com', nome='Plano', password='password')
+        self.client = Client()
+        self.client.force_login(self.user)
+        hoje = timezone.now().date()
+        for i in range(30):
+            tarefa = Tarefa.objects.create(
+                titulo=f'T{i}', usuario=self.user, data_conclusao=hoje - timedelta(days=i % 5)
+            )
+            Etapa.objects.create(tarefa=tarefa, descricao='Etapa')
+
+    def _planos(self, consultas):
+        planos = {}
+        for consulta in consultas:
+            sql = consulta['sql']
+            if not sql.startswith('SELECT') or 'tasks_' not in sql:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                planos[sql] = [linha[3] for linha in cursor.fetchall()]
+        return planos
+
+    def test_consultas_quentes_nao_fazem_scan_completo(self):
+        with CaptureQueriesContext(connection) as contexto:
+            self.client.get(reverse('painel'))
+            resposta = self.client.get(reverse('minhas_tarefas'))
+            self.client.get(reverse('minhas_tarefas'), {'cursor': resposta.context['proximo_cursor']})
+            self.client.get(reverse('tarefas_arquivadas'))
+            call_command('tarefas', '--atrasadas', stdout=StringIO())
+
+        planos = self._planos(contexto.captured_queries)
+        self.assertTrue(planos)
+        for sql, linhas in planos.items():
+            for linha in linhas:
+                if linha.startswith('SCAN tasks_') and 'USING' not in linha:
+                    self.fail(f'Full scan em "{linha}" para:\n{sql}')
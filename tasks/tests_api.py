@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from datetime import date
+from tasks import arquivamento
+from tasks.models import CategoriaDeTarefa, Etapa, Tarefa
+
+User = get_user_model()
+
+
+class ApiTarefasTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='api@example.com', nome='Api', password='password')
+        self.outro = User.objects.create_user(email='api2@example.com', nome='Outro', password='password')
+        self.categoria = CategoriaDeTarefa.objects.create(nome='Casa', usuario=self.user)
+        self.tarefas = [
+            Tarefa.objects.create(
+                titulo=f'T{i}', usuario=self.user, data_conclusao=date(2025, 1, 1 + i),
+                categoria=self.categoria if i % 2 else None,
+                status=Tarefa.StatusChoices.CONCLUIDA if i == 0 else Tarefa.StatusChoices.NAO_INICIADO,
+            )
+            for i in range(7)
+        ]
+        Etapa.objects.create(tarefa=self.tarefas[1], descricao='Passo', ordem=0)
+        arquivamento.arquivar(Tarefa.objects.filter(pk=Tarefa.objects.create(titulo='Arquivada', usuario=self.user).pk))
+        Tarefa.objects.create(titulo='De outro', usuario=self.outro)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def get(self, nome, **params):
+        return self.client.get(reverse(nome), params)
+
+    def test_paginacao_por_cursor_e_escopo_do_usuario(self):
+        vistos = []
+        cursor = ''
+        while True:
+            dados = self.get('api_tarefas', tamanho=3, cursor=cursor).json()
+            vistos.extend(item['titulo'] for item in dados['resultados'])
+            cursor = dados['proximo_cursor']
+            if not cursor:
+                break
+        self.assertEqual(vistos, [f'T{i}' for i in reversed(range(7))])
+
+    def test_fields_esparsos_e_etapas(self):
+        dados = self.get('api_tarefas', fields='titulo,categoria_nome,etapas', ids=self.tarefas[1].pk).json()
+        self.assertEqual(dados['resultados'], [{
+            'id': self.tarefas[1].pk, 'titulo': 'T1', 'categoria_nome': 'Casa',
+            'etapas': [{'id': self.tarefas[1].etapas.get().pk, 'descricao': 'Passo', 'concluida': False, 'ordem': 0}],
+        }])
+
+        resposta = self.get('api_tarefas', fields='titulo,senha')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('senha', resposta.json()['erro'])
+
+    def test_filtros(self):
+        def titulos(**params):
+            return sorted(item['titulo'] for item in self.get('api_tarefas', fields='titulo', **params).json()['resultados'])
+
+        self.assertEqual(titulos(status='concluida'), ['T0'])
+        self.assertEqual(titulos(categoria=self.categoria.pk), ['T1', 'T3', 'T5'])
+        self.assertEqual(titulos(prazo_de='2025-01-03', prazo_ate='2025-01-04'), ['T2', 'T3'])
+        self.assertEqual(titulos(arquivada='true'), ['Arquivada'])
+        self.assertEqual(self.get('api_tarefas', prazo_de='ontem').status_code, 400)
+
+    def test_busca_em_lote_ignora_ids_de_outros_usuarios(self):
+        alheia = Tarefa.objects.get(titulo='De outro')
+        ids = f'{self.tarefas[2].pk},{self.tarefas[4].pk},{alheia.pk}'
+        dados = self.get('api_tarefas', ids=ids, fields='titulo').json()
+        self.assertEqual([item['titulo'] for item in dados['resultados']], ['T4', 'T2'])
+
+    def test_etapas_e_categorias(self):
+        etapas = self.get('api_etapas', tarefa=self.tarefas[1].pk).json()['resultados']
+        self.assertEqual([(etapa['tarefa'], etapa['descricao']) for etapa in etapas], [(self.tarefas[1].pk, 'Passo')])
+
+        categorias = self.get('api_categorias', fields='nome').json()['resultados']
+        self.assertEqual(categorias, [{'id': self.categoria.pk, 'nome': 'Casa'}])
+
+    def test_consultas_constantes_e_autenticacao(self):
+        with self.assertNumQueries(4):  # sessão + usuário + tarefas + etapas
+            self.get('api_tarefas', fields='titulo,etapas', tamanho=200)
+
+        self.client.logout()
+        self.assertEqual(self.get('api_tarefas').status_code, 401)
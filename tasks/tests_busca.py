@@ -0,0 +1,123 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tasks import busca
+from tasks.importacao import ImportadorTarefas
+from tasks.models import BaseConhecimento, Etapa, Tarefa
+
+User = get_user_model()
+
+
+class BuscaTextualTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='busca@example.com', nome='Busca', password='password')
+        self.outro = User.objects.create_user(email='outro@example.com', nome='Outro', password='password')
+
+    def _titulos(self, termo, usuario=None):
+        return [resultado.titulo for resultado in busca.buscar(usuario or self.user, termo)]
+
+    def test_encontra_por_titulo_descricao_e_etapa_sem_acentos(self):
+        tarefa = Tarefa.objects.create(titulo='Reunião de orçamento', descricao='Planilha anual', usuario=self.user)
+        # As etapas entram no documento da tarefa no commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Etapa.objects.create(tarefa=tarefa, descricao='Enviar convite aos diretores')
+
+        self.assertEqual(self._titulos('reuniao'), ['Reunião de orçamento'])
+        self.assertEqual(self._titulos('planilha'), ['Reunião de orçamento'])
+        self.assertEqual(self._titulos('diretores'), ['Reunião de orçamento'])
+        # A última palavra aceita prefixo (busca enquanto digita)
+        self.assertEqual(self._titulos('orçam'), ['Reunião de orçamento'])
+
+    def test_resultados_sao_do_usuario_e_ordenados_por_relevancia(self):
+        Tarefa.objects.create(titulo='Comprar pão', descricao='padaria', usuario=self.user)
+        Tarefa.objects.create(titulo='Ir ao mercado', descricao='comprar leite e comprar café', usuario=self.user)
+        Tarefa.objects.create(titulo='Comprar pão', usuario=self.outro)
+
+        # Título pesa mais que a descrição
+        self.assertEqual(self._titulos('comprar'), ['Comprar pão', 'Ir ao mercado'])
+        self.assertEqual(self._titulos('mercado', self.outro), [])
+
+    def test_indice_acompanha_edicao_e_exclusao(self):
+        tarefa = Tarefa.objects.create(titulo='Antigo', usuario=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            etapa = Etapa.objects.create(tarefa=tarefa, descricao='passo inicial')
+        self.assertEqual(self._titulos('inicial'), ['Antigo'])
+
+        tarefa.titulo = 'Novo'
+        tarefa.save()
+        self.assertEqual(self._titulos('antigo'), [])
+        self.assertEqual(self._titulos('novo'), ['Novo'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            etapa.delete()
+        self.assertEqual(self._titulos('inicial'), [])
+
+        tarefa.delete()
+        self.assertEqual(self._titulos('novo'), [])
+
+    def test_formulario_reindexa_a_tarefa_uma_vez(self):
+        dados = {'titulo': 'Mudança', 'status': Tarefa.StatusChoices.NAO_INICIADO,
+                 'etapas-TOTAL_FORMS': '20', 'etapas-INITIAL_FORMS': '0'}
+        for indice in range(20):
+            dados[f'etapas-{indice}-descricao'] = f'caixa {indice}'
+        client = Client()
+        client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as consultas, self.captureOnCommitCallbacks(execute=True):
+            client.post(reverse('criar_tarefa'), dados)
+
+        indexacoes = [c['sql'] for c in consultas.captured_queries if c['sql'].startswith(f'INSERT INTO {busca.TABELA}')]
+        # Uma ao salvar a tarefa e uma no commit, com as 20 etapas
+        self.assertEqual(len(indexacoes), 2)
+        self.assertEqual(self._titulos('caixa'), ['Mudança'])
+
+    def test_base_de_conhecimento(self):
+        item = BaseConhecimento.objects.create(titulo='Deploy', conteudo_markdown='Use o **gunicorn**', usuario=self.user)
+        [resultado] = busca.buscar(self.user, 'gunicorn')
+        self.assertFalse(resultado.is_tarefa)
+        self.assertEqual(resultado.objeto_id, item.pk)
+        self.assertIn('<mark>gunicorn</mark>', resultado.trecho)
+
+        item.delete()
+        self.assertEqual(self._titulos('gunicorn'), [])
+
+    def test_operadores_do_usuario_nao_quebram_a_consulta(self):
+        Tarefa.objects.create(titulo='Texto qualquer', usuario=self.user)
+        self.assertEqual(self._titulos('"texto (* -'), ['Texto qualquer'])
+        self.assertEqual(self._titulos('!!!'), [])
+
+    def test_termos_nao_casam_com_a_coluna_do_dono(self):
+        Tarefa.objects.create(titulo='Relatório', usuario=self.user)
+        self.assertEqual(self._titulos('u'), [])
+        self.assertEqual(self._titulos(f'u{self.user.pk}'), [])
+
+        # Mesma restrição na subconsulta usada pela busca do admin
+        sql, params = busca.sql_ids_correspondentes(busca.TIPO_TAREFA, f'u{self.user.pk}')
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            self.assertEqual(cursor.fetchall(), [])
+
+    def test_importacao_em_lote_e_reindexacao(self):
+        conteudo = 'titulo;etapas\nImportada;Passo secreto\n'
+        ImportadorTarefas(self.user).importar(SimpleUploadedFile('t.csv', conteudo.encode('utf-8')))
+        self.assertEqual(self._titulos('secreto'), ['Importada'])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {busca.TABELA}')
+        call_command('reindexar_busca', stdout=StringIO())
+        self.assertEqual(self._titulos('secreto'), ['Importada'])
+
+    def test_view_escapa_o_texto_e_destaca_termos(self):
+        Tarefa.objects.create(titulo='Script', descricao='<script>alerta</script>', usuario=self.user)
+        client = Client()
+        client.force_login(self.user)
+
+        resposta = client.get(reverse('buscar'), {'q': 'alerta'})
+
+        self.assertContains(resposta, '<mark>alerta</mark>')
+        self.assertNotContains(resposta, '<script>alerta')
@@ -1,9 +1,12 @@
+import csv
+import json
 from io import StringIO
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.utils import timezone
 from datetime import timedelta
-from tasks.models import Tarefa
+from tasks import arquivamento
+from tasks.models import Etapa, EventoTarefa, Tarefa, TarefaArquivada, TarefaAtrasada
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -82,3 +85,198 @@ class TarefasCommandTest(TestCase):
         output = out.getvalue()
         
         self.assertIn('Nenhuma tarefa encontrada para os critérios selecionados.', output)
+
+    def test_tarefas_filtros_e_dias(self):
+        """--dias substitui o limite fixo de 15 dias e combina com os demais filtros."""
+        out = StringIO()
+        call_command('tarefas', '--dias', '3', '--status', 'em_andamento', '--usuario', 'ADMIN@example.com', stdout=out)
+        output = out.getvalue()
+
+        self.assertIn('=== TAREFAS COM MAIS DE 3 DIAS DE ATRASO ===', output)
+        self.assertIn('Tarefa Pouco Atrasada', output)
+        self.assertNotIn('Tarefa Muito Atrasada', output)
+
+    def test_tarefas_formatos_csv_e_jsonl(self):
+        out = StringIO()
+        call_command('tarefas', '--atrasadas', '--formato', 'csv', stdout=out)
+        linhas = out.getvalue().splitlines()
+        self.assertTrue(linhas[0].startswith('id,titulo,'))
+        self.assertEqual(len(linhas), 2)
+        self.assertIn('Tarefa Muito Atrasada', linhas[1])
+        self.assertTrue(linhas[1].endswith(',20'))
+
+        out = StringIO()
+        call_command('tarefas', '--formato', 'jsonl', stdout=out)
+        registros = [json.loads(linha) for linha in out.getvalue().splitlines()]
+        self.assertEqual(len(registros), 3)
+        self.assertEqual({registro['usuario__email'] for registro in registros}, {'admin@example.com'})
+
+    def test_tarefas_inclui_arquivo_frio(self):
+        arquivamento.arquivar(Tarefa.objects.filter(pk=self.tarefa_concluida.pk))
+
+        out = StringIO()
+        call_command('tarefas', '--formato', 'csv', stdout=out)
+        registros = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(len(registros), 3)
+        arquivadas = {registro['titulo']: registro['arquivada'] for registro in registros}
+        self.assertEqual(arquivadas['Tarefa Concluída Antiga'], 'True')
+        self.assertEqual(arquivadas['Tarefa Muito Atrasada'], 'False')
+
+        # Os filtros valem para as duas tabelas
+        out = StringIO()
+        call_command('tarefas', '--formato', 'jsonl', '--status', 'concluida', stdout=out)
+        registros = [json.loads(linha) for linha in out.getvalue().splitlines()]
+        self.assertEqual([(r['id'], r['arquivada']) for r in registros], [(self.tarefa_concluida.pk, True)])
+
+    def test_tarefas_resumo_em_uma_consulta(self):
+        Tarefa.objects.create(
+            titulo='Outra Atrasada', data_conclusao=self.hoje - timedelta(days=40),
+            status=Tarefa.StatusChoices.NAO_INICIADO, usuario=self.user,
+        )
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command('tarefas', '--resumo', '--formato', 'jsonl', stdout=out)
+        grupos = [json.loads(linha) for linha in out.getvalue().splitlines()]
+
+        self.assertEqual(len(grupos), 1)
+        self.assertEqual(grupos[0]['atrasadas'], 2)
+        self.assertEqual(grupos[0]['dias_maior_atraso'], 40)
+        self.assertIsNone(grupos[0]['categoria__nome'])
+
+    def test_atualizar_atrasadas(self):
+        # Snapshot vazio (ex.: antes da primeira execução diária)
+        TarefaAtrasada.objects.all().delete()
+        out = StringIO()
+        call_command('atualizar_atrasadas', '--lote', '1', stdout=out)
+        self.assertIn('2 inserida(s), 0 atualizada(s), 0 removida(s)', out.getvalue())
+        self.assertEqual(
+            set(TarefaAtrasada.objects.values_list('tarefa_id', flat=True)),
+            {self.tarefa_muito_atrasada.pk, self.tarefa_pouco_atrasada.pk},
+        )
+
+        # Segunda execução no mesmo dia não escreve nada
+        out = StringIO()
+        call_command('atualizar_atrasadas', stdout=out)
+        self.assertIn('0 inserida(s), 0 atualizada(s), 0 removida(s)', out.getvalue())
+
+
+    def test_limpar_eventos(self):
+        tarefa = Tarefa.objects.create(titulo='Com eventos', usuario=self.user)
+        antigo = EventoTarefa.objects.create(usuario=self.user, tarefa=tarefa)
+        EventoTarefa.objects.filter(pk=antigo.pk).update(criado_em=timezone.now() - timedelta(hours=30))
+        recente = EventoTarefa.objects.create(usuario=self.user, tarefa=tarefa)
+
+        out = StringIO()
+        call_command('limpar_eventos', stdout=out)
+        self.assertIn('1 evento(s)', out.getvalue())
+        self.assertEqual(list(EventoTarefa.objects.values_list('pk', flat=True)), [recente.pk])
+
+
+class ArquivarAutomaticoCommandTest(TestCase):
+    def setUp(self):
+        self.padrao = User.objects.create_user(email='padrao@example.com', nome='Padrão', password='password')
+        self.curto = User.objects.create_user(email='curto@example.com', nome='Curto', password='password')
+        self.curto.dias_arquivamento_automatico = 2
+        self.curto.save()
+        self.desligado = User.objects.create_user(email='desligado@example.com', nome='Desligado', password='password')
+        self.desligado.dias_arquivamento_automatico = 0
+        self.desligado.save()
+
+        agora = timezone.now()
+        for usuario in (self.padrao, self.curto, self.desligado):
+            for dias in (1, 5, 5, 40):
+                tarefa = Tarefa.objects.create(titulo=f'Feita há {dias}', usuario=usuario, status=Tarefa.StatusChoices.CONCLUIDA)
+                Tarefa.objects.filter(pk=tarefa.pk).update(atualizada_em=agora - timedelta(days=dias))
+            Tarefa.objects.create(titulo='Pendente', usuario=usuario)
+            Tarefa.objects.filter(usuario=usuario, titulo='Pendente').update(atualizada_em=agora - timedelta(days=90))
+
+    def test_limite_por_usuario_em_lotes_e_idempotente(self):
+        out = StringIO()
+        call_command('arquivar_automatico', '--lote', '1', '--pausa', '0', stdout=out)
+        saida = out.getvalue()
+
+        self.assertIn('padrao@example.com: 1 tarefa(s) arquivada(s) (concluídas há mais de 30 dias)', saida)
+        self.assertIn('curto@example.com: 3 tarefa(s) arquivada(s) (concluídas há mais de 2 dias)', saida)
+        self.assertIn('desligado@example.com: arquivamento automático desativado', saida)
+        self.assertEqual(TarefaArquivada.objects.count(), 4)
+        self.assertFalse(TarefaArquivada.objects.filter(status=Tarefa.StatusChoices.NAO_INICIADO).exists())
+        self.assertEqual(Tarefa.objects.count(), 11)
+
+        out = StringIO()
+        call_command('arquivar_automatico', '--pausa', '0', stdout=out)
+        self.assertIn('Total: 0 tarefa(s) arquivada(s).', out.getvalue())
+
+    def test_simular_nao_altera(self):
+        out = StringIO()
+        call_command('arquivar_automatico', '--simular', '--dias', '3', '--usuario', 'padrao@example.com', stdout=out)
+        self.assertIn('padrao@example.com: 3 tarefa(s) a arquivar', out.getvalue())
+        self.assertFalse(TarefaArquivada.objects.exists())
+
+class CargaEBenchmarkCommandTest(TestCase):
+    def test_seed_carga_gera_dados_consistentes(self):
+        out = StringIO()
+        call_command('seed_carga', '--usuarios', '2', '--tarefas', '30', '--etapas', '3',
+                     '--categorias', '4', '--lote', '7', '--semente', '1', stdout=out)
+
+        usuarios = User.objects.filter(email__endswith='@carga.local')
+        self.assertEqual(usuarios.count(), 2)
+        # As concluídas marcadas como arquivadas vão direto para o arquivo frio
+        arquivadas = TarefaArquivada.objects.filter(usuario__in=usuarios).count()
+        self.assertGreater(arquivadas, 0)
+        self.assertFalse(Tarefa.objects.filter(arquivada=True).exists())
+        self.assertEqual(Tarefa.objects.filter(usuario__in=usuarios).count() + arquivadas, 60)
+        # Contadores desnormalizados batem com as etapas gravadas
+        call_command('recalcular_etapas', stdout=out)
+        self.assertIn('Nenhuma divergência encontrada.', out.getvalue())
+
+        # Rodar de novo continua a numeração dos usuários
+        call_command('seed_carga', '--usuarios', '1', '--tarefas', '1', stdout=StringIO())
+        self.assertTrue(User.objects.filter(email='carga2@carga.local').exists())
+
+    def test_benchmark_views_gera_json(self):
+        call_command('seed_carga', '--usuarios', '1', '--tarefas', '5', '--semente', '2', stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_views', 'carga0@carga.local', '--repeticoes', '2', '--host', 'testserver', stdout=out)
+
+        relatorio = json.loads(out.getvalue())
+        rotas = {resultado['rota']: resultado for resultado in relatorio['resultados']}
+        self.assertEqual(rotas['painel']['status'], 200)
+        self.assertIn('p95_ms', rotas['minhas_tarefas'])
+        self.assertIn('editar_tarefa', rotas)
+        self.assertIn('arquivar_tarefa', [item['rota'] for item in relatorio['ignoradas']])
+
+    def test_medir_paginas_gera_json(self):
+        call_command('seed_carga', '--usuarios', '1', '--tarefas', '5', '--semente', '3', stdout=StringIO())
+        out = StringIO()
+        call_command('medir_paginas', 'carga0@carga.local', '--host', 'testserver', stdout=out, stderr=StringIO())
+
+        relatorio = json.loads(out.getvalue())
+        paginas = {pagina['rota']: pagina for pagina in relatorio['paginas']}
+        self.assertEqual(paginas['painel']['status'], 200)
+        self.assertEqual(paginas['painel']['blocos_inline_bytes'], 0)
+        self.assertIn('style.css', paginas['painel']['assets'])
+        estilo = relatorio['assets']['style.css']
+        self.assertLess(estilo['gzip_bytes'], estilo['minificado_bytes'])
+        self.assertLess(estilo['minificado_bytes'], estilo['original_bytes'])
+
+
+class CargaAlternarEtapaCommandTest(TransactionTestCase):
+    def test_asgi_e_wsgi_sem_erros_e_sem_saldo(self):
+        user = User.objects.create_user(email='carga-etapa@example.com', nome='Carga', password='password')
+        tarefa = Tarefa.objects.create(titulo='Carga', usuario=user)
+        for i in range(3):
+            Etapa.objects.create(descricao=f'E{i}', tarefa=tarefa, ordem=i, concluida=i == 0)
+
+        out = StringIO()
+        call_command('carga_alternar_etapa', user.email, '--requisicoes', '12', '--concorrencia', '3',
+                     '--host', 'testserver', stdout=out)
+
+        relatorio = json.loads(out.getvalue())
+        self.assertEqual([resultado['modo'] for resultado in relatorio['resultados']], ['asgi', 'wsgi'])
+        for resultado in relatorio['resultados']:
+            self.assertEqual(resultado['erros'], 0)
+            self.assertGreater(resultado['req_por_s'], 0)
+        # Cliques aos pares: tudo volta como estava
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.etapas_concluidas, tarefa.status), (1, Tarefa.StatusChoices.EM_ANDAMENTO))
+        self.assertEqual(list(Etapa.objects.filter(concluida=True).values_list('descricao', flat=True)), ['E0'])
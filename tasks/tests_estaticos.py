@@ -0,0 +1,92 @@
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from GerenciadorDeTarefas.estaticos import minificar_css, minificar_js
+from tasks.models import Tarefa
+
+User = get_user_model()
+
+
+class MinificadoresTest(TestCase):
+    def test_css_tira_comentarios_e_espacos_mas_nao_mexe_nas_strings(self):
+        css = '/* cabeçalho */\n.a > .b ,\n.c {\n    content: "  /* x */  ";\n    margin : 0 auto;\n}\ndiv :hover { width: calc(100% - 2px); }\n'
+        self.assertEqual(
+            minificar_css(css),
+            '.a>.b,.c{content:"  /* x */  ";margin :0 auto}div :hover{width:calc(100% - 2px)}',
+        )
+
+    def test_js_preserva_strings_template_strings_e_regex(self):
+        js = (
+            "// comentário\n"
+            "function f(a) {\n"
+            "    /* bloco */\n"
+            "    const url = 'http://x//y';\n"
+            "    const t = `linha ${a}\n   continua`;\n"
+            "    return a.replace(/\\/\\/[a-z]+/g, '') / 2\n"
+            "}\n"
+        )
+        self.assertEqual(
+            minificar_js(js),
+            "function f(a) {\n"
+            "const url = 'http://x//y';\n"
+            "const t = `linha ${a}\n   continua`;\n"
+            "return a.replace(/\\/\\/[a-z]+/g, '') / 2\n"
+            "}",
+        )
+
+
+class PipelineEstaticosTest(TestCase):
+    def setUp(self):
+        self.destino = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.destino)
+
+    def test_sem_manifesto_as_urls_saem_sem_hash(self):
+        with override_settings(STATIC_ROOT=self.destino):
+            self.assertEqual(static('style.css'), '/static/style.css')
+
+    def test_sem_manifesto_em_producao_falha(self):
+        with override_settings(STATIC_ROOT=self.destino, DEBUG=False, ESTATICOS_SEM_MANIFESTO=False):
+            with self.assertRaises(ValueError):
+                static('style.css')
+
+    def test_collectstatic_gera_nomes_com_hash_minificados_e_comprimidos(self):
+        with override_settings(STATIC_ROOT=self.destino):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = static('style.css')
+            self.assertRegex(url, r'^/static/style\.[0-9a-f]{12}\.css$')
+
+            arquivo = Path(self.destino) / url.removeprefix('/static/')
+            minificado = arquivo.read_bytes()
+            original = (Path(self.destino) / 'style.css').read_bytes()
+            self.assertLess(len(minificado), len(original))
+            self.assertNotIn(b'/*', minificado)
+            self.assertEqual(gzip.decompress(Path(f'{arquivo}.gz').read_bytes()), minificado)
+            # Imagens não ganham versão comprimida
+            self.assertFalse(list(Path(self.destino).glob('lista-pura-favicon.*.png.gz')))
+
+            # As páginas passam a apontar para os arquivos com hash
+            user = User.objects.create_user(email='estaticos@example.com', nome='Estáticos', password='password')
+            self.client.force_login(user)
+            self.assertContains(self.client.get(reverse('painel')), url)
+
+
+class PaginasSemInlineTest(TestCase):
+    def test_painel_e_lista_sem_script_nem_estilo_inline(self):
+        user = User.objects.create_user(email='inline@example.com', nome='Inline', password='password')
+        Tarefa.objects.create(titulo='Sem inline', usuario=user)
+        self.client.force_login(user)
+        for rota in ('painel', 'minhas_tarefas'):
+            html = self.client.get(reverse(rota)).content.decode()
+            self.assertNotIn('<script>', html)
+            self.assertNotIn('<style>', html)
+            # Só sobram cores de categoria e a largura da barra de progresso
+            self.assertNotIn('style="display', html)
@@ -0,0 +1,231 @@
+import tempfile
+import threading
+from unittest import mock
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from datetime import date
+from tasks.importacao import ConversorData, ImportadorTarefas, processar_importacao
+from tasks.models import CategoriaDeTarefa, Etapa, ImportJob, Tarefa
+
+User = get_user_model()
+
+
+def arquivo_csv(conteudo, nome='tarefas.csv'):
+    return SimpleUploadedFile(nome, conteudo.encode('utf-8'), content_type='text/csv')
+
+
+class ImportadorTarefasTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='importa@example.com', nome='Importa', password='password')
+        CategoriaDeTarefa.objects.create(nome='Casa', usuario=self.user)
+
+    def test_importa_tarefas_etapas_e_categorias(self):
+        conteudo = (
+            '﻿titulo ; descricao;data_conclusao;status;categoria;etapas\n'
+            'Festa;Aniversário;10/05/2025;em_andamento;Casa;Comprar bolo | Comprar vela\n'
+            'Relatório;;2025-06-01;invalido;Trabalho;\n'
+        )
+        resultado = ImportadorTarefas(self.user).importar(arquivo_csv(conteudo))
+
+        self.assertEqual(resultado.tarefas_criadas, 2)
+        self.assertEqual(resultado.etapas_criadas, 2)
+        self.assertEqual(resultado.erros, [])
+
+        festa = Tarefa.objects.get(titulo='Festa')
+        self.assertEqual(festa.data_conclusao, date(2025, 5, 10))
+        self.assertEqual(festa.categoria.nome, 'Casa')
+        self.assertEqual(festa.etapas_total, 2)
+        self.assertEqual(list(festa.etapas.values_list('descricao', flat=True)), ['Comprar bolo', 'Comprar vela'])
+
+        relatorio = Tarefa.objects.get(titulo='Relatório')
+        self.assertEqual(relatorio.status, Tarefa.StatusChoices.NAO_INICIADO)
+        self.assertTrue(CategoriaDeTarefa.objects.filter(nome='Trabalho', usuario=self.user).exists())
+
+    def test_erros_por_linha_nao_interrompem_o_arquivo(self):
+        conteudo = (
+            'titulo,data_conclusao\n'
+            'Boa 1,01-02-2025\n'
+            ',01-02-2025\n'
+            'Data ruim,31/31/2025\n'
+            'Boa 2,\n'
+        )
+        resultado = ImportadorTarefas(self.user, tamanho_lote=1).importar(arquivo_csv(conteudo))
+
+        self.assertEqual(resultado.tarefas_criadas, 2)
+        self.assertEqual([linha for linha, _ in resultado.erros], [3, 4])
+        self.assertEqual(set(Tarefa.objects.values_list('titulo', flat=True)), {'Boa 1', 'Boa 2'})
+
+    def test_erro_de_codificacao_grava_o_lote_pendente(self):
+        # Linhas boas o bastante para passar do bloco que o TextIOWrapper decodifica de uma vez
+        linhas = ''.join(f'Boa {i:04d}\n' for i in range(2000))
+        arquivo = SimpleUploadedFile('tarefas.csv', ('titulo\n' + linhas).encode('utf-8') + b'Ruim \xff\n')
+
+        resultado = ImportadorTarefas(self.user, tamanho_lote=500).importar(arquivo)
+
+        self.assertGreater(resultado.linhas_processadas, 0)
+        self.assertEqual(resultado.tarefas_criadas, resultado.linhas_processadas)
+        self.assertEqual(Tarefa.objects.filter(usuario=self.user).count(), resultado.linhas_processadas)
+        self.assertEqual(len(resultado.erros), 1)
+        self.assertIn('erro de codificação', resultado.erros[0][1])
+
+    def test_consultas_por_lote_e_nao_por_linha(self):
+        linhas = ''.join(f'Tarefa {i};Casa;a|b\n' for i in range(1200))
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = ImportadorTarefas(self.user, tamanho_lote=500).importar(
+                arquivo_csv('titulo;categoria;etapas\n' + linhas)
+            )
+        self.assertEqual(resultado.tarefas_criadas, 1200)
+        self.assertEqual(Etapa.objects.filter(tarefa__usuario=self.user).count(), 2400)
+        # Poucas dezenas de INSERTs em lote (o SQLite limita os parâmetros por comando), não milhares
+        self.assertLess(len(consultas), 100)
+
+    def test_conversor_detecta_formato_uma_vez(self):
+        conversor = ConversorData()
+        self.assertEqual(conversor.converter('2025-01-31'), date(2025, 1, 31))
+        self.assertEqual(conversor.formato, '%Y-%m-%d')
+        self.assertEqual(conversor.converter('31/01/2025'), date(2025, 1, 31))
+        with self.assertRaises(ValueError):
+            conversor.converter('amanhã')
+
+
+class ImportarTarefasViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='view@example.com', nome='View', password='password')
+        self.client.force_login(self.user)
+
+    def test_upload_importa_e_redireciona(self):
+        response = self.client.post(reverse('importar_tarefas'), {
+            'arquivo_csv': arquivo_csv('titulo;etapas\nNova;x|y\n'),
+        })
+        self.assertRedirects(response, reverse('minhas_tarefas'))
+        self.assertEqual(Tarefa.objects.get(usuario=self.user).get_progresso()['total'], 2)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), TAREFAS_IMPORTACAO_SINCRONA_MAX_BYTES=10)
+class ImportJobTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='job@example.com', nome='Job', password='password')
+        self.client.force_login(self.user)
+
+    def test_arquivo_grande_vira_job_processado_pelo_worker(self):
+        response = self.client.post(reverse('importar_tarefas'), {
+            'arquivo_csv': arquivo_csv('titulo;etapas\nUm;a|b\n;\nDois;\n'),
+        })
+        job = ImportJob.objects.get(usuario=self.user)
+        self.assertRedirects(response, f"{reverse('importar_tarefas')}?job={job.pk}")
+        self.assertFalse(Tarefa.objects.exists())
+
+        progresso = self.client.get(reverse('progresso_importacao', args=[job.pk])).json()
+        self.assertEqual(progresso['status'], ImportJob.StatusChoices.PENDENTE)
+        self.assertFalse(progresso['finalizado'])
+
+        call_command('processar_importacoes', '--uma-vez', stdout=StringIO())
+
+        progresso = self.client.get(reverse('progresso_importacao', args=[job.pk])).json()
+        self.assertEqual(progresso['status'], ImportJob.StatusChoices.CONCLUIDO)
+        self.assertEqual(progresso['linhas_processadas'], 3)
+        self.assertEqual(progresso['tarefas_criadas'], 2)
+        self.assertEqual(progresso['erros'], [[3, 'título vazio.']])
+        self.assertEqual(Tarefa.objects.filter(usuario=self.user).count(), 2)
+
+    def test_progresso_de_outro_usuario(self):
+        outro = User.objects.create_user(email='outro-job@example.com', nome='Outro', password='password')
+        job = ImportJob.objects.create(usuario=outro, arquivo=arquivo_csv('titulo\nX\n'), nome_original='x.csv')
+        response = self.client.get(reverse('progresso_importacao', args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_job_interrompido_e_retomado(self):
+        job = ImportJob.objects.create(
+            usuario=self.user,
+            arquivo=arquivo_csv('titulo\nJá gravada\nNova\n'),
+            nome_original='retomar.csv',
+            status=ImportJob.StatusChoices.PROCESSANDO,
+            linhas_processadas=1,
+            tarefas_criadas=1,
+        )
+        processar_importacao(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.StatusChoices.CONCLUIDO)
+        self.assertEqual((job.linhas_processadas, job.tarefas_criadas), (2, 2))
+        self.assertEqual(list(Tarefa.objects.values_list('titulo', flat=True)), ['Nova'])
+
+    def test_falha_inesperada_preserva_erros_e_progresso(self):
+        job = ImportJob.objects.create(
+            usuario=self.user,
+            arquivo=arquivo_csv('titulo\n;\nNova\n'),
+            nome_original='falha.csv',
+            status=ImportJob.StatusChoices.PROCESSANDO,
+            linhas_processadas=1,
+            erros=[[2, 'título vazio.']],
+        )
+        # Arquivo sumiu do disco entre a retomada e o processamento
+        job.arquivo.storage.delete(job.arquivo.name)
+
+        processar_importacao(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.StatusChoices.FALHOU)
+        self.assertEqual(job.linhas_processadas, 1)
+        self.assertEqual(job.erros[0], [2, 'título vazio.'])
+        self.assertEqual(len(job.erros), 2)
+        self.assertTrue(job.erros[1][1].startswith('falha inesperada: '))
+
+
+    def test_falha_apaga_o_arquivo(self):
+        job = ImportJob.objects.create(usuario=self.user, arquivo=arquivo_csv('titulo\nX\n'), nome_original='x.csv',
+                                       status=ImportJob.StatusChoices.PROCESSANDO)
+        with mock.patch.object(ImportadorTarefas, 'importar', side_effect=RuntimeError('disco cheio')):
+            processar_importacao(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.StatusChoices.FALHOU)
+        self.assertFalse(job.arquivo.storage.exists(job.arquivo.name))
+
+    def test_worker_lento_para_quando_o_job_volta_a_fila(self):
+        ImportJob.objects.create(usuario=self.user, arquivo=arquivo_csv('titulo\nUm\nDois\n'), nome_original='lento.csv')
+        job = ImportJob.reivindicar_proximo('lento:1')
+        # Dado como abandonado e pego por outro worker enquanto o primeiro ainda processava
+        ImportJob.objects.filter(pk=job.pk).update(status=ImportJob.StatusChoices.PENDENTE, worker='')
+        ImportJob.reivindicar_proximo('rapido:2')
+
+        processar_importacao(job)
+
+        self.assertFalse(Tarefa.objects.exists())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.linhas_processadas), (ImportJob.StatusChoices.PROCESSANDO, 'rapido:2', 0))
+        self.assertTrue(job.arquivo.storage.exists(job.arquivo.name))
+
+        processar_importacao(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.StatusChoices.CONCLUIDO)
+        self.assertEqual(Tarefa.objects.count(), 2)
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReivindicarJobConcorrenciaTest(TransactionTestCase):
+    def test_cada_job_e_pego_por_um_unico_worker(self):
+        user = User.objects.create_user(email='fila@example.com', nome='Fila', password='password')
+        for i in range(12):
+            ImportJob.objects.create(usuario=user, arquivo=arquivo_csv('titulo\nX\n'), nome_original=f'{i}.csv')
+
+        pegos = []
+
+        def worker(nome):
+            try:
+                while (job := ImportJob.reivindicar_proximo(nome)) is not None:
+                    pegos.append(job.pk)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(f'w{i}',)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(pegos), 12)
+        self.assertEqual(len(set(pegos)), 12)
+        self.assertFalse(ImportJob.objects.filter(status=ImportJob.StatusChoices.PENDENTE).exists())
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from tasks import views
+from tasks import api, views
 
 urlpatterns=[
     path('painel/', views.painel, name='painel'),
@@ -15,8 +15,17 @@ urlpatterns=[
     path('editar/<int:pk>/', views.editar_tarefa, name='editar_tarefa'),
     # Delete (Precisa do ID)
     path('deletar/<int:pk>/', views.deletar_tarefa, name='deletar_tarefa'),
+    # Ações em lote (arquivar, status, categoria, foco, excluir)
+    path('lote/', views.acoes_em_lote, name='acoes_em_lote'),
     
     path('api/etapa/<int:etapa_id>/toggle/', views.atualizar_etapa, name='atualizar_etapa'),
+    # Atualizações ao vivo (Server-Sent Events) para o painel e a lista
+    path('eventos/', views.eventos_tarefas, name='eventos_tarefas'),
+    
+    # API JSON somente leitura (ver tasks/api.py)
+    path('api/tarefas/', api.tarefas, name='api_tarefas'),
+    path('api/etapas/', api.etapas, name='api_etapas'),
+    path('api/categorias/', api.categorias, name='api_categorias'),
     
     # Categorias CRUD
     path('categoriatarefa/nova/', views.criar_categoria, name='criar_categoria'),
@@ -25,9 +34,14 @@ urlpatterns=[
     
     # Importar
     path('importar/', views.importar_tarefas, name='importar_tarefas'),
+    path('importar/<int:pk>/progresso/', views.progresso_importacao, name='progresso_importacao'),
+    
+    # Busca
+    path('busca/', views.buscar, name='buscar'),
     
     # Arquivamento
     path('arquivar/<int:pk>/', views.arquivar_tarefa, name='arquivar_tarefa'),
+    path('desarquivar/<int:pk>/', views.desarquivar_tarefa, name='desarquivar_tarefa'),
     path('arquivadas/', views.tarefas_arquivadas, name='tarefas_arquivadas'),
     path('arquivadas/exportar/', views.exportar_tarefas_arquivadas, name='exportar_tarefas_arquivadas'),
 ]
@@ -1,31 +1,99 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from .models import Tarefa, CategoriaDeTarefa, Etapa # Importe seus models
-from .forms import TarefaForm, EtapaFormSet, CategoriaForm, CSVUploadForm # Importe os forms criados acima
-from django.http import JsonResponse, HttpResponse
-from django.views.decorators.csrf import csrf_exempt
+from .models import Tarefa, TarefaArquivada, EtapaArquivada, CategoriaDeTarefa, Etapa, EventoTarefa, ImportJob # Importe seus models
+from .forms import TarefaForm, EtapaFormSet, CategoriaForm, CSVUploadForm, AcaoEmLoteForm # Importe os forms criados acima
+from . import acoes_lote, arquivamento, assincrono, busca, cache_usuario, eventos
+from .condicional import condicional_por_usuario
+from .importacao import ImportadorTarefas
+from .paginacao import paginar_por_cursor
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from django.utils import timezone # Importante para lidar com datas
-import json
+from django.contrib import messages
+from django.conf import settings
+from django.urls import reverse
+from django.db import transaction
+from django.db.models import Count, F, Q
+import asyncio
 import csv
-import io
+import time
+
+# Quantos erros de linha da importação viram mensagens na tela
+MAX_ERROS_EXIBIDOS = 5
+
+# Tarefas por página nas listas paginadas por cursor
+TAMANHO_PAGINA_TAREFAS = 25
+
+# Linhas lidas do banco por vez na exportação em streaming
+TAMANHO_BLOCO_EXPORTACAO = 2000
+
+# Resultados exibidos na busca textual
+LIMITE_RESULTADOS_BUSCA = 30
 
 
 # Create your views here.
 
 @login_required
+@condicional_por_usuario
 def minhas_tarefas(request):
     """ View para a Lista de Tarefas """
     # FILTRO MÁGICO: usuario=request.user
-    # Otimização: select_related para FK e prefetch_related para ManyToMany (etapas)
+    # com_progresso: total/feitas/porcentagem das etapas vêm anotados no SQL
     tarefas = Tarefa.objects.filter(usuario=request.user, arquivada=False)\
-                            .select_related('categoria')\
+                            .com_progresso()\
+                            .select_related('categoria', 'usuario')\
                             .prefetch_related('etapas')
-    
+
+    # Paginação por cursor em (criada_em, id): custo constante em qualquer profundidade
+    pagina = paginar_por_cursor(tarefas, 'criada_em', request.GET.get('cursor'), TAMANHO_PAGINA_TAREFAS)
+
     data = {
-        'tarefas': tarefas
+        'tarefas': pagina.itens,
+        'proximo_cursor': pagina.proximo_cursor,
     }
+    # "Carregar mais": devolve só os cards da próxima página
+    if request.GET.get('parcial'):
+        return render(request, "partials/_tarefas_pagina.html", data)
+    data['form_lote'] = AcaoEmLoteForm(request.user)
     return render(request, "tarefas.html", data)
+
+MENSAGENS_LOTE = {
+    acoes_lote.ARQUIVAR: '{} tarefa(s) concluída(s) arquivada(s).',
+    acoes_lote.STATUS: 'Status alterado em {} tarefa(s).',
+    acoes_lote.CATEGORIA: 'Categoria alterada em {} tarefa(s).',
+    acoes_lote.FOCO: 'Foco alternado em {} tarefa(s).',
+    acoes_lote.DELETAR: '{} tarefa(s) excluída(s).',
+}
+
+@login_required
+@require_POST
+def acoes_em_lote(request):
+    """ Aplica uma ação às tarefas selecionadas (ou a todas do filtro) com um único UPDATE/DELETE. """
+    # fetch() com Accept: application/json recebe JSON; o formulário da página volta para a lista
+    quer_json = not request.accepts('text/html')
+    form = AcaoEmLoteForm(request.user, request.POST)
+    if not form.is_valid():
+        erro = next(iter(form.errors.values()))[0]
+        if quer_json:
+            return JsonResponse({'erro': erro, 'campos': form.errors}, status=400)
+        messages.error(request, erro)
+        return redirect('minhas_tarefas')
+
+    dados = form.cleaned_data
+    if dados['todas']:
+        tarefas = acoes_lote.escopo(request.user, status=dados['filtro_status'], categoria=dados['filtro_categoria'])
+    else:
+        tarefas = acoes_lote.escopo(request.user, ids=dados['ids'])
+    valor = dados['status'] if dados['acao'] == acoes_lote.STATUS else dados['categoria']
+    afetadas = acoes_lote.executar(request.user, tarefas, dados['acao'], valor)
+
+    if quer_json:
+        return JsonResponse({'acao': dados['acao'], 'afetadas': afetadas})
+    messages.success(request, MENSAGENS_LOTE[dados['acao']].format(afetadas))
+    return redirect('minhas_tarefas')
 # CREATE (Criar Tarefa)
 @login_required
 def criar_tarefa(request):
@@ -34,12 +102,14 @@ def criar_tarefa(request):
         formset = EtapaFormSet(request.POST)
         
         if form.is_valid() and formset.is_valid():
-            tarefa = form.save(commit=False)
-            tarefa.usuario = request.user
-            tarefa.save()
-            
-            formset.instance = tarefa
-            formset.save()
+            # Uma transação: o índice de busca é refeito uma vez no commit, não a cada etapa
+            with transaction.atomic():
+                tarefa = form.save(commit=False)
+                tarefa.usuario = request.user
+                tarefa.save()
+
+                formset.instance = tarefa
+                formset.save()
             
             # Redireciona para sua rota 'lista/' cujo nome é 'minhas_tarefas'
             return redirect('minhas_tarefas') 
@@ -63,8 +133,9 @@ def editar_tarefa(request, pk):
         formset = EtapaFormSet(request.POST, instance=tarefa)
         
         if form.is_valid() and formset.is_valid():
-            form.save()
-            formset.save()
+            with transaction.atomic():
+                form.save()
+                formset.save()
             return redirect('minhas_tarefas')
     else:
         form = TarefaForm(instance=tarefa)
@@ -86,6 +157,7 @@ def deletar_tarefa(request, pk):
         
     return render(request, 'tarefa_confirm_delete.html', {'tarefa': tarefa})
 
+@condicional_por_usuario
 def categoriaTarefa(request, categoria_id):
     categoria = get_object_or_404(CategoriaDeTarefa, id=categoria_id)
     
@@ -96,12 +168,15 @@ def categoriaTarefa(request, categoria_id):
 
     data = {
         "CategoriaTarefa": categoria,
-        "tarefas": categoria.tarefas.all().prefetch_related('etapas')
+        "tarefas": categoria.tarefas.com_progresso()
+                                    .select_related('categoria', 'usuario')
+                                    .prefetch_related('etapas')
     }
     
     return render(request, "categoria_de_tarefa.html", data)
 
 @login_required
+@condicional_por_usuario
 def todasCategoriasDeTarefas(request):
     todasCategoriasOrdenadaPorData = CategoriaDeTarefa.objects.filter(usuario=request.user).order_by('criado_em')
     
@@ -124,58 +199,63 @@ def todasCategoriasDeTarefas(request):
     
     return render(request, "todasCategoriasTarefa.html", data)
 
-@login_required
-def painel(request):
-    # 1. Pegamos a data de hoje (sem as horas)
-    hoje_data = timezone.now().date()
-    
-    # 2. Base: Pegamos todas as tarefas do usuário (não arquivadas)
-    tarefas_base = Tarefa.objects.filter(usuario=request.user, arquivada=False).prefetch_related('etapas', 'categoria')
-    
-    # --- CÁLCULOS E LISTAS ---
-    
-    # Total Geral
-    total = tarefas_base.count()
-    
-    # Para Hoje: Vencem hoje E não estão concluídas
-    tarefas_hoje_list = tarefas_base.filter(
-        data_conclusao=hoje_data
-    ).exclude(
-        status=Tarefa.StatusChoices.CONCLUIDA
-    )
-    
-    # Foco Atual: Marcadas com focus_atual E não concluídas
-    tarefas_foco_list = tarefas_base.filter(
-        is_foco_atual=True
-    ).exclude(
-        status=Tarefa.StatusChoices.CONCLUIDA
-    )
-    
-    # Atrasadas: Vencimento menor que hoje E não estão concluídas
-    tarefas_atrasadas_list = tarefas_base.filter(
-        data_conclusao__lt=hoje_data
-    ).exclude(
-        status=Tarefa.StatusChoices.CONCLUIDA
-    )
-    
-    # Concluídas
-    tarefas_concluidas_list = tarefas_base.filter(
-        status=Tarefa.StatusChoices.CONCLUIDA
+async def _dados_painel(usuario, hoje_data):
+    """ Monta os números e as listas do painel com uma quantidade fixa de consultas (ORM assíncrono). """
+    tarefas_base = Tarefa.objects.filter(usuario=usuario, arquivada=False)
+    pendente = ~Q(status=Tarefa.StatusChoices.CONCLUIDA)
+
+    # 1. Todos os contadores em UMA consulta (agregação condicional)
+    contagens = await tarefas_base.aaggregate(
+        total=Count('id'),
+        hoje=Count('id', filter=pendente & Q(data_conclusao=hoje_data)),
+        foco=Count('id', filter=pendente & Q(is_foco_atual=True)),
+        # Atrasadas vêm do snapshot (TarefaAtrasada), atualizado diariamente e pelos sinais
+        atrasadas=Count('atraso'),
+        concluidas=Count('id', filter=Q(status=Tarefa.StatusChoices.CONCLUIDA)),
     )
 
-    context = {
-        'total': total,
-        'hoje': tarefas_hoje_list.count(),
-        'foco': tarefas_foco_list.count(),
-        'atrasadas': tarefas_atrasadas_list.count(),
-        'concluidas': tarefas_concluidas_list.count(),
-        'tarefas_hoje_list': tarefas_hoje_list,
-        'tarefas_foco_list': tarefas_foco_list,
-        'tarefas_atrasadas_list': tarefas_atrasadas_list,
-        'tarefas_concluidas_list': tarefas_concluidas_list,
+    # 2. Uma única busca com as tarefas que aparecem em pelo menos um grupo.
+    # A separação em grupos é feita em Python (uma tarefa pode estar em mais de um).
+    tarefas = tarefas_base.filter(
+        Q(status=Tarefa.StatusChoices.CONCLUIDA)
+        | Q(data_conclusao=hoje_data)
+        | Q(is_foco_atual=True)
+        | Q(atraso__isnull=False)
+    ).annotate(faixa_atraso=F('atraso__faixa')).select_related('categoria').prefetch_related('etapas')
+
+    grupos = {'hoje': [], 'foco': [], 'atrasadas': [], 'concluidas': []}
+    async for tarefa in tarefas:
+        if tarefa.status == Tarefa.StatusChoices.CONCLUIDA:
+            grupos['concluidas'].append(tarefa)
+            continue
+        if tarefa.data_conclusao == hoje_data:
+            grupos['hoje'].append(tarefa)
+        if tarefa.is_foco_atual:
+            grupos['foco'].append(tarefa)
+        if tarefa.faixa_atraso is not None:
+            grupos['atrasadas'].append(tarefa)
+
+    return {
+        **contagens,
+        'tarefas_hoje_list': grupos['hoje'],
+        'tarefas_foco_list': grupos['foco'],
+        'tarefas_atrasadas_list': grupos['atrasadas'],
+        'tarefas_concluidas_list': grupos['concluidas'],
     }
-    
-    return render(request, 'dashboard.html', context)
+
+@assincrono.login_required
+@condicional_por_usuario
+async def painel(request):
+    # Pegamos a data de hoje (sem as horas)
+    hoje_data = timezone.now().date()
+    # Em cache por usuário (versionado): a data entra na chave para virar o dia sozinho
+    context = await cache_usuario.aobter_ou_calcular(
+        request.user.pk, f'painel:{hoje_data.isoformat()}',
+        lambda: _dados_painel(request.user, hoje_data),
+    )
+    # render() é síncrono: a tag {% cache %} e os context processors podem ir ao banco ou ao disco
+    # (DatabaseCache, FileBasedCache), então a renderização roda fora do event loop
+    return await sync_to_async(render)(request, 'dashboard.html', context)
 
 @login_required
 def pagina_restrita(request):
@@ -187,47 +267,21 @@ def pagina_restrita(request):
     
     return render(request, "geral.html", data)
 
-@csrf_exempt 
-def atualizar_etapa(request, etapa_id):
+@assincrono.login_required
+async def atualizar_etapa(request, etapa_id):
     if request.method == 'POST':
-        etapa = Etapa.objects.get(id=etapa_id)
-        
-        # 1. Alterna o status da etapa (se estava True vira False, e vice-versa)
-        etapa.concluida = not etapa.concluida
-        etapa.save()
-        
-        # 2. Verifica a Tarefa Pai
-        tarefa = etapa.tarefa
-        todas_etapas = tarefa.etapas.all()
-        
-        # Lógica: Se tem etapas e TODAS estão concluídas -> Concluída
-        # Caso contrário, se tem pelo menos uma feita -> Em Andamento
-        # Se nenhuma feita -> Não Iniciado
-        
-        todas_concluidas = all(e.concluida for e in todas_etapas)
-        alguma_concluida = any(e.concluida for e in todas_etapas)
-        
-        novo_status = tarefa.status # status atual
-        
-        if todas_etapas.exists():
-            if todas_concluidas:
-                novo_status = Tarefa.StatusChoices.CONCLUIDA
-            elif alguma_concluida:
-                novo_status = Tarefa.StatusChoices.EM_ANDAMENTO
-            else:
-                novo_status = Tarefa.StatusChoices.NAO_INICIADO
-        
-        # Salva apenas se mudou
-        if tarefa.status != novo_status:
-            tarefa.status = novo_status
-            tarefa.save()
-            
+        # Troca atômica da etapa + status da tarefa derivado das etapas, numa única ida à thread do ORM síncrono.
+        # O filtro por usuário garante que só o dono alterna as etapas da própria tarefa.
+        resultado = await Etapa.aalternar(etapa_id, request.user)
+        if resultado is None:
+            return JsonResponse({'status': 'erro'}, status=404)
+
         return JsonResponse({
             'status': 'sucesso', 
-            'etapa_concluida': etapa.concluida,
-            'tarefa_status': tarefa.get_status_display(),
-            'tarefa_status_code': tarefa.status,
-            'tarefa_id': tarefa.id
+            'etapa_concluida': resultado['etapa_concluida'],
+            'tarefa_status': Tarefa.StatusChoices(resultado['tarefa_status']).label,
+            'tarefa_status_code': resultado['tarefa_status'],
+            'tarefa_id': resultado['tarefa_id']
         })
         
     return JsonResponse({'status': 'erro'}, status=400)
@@ -288,155 +342,219 @@ def importar_tarefas(request):
             csv_file = request.FILES['arquivo_csv']
             
             if not csv_file.name.endswith('.csv'):
-                from django.contrib import messages
                 messages.error(request, 'O arquivo deve ser um CSV (.csv).')
                 return render(request, 'importar_tarefas.html', {'form': form})
 
-            try:
-                decoded_file = csv_file.read().decode('utf-8')
-            except UnicodeDecodeError:
-                from django.contrib import messages
-                messages.error(request, 'Erro de codificação no arquivo. Certifique-se que é um CSV UTF-8.')
-                return render(request, 'importar_tarefas.html', {'form': form})
-            
-            lines = decoded_file.splitlines()
-            if not lines:
-                from django.contrib import messages
-                messages.warning(request, 'O arquivo está vazio.')
-                return redirect('importar_tarefas')
+            # Arquivos grandes não são processados dentro da requisição: viram um ImportJob
+            # que o comando `processar_importacoes` executa em segundo plano.
+            if csv_file.size > settings.TAREFAS_IMPORTACAO_SINCRONA_MAX_BYTES:
+                job = ImportJob.objects.create(
+                    usuario=request.user,
+                    arquivo=csv_file,
+                    nome_original=csv_file.name,
+                )
+                messages.info(request, 'Arquivo recebido! A importação continua em segundo plano.')
+                return redirect(f"{reverse('importar_tarefas')}?job={job.pk}")
 
-            # Detecção de delimitador mais robusta
-            first_line = lines[0]
-            if ';' in first_line:
-                delimiter = ';'
-            else:
-                delimiter = ','
+            # Leitura em fluxo + bulk_create em lotes (ver tasks/importacao.py)
+            resultado = ImportadorTarefas(request.user).importar(csv_file)
 
-            io_string = io.StringIO(decoded_file)
-            reader = csv.DictReader(io_string, delimiter=delimiter)
-            
-            # Normalizar chaves do header para remover espaços ou BOM
-            if reader.fieldnames:
-                reader.fieldnames = [name.strip() for name in reader.fieldnames]
+            if resultado.linhas_processadas == 0 and not resultado.erros:
+                messages.warning(request, 'O arquivo está vazio.')
+                return redirect('importar_tarefas')
 
-            from datetime import datetime
-            
-            tasks_created = 0
-
-            def parse_date(date_str):
-                if not date_str or not date_str.strip():
-                    return None
-                date_str = date_str.strip()
-                formats = ['%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d']
-                for fmt in formats:
-                    try:
-                        return datetime.strptime(date_str, fmt).date()
-                    except ValueError:
-                        continue
-                return None
-
-            for row in reader:
-                if 'titulo' not in row:
-                    continue
-
-                titulo_raw = row['titulo']
-                if not titulo_raw:
-                    continue
-                
-                titulo = titulo_raw.strip()
-                descricao = row.get('descricao', '').strip()
-                
-                data_inicio = parse_date(row.get('data_inicio'))
-                data_conclusao = parse_date(row.get('data_conclusao'))
-                
-                status_raw = row.get('status', 'nao_iniciado')
-                if status_raw is None: status_raw = 'nao_iniciado'
-                status = status_raw.strip()
-
-                valid_statuses = [choice[0] for choice in Tarefa.StatusChoices.choices]
-                if status not in valid_statuses:
-                    status = 'nao_iniciado'
-
-                categoria_nome = row.get('categoria')
-                categoria = None
-                if categoria_nome and categoria_nome.strip():
-                    categoria, _ = CategoriaDeTarefa.objects.get_or_create(
-                        nome=categoria_nome.strip(), 
-                        usuario=request.user,
-                        defaults={'cor': '#000000'}
-                    )
-
-                tarefa = Tarefa.objects.create(
-                    usuario=request.user,
-                    titulo=titulo,
-                    descricao=descricao,
-                    data_inicio=data_inicio,
-                    data_conclusao=data_conclusao,
-                    status=status,
-                    categoria=categoria
-                )
-                
-                # Importar Etapas
-                etapas_str = row.get('etapas')
-                if etapas_str and etapas_str.strip():
-                    # Separador de etapas é o PIPE |
-                    lista_etapas = etapas_str.split('|')
-                    for i, descricao_etapa in enumerate(lista_etapas):
-                        descricao_limpa = descricao_etapa.strip()
-                        if descricao_limpa:
-                            Etapa.objects.create(
-                                tarefa=tarefa,
-                                descricao=descricao_limpa,
-                                ordem=i
-                            )
-                            # Removing info_ordem above as it was a placeholder thought, using 'ordem' as per model.
-
-                tasks_created += 1
-            
-            from django.contrib import messages
-            if tasks_created > 0:
-                messages.success(request, f'{tasks_created} tarefas importadas com sucesso!')
+            if resultado.tarefas_criadas > 0:
+                messages.success(request, f'{resultado.tarefas_criadas} tarefas importadas com sucesso!')
             else:
                 messages.warning(request, 'Nenhuma tarefa foi importada. Verifique o formato do arquivo (cabeçalhos).')
 
+            for linha, erro in resultado.erros[:MAX_ERROS_EXIBIDOS]:
+                messages.error(request, f'Linha {linha}: {erro}')
+            if len(resultado.erros) > MAX_ERROS_EXIBIDOS:
+                messages.error(request, f'... e mais {len(resultado.erros) - MAX_ERROS_EXIBIDOS} linha(s) com erro.')
+
             return redirect('minhas_tarefas')
     else:
         form = CSVUploadForm()
-    
-    return render(request, 'importar_tarefas.html', {'form': form})
+
+    job = None
+    if request.GET.get('job', '').isdigit():
+        job = ImportJob.objects.filter(pk=request.GET['job'], usuario=request.user).first()
+
+    return render(request, 'importar_tarefas.html', {'form': form, 'job': job})
+
+
+@login_required
+def progresso_importacao(request, pk):
+    job = get_object_or_404(ImportJob, pk=pk, usuario=request.user)
+    return JsonResponse({
+        'id': job.pk,
+        'arquivo': job.nome_original,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'finalizado': job.finalizado,
+        'linhas_processadas': job.linhas_processadas,
+        'tarefas_criadas': job.tarefas_criadas,
+        'etapas_criadas': job.etapas_criadas,
+        'total_erros': len(job.erros),
+        'erros': job.erros[:MAX_ERROS_EXIBIDOS],
+    })
 
 
 @login_required
 def arquivar_tarefa(request, pk):
     tarefa = get_object_or_404(Tarefa, pk=pk, usuario=request.user)
     if tarefa.status == Tarefa.StatusChoices.CONCLUIDA:
-        tarefa.arquivada = True
-        tarefa.save()
+        # Move a tarefa e as etapas para o arquivo frio (ver tasks/arquivamento.py)
+        arquivamento.arquivar(Tarefa.objects.filter(pk=tarefa.pk))
     return redirect('minhas_tarefas')
 
 @login_required
+@require_POST
+def desarquivar_tarefa(request, pk):
+    tarefa = get_object_or_404(TarefaArquivada, pk=pk, usuario=request.user)
+    arquivamento.desarquivar(TarefaArquivada.objects.filter(pk=tarefa.pk))
+    messages.success(request, f'"{tarefa.titulo}" voltou para a lista de tarefas.')
+    return redirect('tarefas_arquivadas')
+
+@login_required
+@condicional_por_usuario
 def tarefas_arquivadas(request):
-    tarefas = Tarefa.objects.filter(usuario=request.user, arquivada=True).order_by('-atualizada_em')
-    return render(request, 'tarefas_arquivadas.html', {'tarefas': tarefas})
+    tarefas = TarefaArquivada.objects.filter(usuario=request.user).select_related('categoria')
+    pagina = paginar_por_cursor(tarefas, 'arquivada_em', request.GET.get('cursor'), TAMANHO_PAGINA_TAREFAS)
+
+    data = {
+        'tarefas': pagina.itens,
+        'proximo_cursor': pagina.proximo_cursor,
+    }
+    if request.GET.get('parcial'):
+        return render(request, 'partials/_arquivadas_pagina.html', data)
+    return render(request, 'tarefas_arquivadas.html', data)
 
 @login_required
+@condicional_por_usuario
+def buscar(request):
+    """ Busca textual (FTS5) nas tarefas, etapas e base de conhecimento do usuário. """
+    termo = request.GET.get('q', '').strip()
+    resultados = busca.buscar(request.user, termo, LIMITE_RESULTADOS_BUSCA) if termo else []
+
+    data = {
+        'termo': termo,
+        'resultados': resultados,
+    }
+    return render(request, 'busca.html', data)
+
+class _Eco:
+    """ Pseudo-arquivo: o csv.writer "escreve" e a linha formatada volta direto para o gerador. """
+    def write(self, valor):
+        return valor
+
+
+def _linhas_exportacao(usuario):
+    """
+    Gera o CSV linha a linha com apenas duas consultas, ambas lidas em blocos (iterator):
+    as tarefas e as etapas, as duas ordenadas pelo id da tarefa e unidas em Python (merge).
+    As duas leituras ficam na mesma transação, para enxergarem o mesmo estado do arquivo.
+    """
+    writer = csv.writer(_Eco())
+    yield writer.writerow(['Título', 'Descrição', 'Data de Conclusão', 'Categoria', 'Etapas'])
+
+    with transaction.atomic():
+        tarefas = TarefaArquivada.objects.filter(usuario=usuario)\
+            .order_by('id')\
+            .values_list('id', 'titulo', 'descricao', 'arquivada_em', 'categoria__nome')\
+            .iterator(chunk_size=TAMANHO_BLOCO_EXPORTACAO)
+        etapas = EtapaArquivada.objects.filter(tarefa__usuario=usuario)\
+            .order_by('tarefa_id', 'ordem', 'id')\
+            .values_list('tarefa_id', 'descricao', 'concluida')\
+            .iterator(chunk_size=TAMANHO_BLOCO_EXPORTACAO)
+
+        proxima_etapa = next(etapas, None)
+        for tarefa_id, titulo, descricao, arquivada_em, categoria_nome in tarefas:
+            # Etapas de tarefas que não vieram na outra consulta são descartadas; sem
+            # isso uma única etapa órfã travaria o merge e as tarefas seguintes sairiam sem etapas
+            while proxima_etapa is not None and proxima_etapa[0] < tarefa_id:
+                proxima_etapa = next(etapas, None)
+
+            descricoes = []
+            while proxima_etapa is not None and proxima_etapa[0] == tarefa_id:
+                _, descricao_etapa, concluida = proxima_etapa
+                descricoes.append(f"[{'x' if concluida else ' '}] {descricao_etapa}")
+                proxima_etapa = next(etapas, None)
+
+            yield writer.writerow([
+                titulo, 
+                descricao, 
+                arquivada_em.strftime('%d/%m/%Y %H:%M'), 
+                categoria_nome or 'Sem Categoria',
+                ' | '.join(descricoes),
+            ])
+
+
+@login_required
+@condicional_por_usuario
 def exportar_tarefas_arquivadas(request):
-    tarefas = Tarefa.objects.filter(usuario=request.user, arquivada=True)
-    
-    response = HttpResponse(content_type='text/csv')
+    # Streaming: memória constante mesmo com milhões de tarefas arquivadas
+    response = StreamingHttpResponse(_linhas_exportacao(request.user), content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="tarefas_arquivadas.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Título', 'Descrição', 'Data de Conclusão', 'Categoria'])
-    
-    for tarefa in tarefas:
-        writer.writerow([
-            tarefa.titulo, 
-            tarefa.descricao, 
-            tarefa.atualizada_em.strftime('%d/%m/%Y %H:%M'), 
-            tarefa.categoria.nome if tarefa.categoria else 'Sem Categoria'
-        ])
-        
     return response
 
 
+# Eventos ao vivo (SSE): ver tasks/eventos.py
+
+def _fluxo_eventos(usuario_id, ultimo_id):
+    """ Fluxo para servidores WSGI: ocupa a thread enquanto a aba estiver aberta (até eventos.duracao() segundos). """
+    fim = time.monotonic() + eventos.duracao()
+    proximo_ping = time.monotonic() + eventos.PING
+    with eventos.assinar(usuario_id) as sinal:
+        yield eventos.inicio()
+        while time.monotonic() < fim:
+            sinal.clear()
+            for linha in EventoTarefa.objects.pendentes(usuario_id, ultimo_id):
+                ultimo_id = linha['id']
+                yield eventos.formatar(ultimo_id, 'tarefa', EventoTarefa.dados(linha))
+            if time.monotonic() >= proximo_ping:
+                proximo_ping = time.monotonic() + eventos.PING
+                yield eventos.ping()
+            sinal.wait(max(0, min(eventos.intervalo(), fim - time.monotonic())))
+
+
+async def _afluxo_eventos(usuario_id, ultimo_id):
+    """ Fluxo para servidores ASGI: enquanto espera, não ocupa nenhuma thread. """
+    fim = time.monotonic() + eventos.duracao()
+    proximo_ping = time.monotonic() + eventos.PING
+    with eventos.aassinar(usuario_id) as sinal:
+        yield eventos.inicio()
+        while time.monotonic() < fim:
+            sinal.clear()
+            async for linha in EventoTarefa.objects.pendentes(usuario_id, ultimo_id):
+                ultimo_id = linha['id']
+                yield eventos.formatar(ultimo_id, 'tarefa', EventoTarefa.dados(linha))
+            if time.monotonic() >= proximo_ping:
+                proximo_ping = time.monotonic() + eventos.PING
+                yield eventos.ping()
+            try:
+                await asyncio.wait_for(sinal.wait(), max(0, min(eventos.intervalo(), fim - time.monotonic())))
+            except asyncio.TimeoutError:
+                pass
+
+
+@assincrono.login_required
+async def eventos_tarefas(request):
+    # Reconexão do EventSource: continua depois do último evento recebido; conexão nova: só o que vier
+    try:
+        ultimo_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        ultimo_id = await EventoTarefa.objects.aultimo_id(request.user.pk)
+
+    # Sob ASGI o fluxo é assíncrono; sob WSGI (ex.: runserver) um gerador comum, que o Django
+    # consegue enviar aos poucos (um gerador assíncrono seria lido inteiro antes de responder)
+    if isinstance(request, ASGIRequest):
+        fluxo = _afluxo_eventos(request.user.pk, ultimo_id)
+    else:
+        fluxo = _fluxo_eventos(request.user.pk, ultimo_id)
+    response = StreamingHttpResponse(fluxo, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Sem buffer no nginx: cada evento sai na hora
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -26,6 +26,7 @@ class UsuarioAdmin(BaseUserAdmin):
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         ('Informações Pessoais', {'fields': ('nome',)}),
+        ('Preferências', {'fields': ('dias_arquivamento_automatico',)}),
         ('Permissões', {'fields': ('is_active', 'is_staff', 'is_admin', 'is_superuser', 'groups', 'user_permissions')}),
     )
     
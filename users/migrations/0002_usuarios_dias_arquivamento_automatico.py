@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-18 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuarios',
+            name='dias_arquivamento_automatico',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Arquivar concluídas após (dias)'),
+        ),
+    ]
@@ -40,6 +40,14 @@ class Usuarios(AbstractBaseUser, PermissionsMixin):
         auto_now_add=True # Preenche automaticamente na criação
     ) 
 
+    # Arquivamento automático das tarefas concluídas (comando `arquivar_automatico`):
+    # vazio usa settings.TAREFAS_ARQUIVAMENTO_AUTOMATICO_DIAS; 0 desativa para este usuário
+    dias_arquivamento_automatico = models.PositiveIntegerField(
+        verbose_name='Arquivar concluídas após (dias)',
+        null=True,
+        blank=True,
+    )
+
     # Campos de controle padrão (necessários para AbstractBaseUser/PermissionsMixin)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)